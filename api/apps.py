@@ -1,6 +1,33 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_migrate, post_save
 
 
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        # Register background task handlers
+        from . import tasks  # noqa: F401
+        from .models import Job
+        from .utils.job_embeddings import job_deleted, job_saved
+
+        # Sync flushes update the embedding index themselves; these cover single-job saves
+        post_save.connect(job_saved, sender=Job)
+        post_delete.connect(job_deleted, sender=Job)
+        post_migrate.connect(restore_job_search_index, sender=self)
+
+
+def restore_job_search_index(using, **kwargs):
+    # A migration that remakes api_job on SQLite drops the search triggers
+    from django.db import connections, transaction
+    from django.db.migrations.recorder import MigrationRecorder
+    from .utils.job_search import repair_sqlite_search_index
+
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return
+    if ('api', '0014_job_search_index') not in MigrationRecorder(connection).applied_migrations():
+        return
+    with transaction.atomic(using=using):
+        repair_sqlite_search_index(connection)
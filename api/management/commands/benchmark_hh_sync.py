@@ -0,0 +1,41 @@
+from concurrent.futures import ThreadPoolExecutor
+from django.core.management.base import BaseCommand
+from api.utils.fake_hh_server import FakeHHServer
+from api.utils.hh_api import HHApi, RateLimiter, fetch_vacancy_details
+import time
+
+
+class Command(BaseCommand):
+    help = "Benchmark the HH.ru fetch phase of sync against a local fake HH server"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--vacancies', type=int, default=100)
+        parser.add_argument('--latency', type=float, default=0.05,
+                            help="Simulated per-request latency in seconds")
+        parser.add_argument('--workers', default='1,4,8,16',
+                            help="Comma-separated worker counts to compare")
+        parser.add_argument('--rps', type=float, default=0,
+                            help="Rate limit in requests/second (0 disables)")
+
+    def handle(self, *args, **options):
+        worker_counts = [int(w) for w in options['workers'].split(',')]
+        baseline = None
+
+        with FakeHHServer(options['vacancies'], options['latency']) as server:
+            for workers in worker_counts:
+                api = HHApi(
+                    base_url=server.base_url,
+                    pool_size=workers,
+                    rate_limiter=RateLimiter(options['rps']) if options['rps'] else None
+                )
+                started = time.perf_counter()
+                vacancies = api.search_vacancies(per_page=options['vacancies'])['items']
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    fetched = fetch_vacancy_details(api, vacancies, executor)
+                elapsed = time.perf_counter() - started
+                baseline = baseline or elapsed
+
+                self.stdout.write(
+                    f"workers={workers:<3} vacancies={len(fetched):<5} "
+                    f"time={elapsed:.2f}s speedup={baseline / elapsed:.1f}x"
+                )
@@ -0,0 +1,63 @@
+from django.core.management.base import BaseCommand
+from api.management.commands.benchmark_local_matcher import SKILLS, WORDS
+from api.utils.job_embeddings import JobEmbeddingIndex, embed_job, embed_resume
+import numpy as np
+import tempfile
+import random
+import math
+import time
+
+
+class Command(BaseCommand):
+    help = "Time brute-force and IVF search of the job embedding index on synthetic jobs"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--jobs', type=int, default=1000000)
+        parser.add_argument('--dim', type=int, default=256)
+        parser.add_argument('--nlist', type=int, default=None, help="Defaults to sqrt(jobs)")
+        parser.add_argument('--nprobe', type=int, default=16)
+        parser.add_argument('--queries', type=int, default=20)
+        parser.add_argument('--top-k', type=int, default=20)
+
+    def handle(self, *args, **options):
+        rng = random.Random(42)
+        dim, total = options['dim'], options['jobs']
+        nlist = options['nlist'] or int(math.sqrt(total))
+
+        def batches(batch_size=10000):
+            for start in range(0, total, batch_size):
+                ids = list(range(start + 1, min(start + batch_size, total) + 1))
+                yield ids, np.stack([
+                    embed_job(
+                        ' '.join(rng.sample(WORDS, 3)),
+                        ' '.join(rng.sample(WORDS + SKILLS, 20)),
+                        '',
+                        rng.sample(SKILLS, rng.randint(3, 10)),
+                        dim
+                    )
+                    for _ in ids
+                ])
+
+        with tempfile.TemporaryDirectory() as path:
+            index = JobEmbeddingIndex(path, dim)
+            started = time.perf_counter()
+            index.rebuild(batches(), nlist=nlist)
+            self.stdout.write(f"Built index of {total} jobs, {nlist} IVF lists in {time.perf_counter() - started:.1f}s")
+
+            brute, ivf, recall = [], [], []
+            for _ in range(options['queries']):
+                query = embed_resume(rng.sample(SKILLS, rng.randint(3, 12)), [], dim)
+                started = time.perf_counter()
+                exact = index.search(query, options['top_k'], nprobe=0)
+                brute.append(time.perf_counter() - started)
+                started = time.perf_counter()
+                approximate = index.search(query, options['top_k'], nprobe=options['nprobe'])
+                ivf.append(time.perf_counter() - started)
+                recall.append(len({job_id for job_id, _ in exact} & {job_id for job_id, _ in approximate}) / max(len(exact), 1))
+
+            for name, timings in (('brute force', brute), (f"IVF nprobe={options['nprobe']}", ivf)):
+                timings.sort()
+                self.stdout.write(
+                    f"{name}: median {timings[len(timings) // 2] * 1000:.1f}ms, max {timings[-1] * 1000:.1f}ms"
+                )
+            self.stdout.write(f"IVF recall@{options['top_k']}: {sum(recall) / len(recall):.2f}")
@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand
+from api.utils.local_matcher import LocalMatchIndex
+import random
+import time
+
+SKILLS = [
+    'Python', 'Django', 'Flask', 'FastAPI', 'PostgreSQL', 'MySQL', 'Redis', 'Docker',
+    'Kubernetes', 'AWS', 'Linux', 'Git', 'React', 'TypeScript', 'JavaScript', 'Go',
+    'Java', 'Spring', 'Kotlin', 'C++', 'C#', '.NET', 'SQL', 'Kafka', 'RabbitMQ',
+    'Celery', 'Pandas', 'NumPy', 'PyTorch', 'TensorFlow', 'Airflow', 'Spark', 'Terraform',
+    'Ansible', 'CI/CD', 'GraphQL', 'REST', 'Vue.js', 'Angular', 'Node.js', 'PHP', 'Laravel',
+]
+WORDS = ['backend', 'frontend', 'developer', 'engineer', 'data', 'platform', 'senior',
+         'team', 'services', 'design', 'scalable', 'cloud', 'testing', 'api', 'analytics']
+
+
+class Command(BaseCommand):
+    help = "Time the local first-stage matcher on synthetic jobs"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--jobs', type=int, default=100000)
+        parser.add_argument('--queries', type=int, default=20)
+        parser.add_argument('--top-k', type=int, default=50)
+
+    def handle(self, *args, **options):
+        rng = random.Random(42)
+        jobs = [
+            (
+                i,
+                ' '.join(rng.sample(WORDS, 3)),
+                ' '.join(rng.sample(WORDS + SKILLS, 20)),
+                rng.sample(SKILLS, rng.randint(3, 10))
+            )
+            for i in range(options['jobs'])
+        ]
+
+        started = time.perf_counter()
+        index = LocalMatchIndex(jobs)
+        self.stdout.write(
+            f"Built index of {len(index)} jobs, {len(index.vocabulary)} terms, "
+            f"{len(index.columns)} entries in {time.perf_counter() - started:.2f}s"
+        )
+
+        timings = []
+        for _ in range(options['queries']):
+            skills = rng.sample(SKILLS, rng.randint(3, 12))
+            started = time.perf_counter()
+            index.top_k(skills, options['top_k'])
+            timings.append(time.perf_counter() - started)
+        timings.sort()
+        self.stdout.write(
+            f"top-{options['top_k']} over {len(index)} jobs: "
+            f"median {timings[len(timings) // 2] * 1000:.1f}ms, max {timings[-1] * 1000:.1f}ms"
+        )
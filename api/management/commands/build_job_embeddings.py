@@ -0,0 +1,43 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from api.models import Job
+from api.utils.job_embeddings import embed_job, get_job_index
+import numpy as np
+import math
+import time
+
+
+class Command(BaseCommand):
+    help = "Rebuild the job embedding index from all active jobs, optionally training IVF lists"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--nlist', type=int, default=None,
+                            help="IVF lists to train; defaults to sqrt(jobs) above 50k jobs, 0 for brute force only")
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        index = get_job_index()
+        jobs = Job.objects.filter(is_active=True)
+        total = jobs.count()
+        nlist = options['nlist']
+        if nlist is None:
+            nlist = int(math.sqrt(total)) if total > 50000 else 0
+
+        def batches():
+            ids, vectors = [], []
+            rows = jobs.values_list('id', 'title', 'requirements', 'description', 'required_skills')
+            for job_id, title, requirements, description, skills in rows.iterator(chunk_size=options['batch_size']):
+                ids.append(job_id)
+                vectors.append(embed_job(title, requirements, description, skills, index.dim))
+                if len(ids) >= options['batch_size']:
+                    yield ids, np.stack(vectors)
+                    ids, vectors = [], []
+            if ids:
+                yield ids, np.stack(vectors)
+
+        started = time.perf_counter()
+        size = index.rebuild(batches(), nlist=nlist)
+        self.stdout.write(
+            f"Indexed {size} jobs ({settings.JOB_EMBEDDING_DIM} dims, {nlist or 'no'} IVF lists) "
+            f"in {time.perf_counter() - started:.1f}s"
+        )
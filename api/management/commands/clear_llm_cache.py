@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand, CommandError
+from api.utils.ai_service import AIService
+from api.utils.llm_cache import get_llm_cache
+
+
+class Command(BaseCommand):
+    help = "Drop cached LLM completions, e.g. after changing a prompt without bumping its version"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--operation', choices=sorted(AIService.PROMPT_VERSIONS),
+                            help="Only drop completions of this AIService operation")
+
+    def handle(self, *args, **options):
+        cache = get_llm_cache()
+        if cache is None:
+            raise CommandError("The LLM cache is disabled (LLM_CACHE_BACKEND is empty)")
+        removed = cache.invalidate(options['operation'])
+        self.stdout.write(f"Removed {removed} cached completions")
@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand
+from api.models import Job, Resume
+from api.utils.skill_extractor import get_skill_extractor, job_skills
+import time
+
+
+class Command(BaseCommand):
+    help = "Add skills found in the skill dictionary to existing jobs and processed resumes"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--jobs-only', action='store_true')
+        parser.add_argument('--resumes-only', action='store_true')
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        if not options['resumes_only']:
+            self._backfill(
+                Job.objects.filter(is_active=True).only('title', 'description', 'requirements', 'required_skills'),
+                'required_skills',
+                lambda job: job_skills(job.title, job.description, job.requirements, job.required_skills),
+                options['batch_size']
+            )
+        if not options['jobs_only']:
+            extractor = get_skill_extractor()
+            self._backfill(
+                Resume.objects.exclude(parsed_content=None).only('parsed_content', 'skills'),
+                'skills',
+                lambda resume: extractor.merge(extractor.extract(str(resume.parsed_content)), resume.skills),
+                options['batch_size']
+            )
+
+    def _backfill(self, queryset, field, skills_of, batch_size):
+        model = queryset.model
+        started = time.perf_counter()
+        scanned = changed = 0
+        batch = []
+        for obj in queryset.iterator(chunk_size=batch_size):
+            scanned += 1
+            skills = skills_of(obj)
+            if skills != getattr(obj, field):
+                setattr(obj, field, skills)
+                batch.append(obj)
+            if len(batch) >= batch_size:
+                changed += len(batch)
+                model.objects.bulk_update(batch, [field])
+                batch = []
+        if batch:
+            changed += len(batch)
+            model.objects.bulk_update(batch, [field])
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f"{model.__name__}: scanned {scanned}, updated {changed} in {elapsed:.1f}s "
+            f"({scanned / elapsed if elapsed else 0:.0f}/s)"
+        )
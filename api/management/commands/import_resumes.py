@@ -0,0 +1,99 @@
+from pathlib import Path, PurePosixPath
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from api.utils.resume_import import import_source
+import csv
+import time
+
+
+class Command(BaseCommand):
+    help = (
+        "Import a directory or zip/tar archive of resumes (PDF, DOCX, TXT) for their users. "
+        "Safe to re-run: files already imported for a user are skipped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('source', help="Directory or archive of resume files")
+        parser.add_argument('--user', help="Username that owns files the mapping does not cover")
+        parser.add_argument('--mapping',
+                            help="CSV of path,username rows; a path may be a file or a directory "
+                                 "relative to the source, and the deepest match wins")
+        parser.add_argument('--workers', type=int, default=settings.RESUME_PARSER_WORKERS or 1,
+                            help="Extraction processes")
+        parser.add_argument('--batch-size', type=int, default=200, help="Resumes written per transaction")
+        parser.add_argument('--no-analyze', action='store_true',
+                            help="Keep dictionary skills only instead of queueing the AI parse")
+        parser.add_argument('--failures', help="Write failed files and their errors to this CSV")
+
+    def handle(self, *args, **options):
+        source = Path(options['source'])
+        if not source.exists():
+            raise CommandError(f"{source} does not exist")
+        users = self._user_lookup(options['user'], options['mapping'])
+
+        last_report = [time.perf_counter(), time.perf_counter()]
+
+        def on_progress(stats):
+            now = time.perf_counter()
+            if now - last_report[1] >= 5:
+                done = stats['imported'] + stats['skipped'] + stats['failed']
+                self.stdout.write(
+                    f"{done} files: {stats['imported']} imported, {stats['skipped']} skipped, "
+                    f"{stats['failed']} failed ({done / (now - last_report[0]):.1f} files/s)"
+                )
+                last_report[1] = now
+
+        importer, stats = import_source(
+            source,
+            users=users,
+            workers=options['workers'],
+            batch_size=options['batch_size'],
+            analyze=not options['no_analyze'],
+            on_progress=on_progress
+        )
+
+        processed = stats['imported'] + stats['skipped'] + stats['failed']
+        rate = processed / stats['seconds'] if stats['seconds'] else 0
+        self.stdout.write(
+            f"{stats['files']} files in {stats['seconds']}s ({rate:.1f} files/s): "
+            f"{stats['imported']} imported, {stats['skipped']} already imported, "
+            f"{stats['failed']} failed, {stats['unmapped']} without a user"
+        )
+        for reason, count in stats['failure_reasons'].items():
+            self.stdout.write(f"  {count:>6}  {reason}")
+        if options['failures'] and importer.failures:
+            with open(options['failures'], 'w', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(['path', 'error'])
+                writer.writerows(importer.failures)
+            self.stdout.write(f"Failures written to {options['failures']}")
+
+    def _user_lookup(self, default_username, mapping_path):
+        if not default_username and not mapping_path:
+            raise CommandError("Give --user, --mapping or both")
+
+        def get_user(username):
+            try:
+                return User.objects.get(username=username)
+            except User.DoesNotExist:
+                raise CommandError(f"Unknown user: {username}")
+
+        default = get_user(default_username) if default_username else None
+        mapping = {}
+        if mapping_path:
+            by_name = {}
+            with open(mapping_path, newline='') as f:
+                for row in csv.DictReader(f):
+                    username = row['username'].strip()
+                    if username not in by_name:
+                        by_name[username] = get_user(username)
+                    mapping[PurePosixPath(row['path'].strip().strip('/')).as_posix()] = by_name[username]
+
+        def users(relative):
+            path = PurePosixPath(relative)
+            for candidate in [path, *path.parents]:
+                if candidate.as_posix() in mapping:
+                    return mapping[candidate.as_posix()]
+            return default
+        return users
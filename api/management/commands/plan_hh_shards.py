@@ -0,0 +1,31 @@
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from api.utils.sync_shards import plan_shards
+
+
+class Command(BaseCommand):
+    help = "Split an HH.ru sync into (query, area, date window) shards for run_hh_shards"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--query', action='append', dest='queries',
+                            help="Search text (repeatable, defaults to HH_SYNC_QUERIES)")
+        parser.add_argument('--area', action='append', dest='areas',
+                            help="HH.ru area id (repeatable, defaults to HH_SYNC_AREAS)")
+        parser.add_argument('--since', help="ISO datetime, defaults to 30 days ago")
+        parser.add_argument('--until', help="ISO datetime, defaults to now")
+        parser.add_argument('--window-hours', type=float, default=24)
+
+    def handle(self, *args, **options):
+        until = parse_datetime(options['until']) if options['until'] else timezone.now()
+        since = parse_datetime(options['since']) if options['since'] else until - timedelta(days=30)
+        created = plan_shards(
+            queries=options['queries'] or settings.HH_SYNC_QUERIES,
+            areas=options['areas'] or settings.HH_SYNC_AREAS,
+            since=since,
+            until=until,
+            window=timedelta(hours=options['window_hours'])
+        )
+        self.stdout.write(f"Created {created} shards")
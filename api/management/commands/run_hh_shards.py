@@ -0,0 +1,46 @@
+from concurrent.futures import ProcessPoolExecutor
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+from api.utils.sync_shards import run_shard_worker
+import time
+
+
+def _worker(workers, requests_per_second):
+    # Each process opens its own DB connections
+    connections.close_all()
+    return run_shard_worker(workers, requests_per_second)
+
+
+class Command(BaseCommand):
+    help = (
+        "Process pending HH.ru sync shards with several worker processes. HH_REQUESTS_PER_SECOND "
+        "is shared between the processes, so more processes add no request throughput; they "
+        "spread the parsing and database writes over more CPUs"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=1,
+                            help="Worker processes; they split HH_REQUESTS_PER_SECOND between them")
+        parser.add_argument('--workers', type=int,
+                            help="Fetch threads per process (defaults to HH_SYNC_WORKERS)")
+
+    def handle(self, *args, **options):
+        processes = options['processes']
+        # The HH.ru quota is global, so it is split between the processes
+        rps = settings.HH_REQUESTS_PER_SECOND / processes
+        started = time.perf_counter()
+
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            futures = [pool.submit(_worker, options['workers'], rps) for _ in range(processes)]
+            results = [future.result() for future in futures]
+
+        elapsed = time.perf_counter() - started
+        vacancies = sum(result['vacancies'] for result in results)
+        for index, result in enumerate(results):
+            self.stdout.write(
+                f"process {index}: shards={result['shards']} pages={result['pages']} "
+                f"vacancies={result['vacancies']} errors={result['errors']}"
+            )
+        self.stdout.write(f"{vacancies} vacancies in {elapsed:.1f}s ({vacancies / elapsed:.0f}/s)")
@@ -0,0 +1,49 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+from api.utils import background
+import threading
+import time
+
+
+class Command(BaseCommand):
+    help = "Process queued background tasks"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--kind', action='append', dest='kinds',
+                            help="Only run tasks of this kind (repeatable)")
+        parser.add_argument('--once', action='store_true',
+                            help="Exit once the queue is empty")
+        parser.add_argument('--poll-interval', type=float, default=settings.BACKGROUND_TASK_POLL_INTERVAL)
+        parser.add_argument('--concurrency', type=int, default=settings.BACKGROUND_WORKER_CONCURRENCY,
+                            help="Tasks to run at once, one thread each")
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"Worker {background.worker_name()} started with {options['concurrency']} threads")
+        threads = [
+            threading.Thread(target=self._loop, args=(options,), name=f"worker-{i}", daemon=True)
+            for i in range(max(options['concurrency'], 1))
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def _loop(self, options):
+        try:
+            while True:
+                close_old_connections()
+                background.fail_stale_tasks()
+                task = background.claim(kinds=options['kinds'])
+                if task is None:
+                    if options['once']:
+                        return
+                    time.sleep(options['poll_interval'])
+                    continue
+
+                self.stdout.write(f"Running {task}")
+                background.run(task)
+                self.stdout.write(f"Finished {task}")
+        finally:
+            # Each thread has its own connection
+            connection.close()
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand, CommandError
+from api.utils import background
+
+
+class Command(BaseCommand):
+    help = "Sync vacancies from HH.ru, holding the same lock as background syncs"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--query', action='append', dest='queries',
+                            help="Search text to fan out over (repeatable, defaults to HH_SYNC_QUERIES)")
+        parser.add_argument('--area', action='append', dest='areas',
+                            help="HH.ru area id to fan out over (repeatable, defaults to HH_SYNC_AREAS)")
+        parser.add_argument('--full', action='store_true',
+                            help="Ignore checkpoints and walk every page")
+        parser.add_argument('--workers', type=int)
+        parser.add_argument('--enqueue', action='store_true',
+                            help="Only queue the sync for a worker and print the task id")
+
+    def handle(self, *args, **options):
+        params = {
+            key: options[key] for key in ('queries', 'areas', 'full', 'workers')
+            if options[key] is not None
+        }
+        task, created = background.enqueue('hh_sync', params)
+        if not created:
+            raise CommandError(f"An HH.ru sync is already {task.status} (task #{task.id})")
+        if options['enqueue']:
+            self.stdout.write(f"Queued task #{task.id}")
+            return
+
+        if background.claim(task_id=task.id) is None:
+            raise CommandError(f"Could not start task #{task.id}, another sync is running")
+        task.refresh_from_db()
+        background.run(task)
+        if task.status == 'failed':
+            raise CommandError(task.error)
+
+        stats = dict(task.result)
+        sections = {name: stats.pop(name) for name in ('cache', 'skill_suggestions') if name in stats}
+        self.stdout.write(' '.join(f"{key}={value}" for key, value in stats.items()))
+        for name, section in sections.items():
+            self.stdout.write(f"{name} " + ' '.join(f"{key}={value}" for key, value in section.items()))
@@ -0,0 +1,21 @@
+from .utils import metrics
+import time
+
+class MetricsMiddleware:
+    """
+    Count API requests and time them by URL name. Streaming responses are
+    timed to when their headers are ready, not to the end of the stream.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        response = self.get_response(request)
+        # Unresolved paths (404s, static files) share one label to keep the series bounded
+        match = request.resolver_match
+        view = match.url_name or match.view_name if match else 'unmatched'
+        metrics.HTTP_LATENCY.observe(time.perf_counter() - started, view=view)
+        metrics.HTTP_REQUESTS.inc(view=view, method=request.method, status=response.status_code)
+        return response
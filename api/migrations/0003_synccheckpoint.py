@@ -0,0 +1,30 @@
+# Generated by Django 5.2.1 on 2026-10-18 18:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_application_match_details_application_match_score_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(default='hh', max_length=50)),
+                ('query', models.CharField(blank=True, default='', max_length=200)),
+                ('area', models.CharField(blank=True, default='', max_length=50)),
+                ('last_published_at', models.DateTimeField(blank=True, null=True)),
+                ('next_page', models.PositiveIntegerField(default=0)),
+                ('pending_published_at', models.DateTimeField(blank=True, null=True)),
+                ('last_synced_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'unique_together': {('source', 'query', 'area')},
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.1 on 2026-10-18 18:48
+
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def delete_duplicate_jobs(apps, schema_editor):
+    # Keep the newest row of each (source, external_id) so the constraint can be added
+    Job = apps.get_model('api', 'Job')
+    duplicates = (
+        Job.objects.exclude(external_id=None)
+        .values('source', 'external_id')
+        .annotate(rows=Count('id'), keep=Max('id'))
+        .filter(rows__gt=1)
+    )
+    for dup in duplicates:
+        Job.objects.filter(
+            source=dup['source'], external_id=dup['external_id']
+        ).exclude(id=dup['keep']).delete()
+
+
+class Migration(migrations.Migration):
+    # The deletes commit in their own transaction: on Postgres they leave
+    # deferred foreign key checks pending, and ALTER TABLE refuses to run
+    # in a transaction with pending trigger events
+    atomic = False
+
+    dependencies = [
+        ('api', '0003_synccheckpoint'),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_duplicate_jobs, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='job',
+            constraint=models.UniqueConstraint(fields=('source', 'external_id'), name='unique_job_source_external_id'),
+        ),
+    ]
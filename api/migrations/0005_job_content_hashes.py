@@ -0,0 +1,23 @@
+# Generated by Django 5.2.1 on 2026-10-18 18:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_job_unique_source_external_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='content_hash',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='listing_hash',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.1 on 2026-10-18 18:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_job_content_hashes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SkillSuggestion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('normalized_title', models.CharField(max_length=200, unique=True)),
+                ('skills', models.JSONField(default=list)),
+                ('fetched_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.1 on 2026-10-18 18:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_syncshard'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['source', 'is_active'], name='api_job_source_6a1ba2_idx'),
+        ),
+    ]
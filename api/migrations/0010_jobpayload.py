@@ -0,0 +1,54 @@
+# Generated by Django 5.2.1 on 2026-10-18 18:56
+
+import django.db.models.deletion
+import json
+import zlib
+from django.db import migrations, models
+
+
+def move_raw_data_to_payloads(apps, schema_editor):
+    Job = apps.get_model('api', 'Job')
+    JobPayload = apps.get_model('api', 'JobPayload')
+
+    batch = []
+    for job_id, raw_data in Job.objects.exclude(raw_data=None).values_list('id', 'raw_data').iterator(chunk_size=1000):
+        raw = json.dumps(raw_data, ensure_ascii=False).encode('utf-8')
+        batch.append(JobPayload(job_id=job_id, data=zlib.compress(raw, 6), raw_size=len(raw)))
+        if len(batch) >= 1000:
+            JobPayload.objects.bulk_create(batch)
+            batch = []
+    JobPayload.objects.bulk_create(batch)
+
+
+def restore_raw_data(apps, schema_editor):
+    Job = apps.get_model('api', 'Job')
+    JobPayload = apps.get_model('api', 'JobPayload')
+
+    for payload in JobPayload.objects.iterator(chunk_size=1000):
+        Job.objects.filter(pk=payload.job_id).update(
+            raw_data=json.loads(zlib.decompress(bytes(payload.data)))
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_job_source_is_active_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobPayload',
+            fields=[
+                ('job', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='payload', serialize=False, to='api.job')),
+                ('data', models.BinaryField()),
+                ('raw_size', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(move_raw_data_to_payloads, restore_raw_data),
+        migrations.RemoveField(
+            model_name='job',
+            name='raw_data',
+        ),
+    ]
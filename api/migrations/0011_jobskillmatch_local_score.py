@@ -0,0 +1,28 @@
+# Generated by Django 5.2.1 on 2026-10-18 19:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_jobpayload'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobskillmatch',
+            name='local_score',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='jobskillmatch',
+            name='match_details',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='jobskillmatch',
+            name='match_score',
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
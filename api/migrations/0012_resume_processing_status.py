@@ -0,0 +1,46 @@
+# Generated by Django 5.2.1 on 2026-10-18 19:16
+
+from django.db import migrations, models
+
+
+def mark_existing_resumes(apps, schema_editor):
+    # Resumes uploaded before the queue were processed on upload
+    Resume = apps.get_model('api', 'Resume')
+    Resume.objects.exclude(parsed_content=None).update(processing_status='done')
+    Resume.objects.filter(parsed_content=None).update(processing_status='failed')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_jobskillmatch_local_score'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='backgroundtask',
+            name='attempts',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='backgroundtask',
+            name='max_attempts',
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name='backgroundtask',
+            name='run_after',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='resume',
+            name='processing_error',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='resume',
+            name='processing_status',
+            field=models.CharField(choices=[('queued', 'Queued'), ('parsing', 'Parsing'), ('analyzing', 'Analyzing'), ('done', 'Done'), ('failed', 'Failed')], default='queued', max_length=20),
+        ),
+        migrations.RunPython(mark_existing_resumes, migrations.RunPython.noop),
+    ]
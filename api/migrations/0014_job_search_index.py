@@ -0,0 +1,83 @@
+# Generated by Django 5.2.1 on 2026-10-18 20:41
+
+from django.db import migrations
+
+# Postgres: a generated column Postgres keeps current on every write, so
+# Django never reads or writes it, and a trigram index on the title that
+# catches misspelled queries the stemmed vector cannot
+POSTGRES_INSTALL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    """
+    ALTER TABLE api_job ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('russian', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('russian', coalesce(company, '')), 'B') ||
+        setweight(to_tsvector('russian', coalesce(requirements, '')), 'C') ||
+        setweight(to_tsvector('russian', regexp_replace(coalesce(description, ''), '<[^>]*>', ' ', 'g')), 'D')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS api_job_search_vector_idx ON api_job USING gin (search_vector)",
+    "CREATE INDEX IF NOT EXISTS api_job_title_trgm_idx ON api_job USING gin (title gin_trgm_ops)",
+]
+POSTGRES_DROP = [
+    "DROP INDEX IF EXISTS api_job_title_trgm_idx",
+    "DROP INDEX IF EXISTS api_job_search_vector_idx",
+    "ALTER TABLE api_job DROP COLUMN IF EXISTS search_vector",
+]
+
+# SQLite: an external-content FTS5 table over the job columns, kept in step by triggers
+SQLITE_INSTALL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS api_job_fts USING fts5(
+        title, company, requirements, description,
+        content='api_job', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS api_job_fts_insert AFTER INSERT ON api_job BEGIN
+        INSERT INTO api_job_fts(rowid, title, company, requirements, description)
+        VALUES (new.id, new.title, new.company, new.requirements, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS api_job_fts_delete AFTER DELETE ON api_job BEGIN
+        INSERT INTO api_job_fts(api_job_fts, rowid, title, company, requirements, description)
+        VALUES ('delete', old.id, old.title, old.company, old.requirements, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS api_job_fts_update AFTER UPDATE OF title, company, requirements, description ON api_job BEGIN
+        INSERT INTO api_job_fts(api_job_fts, rowid, title, company, requirements, description)
+        VALUES ('delete', old.id, old.title, old.company, old.requirements, old.description);
+        INSERT INTO api_job_fts(rowid, title, company, requirements, description)
+        VALUES (new.id, new.title, new.company, new.requirements, new.description);
+    END
+    """,
+    "INSERT INTO api_job_fts(api_job_fts) VALUES ('rebuild')",
+]
+SQLITE_DROP = [
+    "DROP TRIGGER IF EXISTS api_job_fts_insert",
+    "DROP TRIGGER IF EXISTS api_job_fts_delete",
+    "DROP TRIGGER IF EXISTS api_job_fts_update",
+    "DROP TABLE IF EXISTS api_job_fts",
+]
+
+
+def _run(statements):
+    def run(apps, schema_editor):
+        for sql in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(sql, params=None)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_resume_content'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            _run({'postgresql': POSTGRES_INSTALL, 'sqlite': SQLITE_INSTALL}),
+            _run({'postgresql': POSTGRES_DROP, 'sqlite': SQLITE_DROP}),
+        ),
+    ]
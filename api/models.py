@@ -1,7 +1,18 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
+import json
+import zlib
 
 class Resume(models.Model):
+    PROCESSING_STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('parsing', 'Parsing'),
+        ('analyzing', 'Analyzing'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='resumes')
     title = models.CharField(max_length=200)
     file = models.FileField(upload_to='resumes/')
@@ -9,12 +20,30 @@ class Resume(models.Model):
     skills = models.JSONField(null=True, blank=True)
     experience = models.JSONField(null=True, blank=True)
     education = models.JSONField(null=True, blank=True)
+    file_sha256 = models.CharField(max_length=64, blank=True, default='', db_index=True)  # Hash of the file's bytes
+    processing_status = models.CharField(max_length=20, choices=PROCESSING_STATUS_CHOICES, default='queued')
+    processing_error = models.TextField(null=True, blank=True)
     uploaded_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"{self.user.username}'s resume - {self.title}"
 
+class ResumeContent(models.Model):
+    """
+    What was extracted from a resume file, keyed by the SHA-256 of its bytes,
+    so identical uploads skip text extraction and AI parsing
+    """
+    sha256 = models.CharField(max_length=64, primary_key=True)
+    text = models.TextField(null=True, blank=True)
+    parsed = models.JSONField(null=True, blank=True)
+    parse_version = models.PositiveIntegerField(default=0)  # AIService parse_resume prompt version of ``parsed``
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Resume content {self.sha256[:12]}"
+
 class Job(models.Model):
     title = models.CharField(max_length=200)
     company = models.CharField(max_length=200)
@@ -28,13 +57,162 @@ class Job(models.Model):
     is_active = models.BooleanField(default=True)
     source = models.CharField(max_length=50, default='manual')  # 'manual', 'hh', etc.
     external_id = models.CharField(max_length=100, null=True, blank=True)
-    raw_data = models.JSONField(null=True, blank=True)  # Store complete API response
     required_skills = models.JSONField(null=True, blank=True)
     parsed_requirements = models.JSONField(null=True, blank=True)
+    listing_hash = models.CharField(max_length=64, blank=True, default='')  # Hash of the search listing item
+    content_hash = models.CharField(max_length=64, blank=True, default='')  # Hash of the normalized detail payload
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['source', 'external_id'], name='unique_job_source_external_id'),
+        ]
+        indexes = [
+            models.Index(fields=['source', 'is_active']),
+        ]
 
     def __str__(self):
         return f"{self.title} at {self.company}"
 
+class JobPayload(models.Model):
+    """
+    Complete API response of a job, zlib-compressed and kept off the Job row
+    so list queries never read it
+    """
+    job = models.OneToOneField(Job, on_delete=models.CASCADE, primary_key=True, related_name='payload')
+    data = models.BinaryField()
+    raw_size = models.PositiveIntegerField(default=0)  # Size of the uncompressed JSON
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @classmethod
+    def from_payload(cls, job, payload) -> 'JobPayload':
+        raw = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        return cls(job=job, data=zlib.compress(raw, 6), raw_size=len(raw))
+
+    @property
+    def payload(self):
+        return json.loads(zlib.decompress(self.data))
+
+    def __str__(self):
+        return f"Payload of job {self.job_id} ({len(self.data)}/{self.raw_size} bytes)"
+
+class SyncCheckpoint(models.Model):
+    """
+    Incremental sync position for one (source, query, area) search
+    """
+    source = models.CharField(max_length=50, default='hh')
+    query = models.CharField(max_length=200, blank=True, default='')
+    area = models.CharField(max_length=50, blank=True, default='')
+    last_published_at = models.DateTimeField(null=True, blank=True)  # Watermark of the last completed walk
+    next_page = models.PositiveIntegerField(default=0)  # Page cursor of an unfinished walk
+    next_date_to = models.DateTimeField(null=True, blank=True)  # Search end of an unfinished walk narrowed past the depth limit
+    pending_published_at = models.DateTimeField(null=True, blank=True)  # Newest posting seen by the unfinished walk
+    last_synced_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('source', 'query', 'area')
+
+    def complete(self):
+        if self.pending_published_at and (not self.last_published_at
+                                          or self.pending_published_at > self.last_published_at):
+            self.last_published_at = self.pending_published_at
+        self.next_page = 0
+        self.next_date_to = None
+        self.pending_published_at = None
+        self.last_synced_at = timezone.now()
+        self.save()
+
+    def __str__(self):
+        return f"{self.source} sync checkpoint ({self.query or '*'} / {self.area or '*'})"
+
+class SyncShard(models.Model):
+    """
+    One (query, area, date window) slice of a sharded sync, claimed by
+    workers through a renewable lease
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('leased', 'Leased'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    source = models.CharField(max_length=50, default='hh')
+    query = models.CharField(max_length=200, blank=True, default='')
+    area = models.CharField(max_length=50, blank=True, default='')
+    date_from = models.DateTimeField()
+    date_to = models.DateTimeField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    lease_owner = models.CharField(max_length=100, blank=True, default='')
+    lease_expires_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    stats = models.JSONField(null=True, blank=True)
+    error = models.TextField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        unique_together = ('source', 'query', 'area', 'date_from', 'date_to')
+        indexes = [
+            models.Index(fields=['status', 'lease_expires_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.source} shard {self.query or '*'} / {self.area or '*'} [{self.date_from:%Y-%m-%d %H:%M} - {self.date_to:%Y-%m-%d %H:%M}]"
+
+class SkillSuggestion(models.Model):
+    """
+    HH.ru skill suggestions memoized by normalized vacancy title
+    """
+    normalized_title = models.CharField(max_length=200, unique=True)
+    skills = models.JSONField(default=list)
+    fetched_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Skills for {self.normalized_title}"
+
+class BackgroundTask(models.Model):
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('succeeded', 'Succeeded'),
+        ('failed', 'Failed'),
+    ]
+
+    kind = models.CharField(max_length=50)  # 'hh_sync', etc.
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    params = models.JSONField(default=dict, blank=True)
+    progress = models.JSONField(default=dict, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(null=True, blank=True)
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='background_tasks')
+    worker = models.CharField(max_length=100, blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=1)
+    run_after = models.DateTimeField(null=True, blank=True)  # Set while a failed task waits to be retried
+
+    # Kinds of which at most one task may be running at a time
+    EXCLUSIVE_KINDS = ['hh_sync']
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['kind'],
+                condition=models.Q(status='running', kind__in=['hh_sync']),
+                name='unique_running_exclusive_task'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} task #{self.id} ({self.status})"
+
 class Application(models.Model):
     STATUS_CHOICES = [
         ('pending', 'Pending'),
@@ -65,8 +243,9 @@ class Application(models.Model):
 class JobSkillMatch(models.Model):
     job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='skill_matches')
     resume = models.ForeignKey(Resume, on_delete=models.CASCADE, related_name='skill_matches')
-    match_score = models.FloatField()
-    match_details = models.JSONField()
+    match_score = models.FloatField(null=True, blank=True)  # LLM score, unset until the job is analyzed
+    match_details = models.JSONField(null=True, blank=True)
+    local_score = models.FloatField(null=True, blank=True)  # Score from the local first-stage matcher
     created_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
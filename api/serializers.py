@@ -1,6 +1,6 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
-from .models import Resume, Job, Application, JobSkillMatch
+from .models import Resume, Job, Application, JobSkillMatch, BackgroundTask
 
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
@@ -14,13 +14,14 @@ class ResumeSerializer(serializers.ModelSerializer):
     class Meta:
         model = Resume
         fields = '__all__'
-        read_only_fields = ('user', 'parsed_content', 'skills', 'experience', 'education')
+        read_only_fields = ('user', 'parsed_content', 'skills', 'experience', 'education',
+                            'file_sha256', 'processing_status', 'processing_error')
 
 class JobSerializer(serializers.ModelSerializer):
     class Meta:
         model = Job
         fields = '__all__'
-        read_only_fields = ('required_skills', 'parsed_requirements', 'raw_data')
+        read_only_fields = ('required_skills', 'parsed_requirements', 'listing_hash', 'content_hash')
 
 class ApplicationSerializer(serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
@@ -39,4 +40,56 @@ class JobSkillMatchSerializer(serializers.ModelSerializer):
     class Meta:
         model = JobSkillMatch
         fields = '__all__'
-        read_only_fields = ('match_score', 'match_details')
+        read_only_fields = ('match_score', 'match_details', 'local_score')
+
+class BackgroundTaskSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = BackgroundTask
+        fields = ('id', 'kind', 'status', 'params', 'progress', 'result', 'error', 'attempts', 'max_attempts',
+                  'created_at', 'started_at', 'heartbeat_at', 'finished_at', 'run_after')
+        read_only_fields = fields
+
+class RankedMatchSerializer(serializers.ModelSerializer):
+    job = JobSerializer(read_only=True)
+
+    class Meta:
+        model = JobSkillMatch
+        fields = ('job', 'match_score', 'match_details', 'local_score', 'created_at')
+        read_only_fields = fields
+
+class LimitSerializer(serializers.Serializer):
+    """
+    The number of results a ranked listing was asked for
+    """
+    limit = serializers.IntegerField(min_value=1, required=False)
+
+    @classmethod
+    def parse(cls, data, default: int, maximum: int) -> int:
+        """
+        ``limit`` from request data or query params, capped at ``maximum``;
+        an invalid value is a 400
+        """
+        serializer = cls(data=data)
+        serializer.is_valid(raise_exception=True)
+        return min(serializer.validated_data.get('limit', default), maximum)
+
+class ResumeIdSerializer(serializers.Serializer):
+    """
+    The resume a request is about
+    """
+    resume_id = serializers.IntegerField(min_value=1)
+
+    @classmethod
+    def parse(cls, data) -> dict:
+        """
+        The ids from request data or query params; an invalid one is a 400
+        """
+        serializer = cls(data=data)
+        serializer.is_valid(raise_exception=True)
+        return serializer.validated_data
+
+class CoverLetterRequestSerializer(ResumeIdSerializer):
+    """
+    The job and resume a cover letter is written for
+    """
+    job_id = serializers.IntegerField(min_value=1)
@@ -0,0 +1,32 @@
+from .models import Job, Resume
+from .utils.background import task
+from .utils.batch_matching import score_jobs
+from .utils.hh_api import sync_vacancies
+from .utils.resume_processing import process_resume, resume_failed
+
+
+@task('hh_sync')
+def hh_sync(params, progress):
+    return sync_vacancies(
+        queries=params.get('queries'),
+        areas=params.get('areas'),
+        full=params.get('full', False),
+        workers=params.get('workers'),
+        progress=progress
+    )
+
+
+@task('batch_match')
+def batch_match(params, progress):
+    resume = Resume.objects.get(id=params['resume_id'])
+    jobs = list(Job.objects.filter(id__in=params['job_ids']))
+    return score_jobs(
+        resume, jobs, params.get('concurrency'),
+        progress=progress,
+        local_scores={int(job_id): score for job_id, score in params.get('local_scores', {}).items()}
+    )
+
+
+@task('resume_process', on_failure=lambda params, error: resume_failed(params['resume_id'], error))
+def resume_process(params, progress):
+    return process_resume(params['resume_id'], progress=progress)
@@ -0,0 +1,76 @@
+from datetime import timedelta
+from django.db import IntegrityError, transaction
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from unittest import mock
+from ..models import BackgroundTask
+from ..utils import background
+from ..utils.background import PermanentError, claim, enqueue, fail_stale_tasks, run
+
+class ExclusiveTaskTests(TestCase):
+    def test_enqueue_returns_the_active_task(self):
+        first, created = enqueue('hh_sync', {'query': 'python'})
+        second, created_again = enqueue('hh_sync', {'query': 'java'})
+        self.assertEqual((created, created_again, second.id), (True, False, first.id))
+
+    def test_database_allows_one_running_task_per_kind(self):
+        BackgroundTask.objects.create(kind='hh_sync', status='running')
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            BackgroundTask.objects.create(kind='hh_sync', status='running')
+        # Other kinds are not exclusive
+        for _ in range(2):
+            BackgroundTask.objects.create(kind='resume_process', status='running')
+
+    def test_no_claim_while_the_kind_runs(self):
+        BackgroundTask.objects.create(kind='hh_sync', status='running')
+        queued = BackgroundTask.objects.create(kind='hh_sync')
+        self.assertIsNone(claim(queued.id))
+        other = BackgroundTask.objects.create(kind='resume_process')
+        self.assertEqual(claim().id, other.id)
+
+    def test_losing_the_claim_race_returns_none(self):
+        queued = BackgroundTask.objects.create(kind='hh_sync')
+        # Another worker starts one between the busy check and the save
+        original = BackgroundTask.save
+        def save(task, *args, **kwargs):
+            BackgroundTask.objects.bulk_create([BackgroundTask(kind='hh_sync', status='running')])
+            return original(task, *args, **kwargs)
+        with mock.patch.object(BackgroundTask, 'save', save):
+            self.assertIsNone(claim(queued.id))
+        self.assertEqual(BackgroundTask.objects.get(pk=queued.pk).status, 'queued')
+
+@override_settings(BACKGROUND_TASK_RETRY_BACKOFF=10)
+class RunTests(TestCase):
+    def setUp(self):
+        self.enterContext(mock.patch.dict(background.TASK_HANDLERS))
+
+    def run_task(self, handler, max_attempts=3):
+        background.TASK_HANDLERS['test'] = handler
+        enqueue('test', max_attempts=max_attempts)
+        return run(claim(kinds=['test']))
+
+    def test_failure_is_retried_with_backoff(self):
+        def handler(params, progress):
+            raise RuntimeError("HH.ru is down")
+        task = self.run_task(handler)
+        self.assertEqual(task.status, 'queued')
+        self.assertAlmostEqual((task.run_after - timezone.now()).total_seconds(), 10, delta=2)
+        self.assertIsNone(claim(kinds=['test']))
+
+    def test_permanent_error_is_not_retried(self):
+        def handler(params, progress):
+            raise PermanentError("Bad parameters")
+        self.assertEqual(self.run_task(handler).status, 'failed')
+
+    def test_result_is_stored(self):
+        task = self.run_task(lambda params, progress: {'created': 3})
+        task.refresh_from_db()
+        self.assertEqual((task.status, task.result), ('succeeded', {'created': 3}))
+
+    def test_stale_task_is_requeued(self):
+        enqueue('test', max_attempts=2)
+        task = claim(kinds=['test'])
+        BackgroundTask.objects.filter(pk=task.pk).update(heartbeat_at=timezone.now() - timedelta(hours=1))
+        self.assertEqual(fail_stale_tasks(), 1)
+        task.refresh_from_db()
+        self.assertEqual((task.status, task.error), ('queued', 'Worker stopped responding'))
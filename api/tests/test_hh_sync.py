@@ -0,0 +1,80 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from unittest import mock
+from django.test import TestCase
+from api.models import SyncCheckpoint
+from api.utils.hh_api import HHApi, VacancySync, sync_vacancies
+import math
+
+START = datetime(2025, 5, 1, 12, 0, tzinfo=dt_timezone.utc)
+
+def vacancies(count, step=timedelta(seconds=1)):
+    """
+    Newest-first vacancies published ``step`` apart
+    """
+    return [{'id': str(i), 'published_at': START - i * step} for i in range(count)]
+
+def fake_search(vacancies):
+    """
+    HHApi.search_vacancies over a list, serving only the first MAX_SEARCH_DEPTH matches
+    """
+    def search(self, text=None, area=None, per_page=100, page=0, date_from=None, date_to=None, **kwargs):
+        matching = [
+            v for v in vacancies
+            if (date_to is None or v['published_at'] <= date_to)
+            and (date_from is None or v['published_at'] >= date_from)
+        ]
+        reachable = matching[:HHApi.MAX_SEARCH_DEPTH]
+        return {
+            'found': len(matching),
+            'pages': math.ceil(len(reachable) / per_page),
+            'items': [
+                {'id': v['id'], 'published_at': v['published_at'].isoformat()}
+                for v in reachable[page * per_page:(page + 1) * per_page]
+            ]
+        }
+    return search
+
+class WalkTests(TestCase):
+    def walk(self, items, **kwargs):
+        synced, cursors = [], []
+        with mock.patch.object(HHApi, 'search_vacancies', fake_search(items)), VacancySync(1) as run:
+            run.sync_items = lambda page_items: synced.extend(v['id'] for v in page_items) or page_items
+            completed = run.walk(on_page=lambda page, new, cursor: cursors.append(cursor), **kwargs)
+        return completed, synced, cursors, run.stats
+
+    def test_walk_past_search_depth_narrows_the_date_range(self):
+        completed, synced, cursors, stats = self.walk(vacancies(2500))
+        self.assertTrue(completed)
+        self.assertEqual(set(synced), {str(i) for i in range(2500)})
+        self.assertEqual(stats['truncated_searches'], 0)
+        # The page that reaches the depth limit resumes at its oldest posting, not at page 20
+        self.assertEqual(cursors[19], (START - 1999 * timedelta(seconds=1), 0))
+
+    def test_walk_that_cannot_be_narrowed_is_not_complete(self):
+        completed, _, _, stats = self.walk(vacancies(2500, step=timedelta(0)))
+        self.assertFalse(completed)
+        self.assertEqual(stats['truncated_searches'], 1)
+
+    def test_cursor_at_the_depth_limit_walks_the_window_again(self):
+        completed, synced, _, _ = self.walk(vacancies(300), start_page=20)
+        self.assertTrue(completed)
+        self.assertEqual(len(synced), 300)
+
+class CheckpointTests(TestCase):
+    def sync(self, items):
+        with mock.patch.object(HHApi, 'search_vacancies', fake_search(items)), \
+                mock.patch.object(VacancySync, 'sync_items', lambda self, page_items: page_items):
+            return sync_vacancies(queries=['python'], areas=['1'], workers=1)
+
+    def test_truncated_search_keeps_the_watermark(self):
+        checkpoint = SyncCheckpoint.objects.create(query='python', area='1', last_published_at=START - timedelta(days=1))
+        self.sync(vacancies(2500, step=timedelta(0)))
+        checkpoint.refresh_from_db()
+        self.assertEqual(checkpoint.last_published_at, START - timedelta(days=1))
+        self.assertIsNotNone(checkpoint.pending_published_at)
+
+    def test_narrowed_search_completes_the_checkpoint(self):
+        self.sync(vacancies(2500))
+        checkpoint = SyncCheckpoint.objects.get(query='python', area='1')
+        self.assertEqual(checkpoint.last_published_at, START)
+        self.assertEqual((checkpoint.next_page, checkpoint.next_date_to), (0, None))
@@ -0,0 +1,97 @@
+from django.test import SimpleTestCase
+from unittest import mock
+from ..utils import cache_backends
+from ..utils.cache_backends import MemoryCacheBackend, SQLiteCacheBackend
+from ..utils.http_cache import ResponseCache
+import itertools
+import requests
+import tempfile
+import json
+import os
+
+def response(status_code: int, body=None, **headers) -> requests.Response:
+    result = requests.Response()
+    result.status_code = status_code
+    result._content = json.dumps(body).encode('utf-8') if body is not None else b''
+    result.headers.update(headers)
+    return result
+
+class CacheBackendTests(SimpleTestCase):
+    def setUp(self):
+        # A clock that always moves, so recency never ties
+        self.enterContext(mock.patch.object(cache_backends.time, 'time', side_effect=itertools.count(1000)))
+
+    def check_lru(self, backend):
+        backend.set('a', b'1')
+        backend.set('b', b'2')
+        backend.get('a')
+        backend.set('c', b'3')
+        self.assertIsNotNone(backend.get('a'))
+        self.assertIsNone(backend.get('b'))
+        self.assertEqual(backend.get('c').value, b'3')
+        self.assertEqual(backend.evictions, 1)
+
+    def test_memory_evicts_least_recently_used(self):
+        self.check_lru(MemoryCacheBackend(max_entries=2))
+
+    def test_memory_evicts_down_to_the_byte_budget(self):
+        backend = MemoryCacheBackend(max_bytes=10)
+        backend.set('a', b'x' * 4)
+        backend.set('b', b'x' * 4)
+        backend.set('a', b'x' * 6)
+        backend.set('c', b'x' * 3)
+        # Rewriting 'a' made 'b' the oldest, and dropping it is enough
+        self.assertIsNone(backend.get('b'))
+        self.assertEqual(backend.get('a').value, b'x' * 6)
+        self.assertIsNotNone(backend.get('c'))
+        backend.set('d', b'x' * 10)
+        self.assertEqual([backend.get(key) is not None for key in 'acd'], [False, False, True])
+
+    def test_sqlite_evicts_least_recently_used(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        backend = SQLiteCacheBackend(os.path.join(directory.name, 'cache.sqlite3'), max_entries=2)
+        backend.EVICT_EVERY = 1
+        self.check_lru(backend)
+
+class ResponseCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.now = 1000.0
+        self.enterContext(mock.patch.object(cache_backends.time, 'time', lambda: self.now))
+        self.cache = ResponseCache(MemoryCacheBackend(), {'vacancy': 60})
+        self.sent = []
+
+    def fetch(self, reply: requests.Response, endpoint: str = 'vacancy', **options):
+        def send(headers):
+            self.sent.append(headers)
+            return reply
+        return self.cache.fetch(endpoint, 'https://api.hh.ru/vacancies/1', {'host': 'hh.ru'}, send, **options)
+
+    def test_fresh_entry_is_served_without_a_request(self):
+        self.assertEqual(self.fetch(response(200, {'id': '1'}, ETag='"v1"')), {'id': '1'})
+        self.now += 30
+        self.assertEqual(self.fetch(response(500)), {'id': '1'})
+        self.assertEqual(self.sent, [{}])
+        self.assertEqual(self.cache.stats['hits'], 1)
+
+    def test_expired_entry_is_revalidated(self):
+        self.fetch(response(200, {'id': '1'}, ETag='"v1"', **{'Last-Modified': 'Mon, 01 Jan 2024 00:00:00 GMT'}))
+        self.now += 120
+        self.assertEqual(self.fetch(response(304)), {'id': '1'})
+        self.assertEqual(self.sent[1], {'If-None-Match': '"v1"', 'If-Modified-Since': 'Mon, 01 Jan 2024 00:00:00 GMT'})
+        # A 304 makes the entry fresh again
+        self.now += 30
+        self.fetch(response(500))
+        self.assertEqual(len(self.sent), 2)
+
+    def test_forced_revalidation_and_changed_content(self):
+        self.fetch(response(200, {'id': '1', 'name': 'Old'}, ETag='"v1"'))
+        self.assertEqual(self.fetch(response(200, {'id': '1', 'name': 'New'}), revalidate=True)['name'], 'New')
+        self.assertEqual(self.fetch(response(500))['name'], 'New')
+
+    def test_uncacheable_responses_are_not_stored(self):
+        self.fetch(response(200, {'id': '1'}, **{'Cache-Control': 'no-store'}))
+        self.fetch(response(200, {'id': '1'}), endpoint='search')
+        self.assertEqual(self.cache.stats['stores'], 0)
+        with self.assertRaises(requests.HTTPError):
+            self.fetch(response(503))
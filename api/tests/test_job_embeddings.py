@@ -0,0 +1,77 @@
+from django.db import transaction
+from django.test import TestCase, override_settings
+from unittest import mock
+from ..models import Job
+from ..utils import job_embeddings
+from ..utils.job_embeddings import JobEmbeddingIndex
+import numpy as np
+import tempfile
+
+DIM = 8
+
+def unit(*weights) -> np.ndarray:
+    vector = np.zeros(DIM, dtype=np.float32)
+    vector[:len(weights)] = weights
+    return vector / np.linalg.norm(vector)
+
+class JobEmbeddingIndexTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = directory.name
+
+    def index(self) -> JobEmbeddingIndex:
+        return JobEmbeddingIndex(self.path, DIM)
+
+    def test_upsert_replaces_in_place(self):
+        index = self.index()
+        index.upsert([1, 2], np.stack([unit(1), unit(0, 1)]))
+        index.upsert([2], np.stack([unit(1, 0.1)]))
+        self.assertEqual(len(index), 2)
+        self.assertEqual([job_id for job_id, _ in index.search(unit(1), 2)], [1, 2])
+
+    def test_writes_of_another_process_are_seen(self):
+        mine, other = self.index(), self.index()
+        mine.upsert([1, 2, 3], np.stack([unit(1), unit(0, 1), unit(0, 0, 1)]))
+        other.remove([2])
+        other.upsert([4], np.stack([unit(1, 1)]))
+        # Job 2's old slot is empty now, so it gets a new one rather than reviving it
+        mine.upsert([2, 4], np.stack([unit(0, 1), unit(1, 0.5)]))
+        self.assertEqual(len(mine), 5)
+        self.assertEqual(mine.search(unit(0, 1), 1)[0][0], 2)
+        self.assertEqual(mine.remove([1, 2, 3, 4]), 4)
+        self.assertEqual(mine.search(unit(1, 1, 1), 5), [])
+
+    def test_job_changing_ivf_list_moves_to_a_new_slot(self):
+        index = self.index()
+        jobs = [(job_id, unit(1, 0.01 * job_id)) for job_id in range(1, 11)]
+        jobs += [(job_id, unit(0, 0, 1, 0.01 * job_id)) for job_id in range(11, 21)]
+        index.rebuild([([job_id for job_id, _ in jobs], np.stack([vector for _, vector in jobs]))], nlist=2)
+        self.assertEqual(index.search(unit(1), 1, nprobe=1)[0][0], 1)
+
+        index.upsert([1], np.stack([unit(0, 0, 1)]))
+        self.assertEqual(len(index), 21)
+        self.assertEqual(index.search(unit(0, 0, 1), 1, nprobe=1)[0][0], 1)
+        self.assertNotIn(1, [job_id for job_id, _ in index.search(unit(1), 20, nprobe=1)])
+
+class JobSignalTests(TestCase):
+    def setUp(self):
+        self.enterContext(override_settings(JOB_EMBEDDINGS_ENABLED=True))
+        self.update = self.enterContext(mock.patch.object(job_embeddings, 'update_job_embeddings'))
+        self.remove = self.enterContext(mock.patch.object(job_embeddings, 'remove_job_embeddings'))
+
+    def create(self, title: str) -> Job:
+        return Job.objects.create(title=title, company='Acme', source='manual', description='', requirements='')
+
+    def test_changes_of_a_transaction_are_applied_together(self):
+        gone = self.create('Gone')
+        gone_id = gone.id
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                first, second = self.create('First'), self.create('Second')
+                second.title = 'Second, renamed'
+                second.save()
+                gone.delete()
+        self.update.assert_called_once()
+        self.assertEqual({job.title for job in self.update.call_args[0][0]}, {'First', 'Second, renamed'})
+        self.remove.assert_called_once_with([gone_id])
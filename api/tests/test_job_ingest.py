@@ -0,0 +1,73 @@
+from django.test import SimpleTestCase, TestCase
+from unittest import mock
+from ..models import Job, JobPayload
+from ..utils import job_ingest
+from ..utils.hh_api import vacancy_hash
+from ..utils.job_ingest import JobIngestor, deactivate_missing, payload_hash
+
+class DeactivateMissingTests(TestCase):
+    def create(self, external_id, source='hh', is_active=True) -> Job:
+        return Job.objects.create(
+            title=f'Job {external_id}', company='Acme', description='', requirements='',
+            source=source, external_id=external_id, is_active=is_active
+        )
+
+    def test_jobs_missing_from_the_source_are_deactivated(self):
+        jobs = {external_id: self.create(external_id) for external_id in '12345'}
+        inactive = self.create('6', is_active=False)
+        manual = self.create('2', source='manual')
+        unlinked = self.create(None)
+        with mock.patch.object(job_ingest, 'remove_job_embeddings') as remove:
+            count = deactivate_missing('hh', ['1', '3', '3', 'gone'], chunk_size=2)
+
+        self.assertEqual(count, 3)
+        self.assertEqual(
+            set(Job.objects.filter(is_active=False).values_list('id', flat=True)),
+            {jobs['2'].id, jobs['4'].id, jobs['5'].id, inactive.id}
+        )
+        self.assertEqual(Job.objects.filter(pk__in=[manual.pk, unlinked.pk], is_active=True).count(), 2)
+        self.assertEqual(sorted(remove.call_args[0][0]), [jobs['2'].id, jobs['4'].id, jobs['5'].id])
+
+
+class PayloadHashTests(SimpleTestCase):
+    def test_key_order_does_not_matter(self):
+        self.assertEqual(
+            payload_hash({'id': '1', 'salary': {'from': 100, 'to': 200}}),
+            payload_hash({'salary': {'to': 200, 'from': 100}, 'id': '1'})
+        )
+
+    def test_ignored_keys_are_skipped_at_any_depth(self):
+        vacancy = {'id': '1', 'name': 'Разработчик', 'counters': {'responses': 3}, 'items': [{'relations': []}]}
+        changed = {**vacancy, 'counters': {'responses': 9}, 'items': [{'relations': ['got_response']}]}
+        self.assertEqual(vacancy_hash(vacancy), vacancy_hash(changed))
+        self.assertNotEqual(vacancy_hash(vacancy), vacancy_hash({**vacancy, 'name': 'Аналитик'}))
+
+class JobIngestorTests(TestCase):
+    def setUp(self):
+        self.enterContext(mock.patch.object(job_ingest, 'update_job_embeddings'))
+
+    def job(self, external_id: str, title: str = 'Developer', skills=('Python',)):
+        payload = {'id': external_id, 'name': title}
+        return Job(
+            title=title, company='Acme', description='', requirements='', external_id=external_id,
+            required_skills=list(skills), listing_hash=payload_hash(payload), content_hash=payload_hash(payload)
+        ), payload
+
+    def ingest(self, *jobs) -> dict:
+        ingestor = JobIngestor(batch_size=10)
+        ingestor.add(jobs)
+        ingestor.flush()
+        return ingestor.stats
+
+    def test_only_changed_jobs_are_written(self):
+        self.assertEqual(self.ingest(self.job('1'), self.job('2'))['inserted'], 2)
+        stats = self.ingest(self.job('1'), self.job('2', title='Lead developer'), self.job('3'))
+        self.assertEqual(stats, {'inserted': 1, 'updated': 1, 'unchanged': 1})
+        # Skills come from the local dictionary, which can change without the payload
+        self.assertEqual(self.ingest(self.job('1', skills=['Python', 'SQL']))['updated'], 1)
+        self.assertEqual(Job.objects.get(external_id='2').title, 'Lead developer')
+
+    def test_last_copy_in_a_batch_wins(self):
+        self.assertEqual(self.ingest(self.job('1'), self.job('1', title='Renamed'))['inserted'], 1)
+        self.assertEqual(list(Job.objects.values_list('title', flat=True)), ['Renamed'])
+        self.assertEqual(JobPayload.objects.get().payload['name'], 'Renamed')
@@ -0,0 +1,62 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from ..models import Job
+from ..utils.job_search import search_jobs
+
+def create_job(title: str, description: str = '', **fields) -> Job:
+    return Job.objects.create(
+        title=title, company=fields.pop('company', 'Acme'), description=description,
+        requirements='', source='manual', **fields
+    )
+
+class SearchJobsTests(TestCase):
+    def search(self, text: str):
+        return [job.title for job in search_jobs(Job.objects.filter(is_active=True), text)]
+
+    def test_title_matches_rank_first(self):
+        create_job('Project manager', 'Works with Python developers')
+        create_job('Python developer')
+        create_job('Accountant')
+        self.assertEqual(self.search('python'), ['Python developer', 'Project manager'])
+
+    def test_words_match_by_prefix_and_all_must_appear(self):
+        create_job('Senior developer', 'Django and PostgreSQL')
+        create_job('Developer', 'Flask')
+        self.assertEqual(self.search('develop django'), ['Senior developer'])
+
+    def test_cyrillic(self):
+        create_job('Аналитик данных')
+        self.assertEqual(self.search('аналитик'), ['Аналитик данных'])
+
+    def test_search_syntax_in_input_is_literal(self):
+        create_job('C++ developer')
+        self.assertEqual(self.search('"c++" (('), ['C++ developer'])
+        self.assertEqual(self.search('*** ""'), [])
+
+    def test_edited_and_deleted_jobs_follow(self):
+        job = create_job('Go developer')
+        job.title = 'Rust developer'
+        job.save()
+        self.assertEqual(self.search('rust'), ['Rust developer'])
+        self.assertEqual(self.search('go'), [])
+        job.delete()
+        self.assertEqual(self.search('rust'), [])
+
+class JobSearchViewTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create(username='u'))
+        for number in range(3):
+            create_job(f'Python developer {number}')
+        create_job('Python developer, closed', is_active=False)
+
+    def test_limit(self):
+        response = self.client.get(reverse('job-search'), {'q': 'python', 'limit': 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 2)
+
+    def test_invalid_limit_is_rejected(self):
+        response = self.client.get(reverse('job-search'), {'q': 'python', 'limit': 'all'})
+        self.assertEqual(response.status_code, 400)
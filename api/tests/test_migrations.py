@@ -0,0 +1,39 @@
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TransactionTestCase
+
+class DuplicateJobMigrationTests(TransactionTestCase):
+    before = [('api', '0003_synccheckpoint')]
+    after = [('api', '0004_job_unique_source_external_id')]
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        self.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_duplicates_are_deleted_before_the_constraint(self):
+        apps = self.migrate(self.before)
+        Job = apps.get_model('api', 'Job')
+        JobSkillMatch = apps.get_model('api', 'JobSkillMatch')
+        fields = dict(company='', location='', description='', requirements='', salary_range='', job_type='')
+        old = Job.objects.create(title='Old', source='hh', external_id='1', **fields)
+        new = Job.objects.create(title='New', source='hh', external_id='1', **fields)
+        other = Job.objects.create(title='Other', source='hh', external_id='2', **fields)
+        manual = [Job.objects.create(title='Manual', source='manual', **fields) for _ in range(2)]
+        # A dependent row makes the delete cascade, as it does in production
+        User = apps.get_model('auth', 'User')
+        Resume = apps.get_model('api', 'Resume')
+        resume = Resume.objects.create(user=User.objects.create(username='u'), title='r', file='r.pdf')
+        JobSkillMatch.objects.create(job=old, resume=resume, match_score=1, match_details={})
+
+        apps = self.migrate(self.after)
+        Job = apps.get_model('api', 'Job')
+        self.assertEqual(
+            set(Job.objects.values_list('id', flat=True)),
+            {new.id, other.id, *(job.id for job in manual)}
+        )
@@ -0,0 +1,11 @@
+from django.test import SimpleTestCase
+from ..utils.prompt_builder import compact_match_inputs
+
+class CompactMatchInputsTests(SimpleTestCase):
+    def test_skills_are_deduplicated_strings(self):
+        resume, job = compact_match_inputs('calculate_job_match', {
+            'skills': ['Python', {'name': 'SQL', 'level': 'senior'}, 'Python', ' Docker ', '', None, ['Go']],
+            'experience': []
+        }, {'requirements': '<p>Python &amp; SQL</p>'})
+        self.assertEqual(resume['skills'], ['Python', 'Docker'])
+        self.assertEqual(job['requirements'], 'Python & SQL')
@@ -0,0 +1,81 @@
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from pathlib import Path
+from unittest import mock
+from ..models import Resume
+from ..utils import resume_import
+from ..utils.resume_import import ResumeImporter
+from ..utils.skill_extractor import SkillExtractor
+import tempfile
+
+class FakePool:
+    """
+    Runs files in the test process; a file named crash.txt breaks the pool,
+    failing it and every file handed to the pool after it
+    """
+    def __init__(self, submitted: list):
+        self.submitted = submitted
+        self.broken = False
+        self._processes = {}
+
+    def submit(self, fn, path, *args):
+        self.submitted.append(Path(path).name)
+        future = Future()
+        self.broken = self.broken or path.endswith('crash.txt')
+        if self.broken:
+            future.set_exception(BrokenProcessPool("A process in the pool was terminated abruptly"))
+        else:
+            future.set_result(fn(path, *args))
+        return future
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        pass
+
+class ResumeImporterTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = Path(directory.name) / 'import'
+        self.root.mkdir()
+        self.enterContext(override_settings(MEDIA_ROOT=str(Path(directory.name) / 'media')))
+        self.enterContext(mock.patch.object(resume_import, '_extractor', SkillExtractor({'Python': []})))
+        self.enterContext(mock.patch.object(resume_import, '_discard_pool'))
+        self.submitted = []
+        self.enterContext(mock.patch.object(ResumeImporter, '_pool', lambda importer: FakePool(self.submitted)))
+        self.user = User.objects.create(username='u')
+
+    def write(self, name: str, text: str):
+        (self.root / name).write_text(text)
+
+    def run_import(self) -> ResumeImporter:
+        importer = ResumeImporter(self.root, users=lambda relative: self.user, workers=1, analyze=False)
+        importer.run()
+        return importer
+
+    def test_only_the_crashing_file_fails(self):
+        for number in range(3):
+            self.write(f'{number}.txt', f'Candidate {number}, Python')
+        self.write('crash.txt', 'Python')
+        importer = self.run_import()
+        self.assertEqual(importer.failures, [('crash.txt', 'Worker process died')])
+        self.assertEqual((importer.stats['imported'], importer.stats['failed']), (3, 1))
+        self.assertEqual(
+            sorted(Resume.objects.values_list('title', 'skills')),
+            [('0', ['Python']), ('1', ['Python']), ('2', ['Python'])]
+        )
+
+    def test_imported_files_are_skipped_before_extraction(self):
+        self.write('a.txt', 'Python')
+        self.run_import()
+        self.write('b.txt', 'Python, again')
+        self.submitted.clear()
+        importer = self.run_import()
+        self.assertEqual(self.submitted, ['b.txt'])
+        self.assertEqual((importer.stats['imported'], importer.stats['skipped']), (1, 1))
+
+    def test_long_file_names_fit_the_title(self):
+        self.write(f"{'x' * 240}.txt", 'Python')
+        self.run_import()
+        self.assertEqual(Resume.objects.get().title, 'x' * 200)
@@ -0,0 +1,57 @@
+from concurrent.futures.process import BrokenProcessPool
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from unittest import mock
+from ..models import Resume
+from ..utils import resume_parser
+from ..utils.background import PermanentError
+from ..utils.resume_parser import ResumeParser
+from ..utils.resume_processing import process_resume
+import tempfile
+import io
+
+class ExtractTextTests(TestCase):
+    def extract(self, error):
+        with mock.patch.object(resume_parser, '_extract_in_pool', side_effect=error):
+            return ResumeParser.extract_text(io.BytesIO(b'%PDF'), 'application/pdf')
+
+    def test_unreadable_file_gives_no_text(self):
+        self.assertIsNone(self.extract(ValueError("EOF marker not found")))
+
+    def test_unsupported_type_gives_no_text(self):
+        self.assertIsNone(ResumeParser.extract_text(io.BytesIO(b'x'), 'image/png'))
+
+    def test_timeout_is_raised(self):
+        with self.assertRaises(TimeoutError):
+            self.extract(TimeoutError("Resume extraction did not finish in 30s"))
+
+    def test_crashed_pool_is_raised(self):
+        with self.assertRaises(BrokenProcessPool):
+            self.extract(BrokenProcessPool("A process in the pool was terminated"))
+
+class ProcessResumeTests(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media.name))
+        self.resume = Resume.objects.create(
+            user=User.objects.create(username='u'), title='CV',
+            file=SimpleUploadedFile('cv.pdf', b'%PDF-1.4')
+        )
+
+    def process(self, **extract):
+        with mock.patch.object(ResumeParser, 'extract_text', **extract):
+            process_resume(self.resume.id)
+
+    def test_transient_error_requeues(self):
+        with self.assertRaises(TimeoutError):
+            self.process(side_effect=TimeoutError("Resume extraction did not finish in 30s"))
+        self.resume.refresh_from_db()
+        self.assertEqual(self.resume.processing_status, 'queued')
+
+    def test_file_without_text_fails(self):
+        with self.assertRaises(PermanentError):
+            self.process(return_value=None)
+        self.resume.refresh_from_db()
+        self.assertEqual(self.resume.processing_status, 'failed')
@@ -0,0 +1,43 @@
+from django.test import SimpleTestCase
+from ..utils.skill_extractor import SkillExtractor
+
+class SkillExtractorTests(SimpleTestCase):
+    def setUp(self):
+        self.extractor = SkillExtractor({
+            'Python': ['python3', 'питон'],
+            'Go': ['=Go', '=Golang', 'golang'],
+            'C++': ['cpp'],
+            'Machine Learning': ['ML', 'машинное обучение'],
+            'Learning Management': [],
+            'SQL': [],
+            'PostgreSQL': ['postgres'],
+            'Отчётность': [],
+        })
+
+    def test_skills_in_order_of_first_mention(self):
+        self.assertEqual(
+            self.extractor.extract('SQL и Python3, потом снова python', 'PostgreSQL, C++'),
+            ['SQL', 'Python', 'PostgreSQL', 'C++']
+        )
+
+    def test_aliases_match_on_word_boundaries(self):
+        self.assertEqual(self.extractor.extract('Google, go_to, mysql, html, Pythonic'), [])
+        self.assertEqual(self.extractor.extract('(sql)/postgres'), ['SQL', 'PostgreSQL'])
+
+    def test_exact_aliases_need_their_case(self):
+        self.assertEqual(self.extractor.extract('Let us go home'), [])
+        self.assertEqual(self.extractor.extract('Go and golang'), ['Go'])
+
+    def test_overlaps_resolve_leftmost_then_longest(self):
+        self.assertEqual(self.extractor.extract('machine learning management'), ['Machine Learning'])
+
+    def test_cyrillic_and_yo(self):
+        self.assertEqual(self.extractor.extract('Опыт: Машинное обучение, питон, отчетность'), [
+            'Machine Learning', 'Python', 'Отчётность'
+        ])
+
+    def test_merge_canonicalizes_and_drops_duplicates(self):
+        self.assertEqual(
+            self.extractor.merge(['python3', 'Docker'], ['Python', 'docker', {'name': 'SQL'}, ' ', None], None),
+            ['Python', 'Docker']
+        )
@@ -0,0 +1,58 @@
+from datetime import timedelta
+from unittest import mock
+from django.conf import settings
+from django.test import TestCase
+from django.utils import timezone
+from api.models import SyncShard
+from api.utils.hh_api import HHApi, VacancySync
+from api.utils.sync_shards import claim_shard, process_shard
+from .test_hh_sync import START, fake_search, vacancies
+
+class ClaimShardTests(TestCase):
+    def shard(self, **fields):
+        return SyncShard.objects.create(
+            query='python', area='1', date_from=START - timedelta(days=1), date_to=START, **fields
+        )
+
+    def test_claims_pending_shard(self):
+        shard = self.shard()
+        claimed = claim_shard('worker-a')
+        self.assertEqual(claimed.pk, shard.pk)
+        self.assertEqual((claimed.status, claimed.lease_owner, claimed.attempts), ('leased', 'worker-a', 1))
+        self.assertIsNone(claim_shard('worker-b'))
+
+    def test_reclaims_expired_lease(self):
+        shard = self.shard(status='leased', lease_owner='dead', lease_expires_at=timezone.now() - timedelta(seconds=1), attempts=1)
+        claimed = claim_shard('worker-a')
+        self.assertEqual((claimed.pk, claimed.lease_owner, claimed.attempts), (shard.pk, 'worker-a', 2))
+
+    def test_live_lease_is_not_taken(self):
+        self.shard(status='leased', lease_owner='alive', lease_expires_at=timezone.now() + timedelta(minutes=5), attempts=1)
+        self.assertIsNone(claim_shard('worker-a'))
+
+    def test_lease_expired_on_last_attempt_fails_the_shard(self):
+        shard = self.shard(
+            status='leased', lease_owner='dead', lease_expires_at=timezone.now() - timedelta(seconds=1),
+            attempts=settings.HH_SHARD_MAX_ATTEMPTS
+        )
+        self.assertIsNone(claim_shard('worker-a'))
+        shard.refresh_from_db()
+        self.assertEqual(shard.status, 'failed')
+
+class ProcessShardTests(TestCase):
+    def process(self, items):
+        shard = SyncShard.objects.create(query='python', area='1', date_from=START - timedelta(days=1), date_to=START)
+        shard = claim_shard('worker-a')
+        with mock.patch.object(HHApi, 'search_vacancies', fake_search(items)), VacancySync(1) as run:
+            run.sync_items = lambda page_items: page_items
+            process_shard(shard, 'worker-a', run)
+        shard.refresh_from_db()
+        return shard
+
+    def test_shard_is_done(self):
+        self.assertEqual(self.process(vacancies(150)).status, 'done')
+
+    def test_truncated_shard_fails_without_retry(self):
+        shard = self.process(vacancies(2500, step=timedelta(0)))
+        self.assertEqual(shard.status, 'failed')
+        self.assertIn('could not narrow down', shard.error)
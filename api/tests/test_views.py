@@ -0,0 +1,45 @@
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from ..models import Resume
+import tempfile
+
+class ViewTestCase(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media.name))
+        self.user = User.objects.create(username='u')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+class ResumeUploadViewTests(ViewTestCase):
+    def test_title_is_the_file_name_cut_to_fit(self):
+        response = self.client.post(reverse('resume-upload'), {
+            'file': SimpleUploadedFile(f"{'x' * 240}.txt", b'Python developer', content_type='text/plain')
+        })
+        self.assertEqual(response.status_code, 202)
+        resume = Resume.objects.get()
+        self.assertEqual(resume.title, 'x' * 200)
+        self.assertEqual(resume.processing_status, 'queued')
+
+class ResumeIdValidationTests(ViewTestCase):
+    def test_invalid_resume_id_is_rejected(self):
+        requests = [
+            ('get', 'job-recommended', {'resume_id': 'abc'}),
+            ('post', 'match-batch', {'resume_id': 'abc'}),
+            ('post', 'match-local', {'resume_id': '1; drop'}),
+            ('post', 'cover-letter-stream', {'resume_id': 'abc', 'job_id': 1}),
+            ('post', 'cover-letter-stream', {'resume_id': 1, 'job_id': 'abc'}),
+        ]
+        for method, name, data in requests:
+            with self.subTest(name=name, data=data):
+                response = getattr(self.client, method)(reverse(name), data, format=None if method == 'get' else 'json')
+                self.assertEqual(response.status_code, 400)
+
+    def test_other_users_resume_is_not_found(self):
+        other = Resume.objects.create(user=User.objects.create(username='other'), title='CV', file='cv.pdf')
+        response = self.client.post(reverse('match-local'), {'resume_id': other.id}, format='json')
+        self.assertEqual(response.status_code, 404)
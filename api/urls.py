@@ -5,6 +5,7 @@ from . import views
 
 router = DefaultRouter()
 router.register(r'users', views.UserViewSet)
+router.register(r'resumes', views.ResumeViewSet)
 
 urlpatterns = [
     # Router URLs
@@ -12,11 +13,31 @@ urlpatterns = [
     # Job endpoints
     path('jobs/', views.JobListView.as_view(), name='job-list'),
     path('jobs/<int:pk>/', views.JobDetailView.as_view(), name='job-detail'),
+    path('jobs/<int:pk>/raw/', views.JobRawDataView.as_view(), name='job-raw-data'),
     path('jobs/search/', views.JobSearchView.as_view(), name='job-search'),
+    path('jobs/recommended/', views.JobRecommendationView.as_view(), name='job-recommended'),
+    path('jobs/sync/', views.HHSyncView.as_view(), name='job-sync'),
+
+    # Matching endpoints
+    path('matches/batch/', views.BatchMatchView.as_view(), name='match-batch'),
+    path('matches/batch/<int:pk>/', views.BatchMatchResultView.as_view(), name='match-batch-results'),
+    path('matches/local/', views.LocalMatchView.as_view(), name='match-local'),
+
+    # LLM client and cache statistics, cache invalidation
+    path('ai/client/', views.LLMClientStatsView.as_view(), name='llm-client'),
+    path('ai/cache/', views.LLMCacheView.as_view(), name='llm-cache'),
+
+    # Prometheus metrics
+    path('metrics', views.metrics_view, name='metrics'),
+
+    # Background task status
+    path('tasks/queue/', views.TaskQueueView.as_view(), name='task-queue'),
+    path('tasks/<int:pk>/', views.BackgroundTaskDetailView.as_view(), name='task-detail'),
     
     # Application endpoints
     path('applications/', views.ApplicationListView.as_view(), name='application-list'),
     path('applications/<int:pk>/', views.ApplicationDetailView.as_view(), name='application-detail'),
+    path('applications/cover-letter/stream/', views.CoverLetterStreamView.as_view(), name='cover-letter-stream'),
     
     # Profile endpoints
     path('profile/', views.ProfileView.as_view(), name='profile'),
@@ -1,87 +1,230 @@
-import openai
-from typing import Dict, List
+from typing import Callable, Dict, Iterator, List, Optional
 import json
 import logging
-from django.conf import settings
+import time
+from .llm_cache import LLMCache, get_llm_cache
+from .llm_client import get_llm_client, get_llm_fallback
+from .llm_providers import BaseLLMProvider
+from . import metrics
+from .prompt_builder import compact_json, compact_match_inputs, compact_resume_text
 
 logger = logging.getLogger(__name__)
 
 class AIService:
-    def __init__(self):
-        openai.api_key = settings.OPENAI_API_KEY
+    MODEL = "gpt-4"
+    # Bump an operation's version whenever its prompt changes so cached completions of the old prompt are not reused
+    PROMPT_VERSIONS = {
+        'parse_resume': 1,
+        'calculate_job_match': 2,
+        'generate_cover_letter': 2,
+    }
+
+    def __init__(
+        self,
+        cache: Optional[LLMCache] = None,
+        client: Optional[BaseLLMProvider] = None,
+        fallback: Optional[BaseLLMProvider] = None
+    ):
+        self.cache = cache or get_llm_cache()
+        self.client = client or get_llm_client()
+        self.fallback = fallback or get_llm_fallback()
+
+    def _cache_key(self, operation: str, messages: List[Dict], params: Dict) -> Optional[str]:
+        if self.cache is None:
+            return None
+        # Answers of different providers never stand in for each other
+        model = f"{self.client.name}:{self.MODEL}"
+        return LLMCache.make_key(operation, self.PROMPT_VERSIONS[operation], model, messages, params)
+
+    def _fall_back(self, operation: str, error: Exception) -> BaseLLMProvider:
+        """
+        The provider to retry a failed call with; re-raises ``error`` when there is none
+        """
+        if self.fallback is None:
+            raise error
+        logger.warning(f"{self.client.name} failed on {operation} ({error}), answering with {self.fallback.name}")
+        return self.fallback
+
+    def _cached(self, operation: str, key: Optional[str]) -> Optional[str]:
+        if key is None:
+            return None
+        content = self.cache.get(operation, key)
+        metrics.LLM_CACHE_LOOKUPS.inc(operation=operation, result='miss' if content is None else 'hit')
+        return content
+
+    @staticmethod
+    def _observe(operation: str, provider: BaseLLMProvider, started: float, outcome: str):
+        metrics.LLM_LATENCY.observe(time.perf_counter() - started, operation=operation, provider=provider.name)
+        metrics.LLM_REQUESTS.inc(operation=operation, provider=provider.name, outcome=outcome)
+
+    def _complete(
+        self,
+        operation: str,
+        messages: List[Dict],
+        parse: Callable[[str], object] = str,
+        **params
+    ):
+        """
+        Run a chat completion, serving identical requests from the LLM cache.
+        ``parse`` runs before anything is stored, so unparseable replies are
+        not cached; neither are answers from the fallback provider.
+        """
+        key = self._cache_key(operation, messages, params)
+        content = self._cached(operation, key)
+        if content is not None:
+            return parse(content)
+
+        started = time.perf_counter()
+        try:
+            content = self.client.chat(messages, self.MODEL, **params)
+        except Exception as e:
+            self._observe(operation, self.client, started, 'error')
+            fallback = self._fall_back(operation, e)
+            started = time.perf_counter()
+            try:
+                content = fallback.chat(messages, self.MODEL, **params)
+            except Exception:
+                self._observe(operation, fallback, started, 'error')
+                raise
+            self._observe(operation, fallback, started, 'fallback')
+            return parse(content)
+        self._observe(operation, self.client, started, 'ok')
+        result = parse(content)
+        if key is not None:
+            self.cache.set(operation, key, content)
+        return result
+
+    async def _acomplete(
+        self,
+        operation: str,
+        messages: List[Dict],
+        parse: Callable[[str], object] = str,
+        **params
+    ):
+        """
+        Async _complete()
+        """
+        key = self._cache_key(operation, messages, params)
+        content = self._cached(operation, key)
+        if content is not None:
+            return parse(content)
+
+        started = time.perf_counter()
+        try:
+            content = await self.client.achat(messages, self.MODEL, **params)
+        except Exception as e:
+            self._observe(operation, self.client, started, 'error')
+            fallback = self._fall_back(operation, e)
+            started = time.perf_counter()
+            try:
+                content = await fallback.achat(messages, self.MODEL, **params)
+            except Exception:
+                self._observe(operation, fallback, started, 'error')
+                raise
+            self._observe(operation, fallback, started, 'fallback')
+            return parse(content)
+        self._observe(operation, self.client, started, 'ok')
+        result = parse(content)
+        if key is not None:
+            self.cache.set(operation, key, content)
+        return result
+
+    async def aclose(self):
+        """
+        Close what async calls opened on the running event loop
+        """
+        await self.client.aclose()
+        if self.fallback is not None:
+            await self.fallback.aclose()
 
     def parse_resume(self, text: str) -> Dict:
         """
-        Parse resume text using OpenAI to extract structured information
+        Parse resume text using the LLM provider to extract structured information
         """
         try:
-            response = openai.ChatCompletion.create(
-                model="gpt-4",
-                messages=[
+            return self._complete(
+                'parse_resume',
+                [
                     {
                         "role": "system",
                         "content": "You are a helpful assistant that extracts structured information from resumes."
                     },
                     {
                         "role": "user",
-                        "content": f"Please extract the following information from this resume and return it as JSON: skills, experience, education, and key achievements. Here's the resume:\n\n{text}"
+                        "content": f"Please extract the following information from this resume and return it as JSON: skills, experience, education, and key achievements. Here's the resume:\n\n{compact_resume_text(text)}"
                     }
                 ],
+                parse=json.loads,
                 temperature=0.3,
                 max_tokens=1000
             )
-            
-            # Extract the JSON from the response
-            return json.loads(response.choices[0].message.content)
         except Exception as e:
-            logger.error(f"Error parsing resume with OpenAI: {str(e)}")
+            logger.error(f"Error parsing resume with {self.client.name}: {str(e)}")
             return {}
 
-    def calculate_job_match(self, resume_data: Dict, job_data: Dict) -> Dict:
-        """
-        Calculate the match score between a resume and a job posting
-        """
-        try:
-            # Prepare the comparison data
-            comparison_text = f"""
+    @staticmethod
+    def _job_match_messages(resume_data: Dict, job_data: Dict) -> List[Dict]:
+        resume_data, job_data = compact_match_inputs('calculate_job_match', resume_data, job_data)
+        # Prepare the comparison data
+        comparison_text = f"""
             Resume Skills: {', '.join(resume_data.get('skills', []))}
-            Resume Experience: {json.dumps(resume_data.get('experience', []))}
+            Resume Experience: {compact_json(resume_data.get('experience', []))}
             
             Job Title: {job_data['title']}
             Job Requirements: {job_data['requirements']}
             Required Skills: {', '.join(job_data.get('required_skills', []))}
             """
 
-            response = openai.ChatCompletion.create(
-                model="gpt-4",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an AI recruiter that analyzes the match between candidates and job postings."
-                    },
-                    {
-                        "role": "user",
-                        "content": f"Analyze the match between this resume and job posting. Provide a match score (0-100) and detailed analysis. Return as JSON with 'score' and 'analysis' fields.\n\n{comparison_text}"
-                    }
-                ],
+        return [
+            {
+                "role": "system",
+                "content": "You are an AI recruiter that analyzes the match between candidates and job postings."
+            },
+            {
+                "role": "user",
+                "content": f"Analyze the match between this resume and job posting. Provide a match score (0-100) and detailed analysis. Return as JSON with 'score' and 'analysis' fields.\n\n{comparison_text}"
+            }
+        ]
+
+    def calculate_job_match(self, resume_data: Dict, job_data: Dict) -> Dict:
+        """
+        Calculate the match score between a resume and a job posting
+        """
+        try:
+            return self._complete(
+                'calculate_job_match',
+                self._job_match_messages(resume_data, job_data),
+                parse=json.loads,
                 temperature=0.3,
                 max_tokens=1000
             )
-
-            return json.loads(response.choices[0].message.content)
         except Exception as e:
-            logger.error(f"Error calculating job match with OpenAI: {str(e)}")
-            return {'score': 0, 'analysis': str(e)}
+            logger.error(f"Error calculating job match with {self.client.name}: {str(e)}")
+            return {'score': 0, 'analysis': str(e), 'error': True}
 
-    def generate_cover_letter(self, resume_data: Dict, job_data: Dict) -> str:
+    async def acalculate_job_match(self, resume_data: Dict, job_data: Dict) -> Dict:
         """
-        Generate a customized cover letter based on resume and job posting
+        Async calculate_job_match(), for scoring many jobs concurrently
         """
         try:
-            prompt = f"""
+            return await self._acomplete(
+                'calculate_job_match',
+                self._job_match_messages(resume_data, job_data),
+                parse=json.loads,
+                temperature=0.3,
+                max_tokens=1000
+            )
+        except Exception as e:
+            logger.error(f"Error calculating job match with {self.client.name}: {str(e)}")
+            return {'score': 0, 'analysis': str(e), 'error': True}
+
+    @staticmethod
+    def _cover_letter_messages(resume_data: Dict, job_data: Dict) -> List[Dict]:
+        resume_data, job_data = compact_match_inputs('generate_cover_letter', resume_data, job_data)
+        prompt = f"""
             Resume Information:
             Skills: {', '.join(resume_data.get('skills', []))}
-            Experience: {json.dumps(resume_data.get('experience', []))}
+            Experience: {compact_json(resume_data.get('experience', []))}
             
             Job Information:
             Title: {job_data['title']}
@@ -91,23 +234,63 @@ class AIService:
             Generate a professional cover letter that highlights the relevant skills and experience.
             """
 
-            response = openai.ChatCompletion.create(
-                model="gpt-4",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert at writing compelling cover letters."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
+        return [
+            {
+                "role": "system",
+                "content": "You are an expert at writing compelling cover letters."
+            },
+            {
+                "role": "user",
+                "content": prompt
+            }
+        ]
+
+    def generate_cover_letter(self, resume_data: Dict, job_data: Dict) -> str:
+        """
+        Generate a customized cover letter based on resume and job posting
+        """
+        try:
+            return self._complete(
+                'generate_cover_letter',
+                self._cover_letter_messages(resume_data, job_data),
                 temperature=0.7,
                 max_tokens=1000
             )
-
-            return response.choices[0].message.content
         except Exception as e:
-            logger.error(f"Error generating cover letter with OpenAI: {str(e)}")
+            logger.error(f"Error generating cover letter with {self.client.name}: {str(e)}")
             return ""
+
+    def stream_cover_letter(self, resume_data: Dict, job_data: Dict) -> Iterator[str]:
+        """
+        generate_cover_letter() that yields the letter as it is written.
+        A cached letter is yielded whole; a fresh one is cached once complete.
+        Errors after the first piece are raised, since it is already sent.
+        """
+        operation = 'generate_cover_letter'
+        messages = self._cover_letter_messages(resume_data, job_data)
+        params = {'temperature': 0.7, 'max_tokens': 1000}
+        key = self._cache_key(operation, messages, params)
+        content = self._cached(operation, key)
+        if content is not None:
+            yield content
+            return
+
+        pieces = []
+        started = time.perf_counter()
+        try:
+            for piece in self.client.stream_chat(messages, self.MODEL, **params):
+                pieces.append(piece)
+                yield piece
+        except Exception as e:
+            self._observe(operation, self.client, started, 'error')
+            # Part of the letter is already out, so there is nothing to fall back to
+            if pieces:
+                raise
+            fallback = self._fall_back(operation, e)
+            started = time.perf_counter()
+            yield from fallback.stream_chat(messages, self.MODEL, **params)
+            self._observe(operation, fallback, started, 'fallback')
+            return
+        self._observe(operation, self.client, started, 'ok')
+        if key is not None:
+            self.cache.set(operation, key, ''.join(pieces))
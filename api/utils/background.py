@@ -0,0 +1,192 @@
+from datetime import timedelta
+from typing import Callable, Dict, List, Optional
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Min, Q
+from django.utils import timezone
+import traceback
+import logging
+import socket
+import os
+
+logger = logging.getLogger(__name__)
+
+TASK_HANDLERS: Dict[str, Callable] = {}
+FAILURE_HANDLERS: Dict[str, Callable] = {}
+
+class PermanentError(Exception):
+    """
+    Raised by a handler to fail its task without retrying it
+    """
+
+def task(kind: str, on_failure: Optional[Callable] = None):
+    """
+    Register a handler for a background task kind. Handlers are called as
+    ``handler(params, progress)`` and their return value is stored as the result.
+    ``on_failure(params, error)`` is called once the task has failed for good.
+    """
+    def register(func):
+        TASK_HANDLERS[kind] = func
+        if on_failure is not None:
+            FAILURE_HANDLERS[kind] = on_failure
+        return func
+    return register
+
+def worker_name() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+class TaskProgress:
+    """
+    Lets a running handler publish progress, which also acts as its heartbeat
+    """
+    def __init__(self, task):
+        self.task = task
+
+    def __call__(self, progress: Dict):
+        from ..models import BackgroundTask
+
+        self.task.progress = progress
+        BackgroundTask.objects.filter(pk=self.task.pk).update(
+            progress=progress,
+            heartbeat_at=timezone.now()
+        )
+
+def enqueue(kind: str, params: Optional[Dict] = None, user=None, max_attempts: int = 1):
+    """
+    Queue a task and return (task, created). For exclusive kinds an already
+    queued or running task is returned instead of queueing a second one.
+    A task that fails is retried with exponential backoff until it has
+    been tried ``max_attempts`` times.
+    """
+    from ..models import BackgroundTask
+
+    with transaction.atomic():
+        if kind in BackgroundTask.EXCLUSIVE_KINDS:
+            active = BackgroundTask.objects.select_for_update().filter(
+                kind=kind, status__in=['queued', 'running']
+            ).order_by('created_at').first()
+            if active:
+                return active, False
+        return BackgroundTask.objects.create(
+            kind=kind, params=params or {}, created_by=user, max_attempts=max_attempts
+        ), True
+
+def claim(task_id: Optional[int] = None, kinds: Optional[List[str]] = None):
+    """
+    Atomically move the oldest queued task (or the given one) to running.
+    Returns None when nothing can be claimed, including when an exclusive
+    kind already has a running task. Tasks waiting out a retry backoff are
+    skipped.
+    """
+    from ..models import BackgroundTask
+
+    now = timezone.now()
+    with transaction.atomic():
+        queued = BackgroundTask.objects.select_for_update(skip_locked=True).filter(
+            Q(run_after=None) | Q(run_after__lte=now), status='queued'
+        )
+        if task_id is not None:
+            queued = queued.filter(pk=task_id)
+        if kinds:
+            queued = queued.filter(kind__in=kinds)
+        busy = BackgroundTask.objects.filter(
+            status='running', kind__in=BackgroundTask.EXCLUSIVE_KINDS
+        ).values_list('kind', flat=True)
+        task = queued.exclude(kind__in=list(busy)).order_by('created_at').first()
+        if task is None:
+            return None
+
+        task.status = 'running'
+        task.worker = worker_name()
+        task.started_at = task.heartbeat_at = now
+        task.attempts += 1
+        try:
+            with transaction.atomic():
+                task.save(update_fields=['status', 'worker', 'started_at', 'heartbeat_at', 'attempts'])
+        except IntegrityError:
+            # Lost the race for an exclusive kind to another worker
+            return None
+    return task
+
+def _failed(task, error: str):
+    """
+    Requeue a failed task if it has attempts left, otherwise fail it for good
+    """
+    task.error = error
+    now = timezone.now()
+    if task.attempts < task.max_attempts:
+        delay = settings.BACKGROUND_TASK_RETRY_BACKOFF * 2 ** (task.attempts - 1)
+        logger.warning(f"Retrying background task {task.id} ({task.kind}) in {delay:g}s")
+        task.status = 'queued'
+        task.run_after = now + timedelta(seconds=delay)
+        return
+    task.status = 'failed'
+    task.finished_at = now
+    on_failure = FAILURE_HANDLERS.get(task.kind)
+    if on_failure is not None:
+        try:
+            on_failure(task.params, error)
+        except Exception as e:
+            logger.error(f"Failure handler of background task {task.id} ({task.kind}) failed: {str(e)}")
+
+def run(task):
+    """
+    Run a claimed task to completion, recording its result or error
+    """
+    handler = TASK_HANDLERS.get(task.kind)
+    try:
+        if handler is None:
+            raise PermanentError(f"No handler registered for task kind {task.kind!r}")
+        task.result = handler(task.params, TaskProgress(task))
+        task.status = 'succeeded'
+        task.finished_at = timezone.now()
+    except Exception as e:
+        logger.error(f"Background task {task.id} ({task.kind}) failed: {str(e)}")
+        if isinstance(e, PermanentError):
+            task.max_attempts = task.attempts
+        _failed(task, ''.join(traceback.format_exception(e)))
+    task.save(update_fields=['status', 'result', 'error', 'finished_at', 'progress', 'run_after', 'max_attempts'])
+    return task
+
+def fail_stale_tasks() -> int:
+    """
+    Requeue or fail running tasks whose worker stopped heartbeating,
+    releasing their lock
+    """
+    from ..models import BackgroundTask
+
+    cutoff = timezone.now() - timedelta(seconds=settings.BACKGROUND_TASK_STALE_AFTER)
+    count = 0
+    for task in BackgroundTask.objects.filter(status='running', heartbeat_at__lt=cutoff):
+        _failed(task, 'Worker stopped responding')
+        # Skip tasks that finished or heartbeated since they were read
+        count += BackgroundTask.objects.filter(pk=task.pk, status='running', heartbeat_at__lt=cutoff).update(
+            status=task.status, error=task.error, run_after=task.run_after, finished_at=task.finished_at
+        )
+    if count:
+        logger.warning(f"Requeued or failed {count} stale background tasks")
+    return count
+
+def queue_depth() -> Dict[str, Dict]:
+    """
+    Queued, retrying and running task counts per kind, and how long the
+    oldest queued task has been waiting
+    """
+    from ..models import BackgroundTask
+
+    now = timezone.now()
+    waiting = Q(status='queued') & (Q(run_after=None) | Q(run_after__lte=now))
+    rows = BackgroundTask.objects.filter(status__in=['queued', 'running']).values('kind').annotate(
+        queued=Count('id', filter=waiting),
+        retrying=Count('id', filter=Q(status='queued', run_after__gt=now)),
+        running=Count('id', filter=Q(status='running')),
+        oldest=Min('created_at', filter=waiting)
+    )
+    depth = {}
+    for row in rows:
+        kind, oldest = row.pop('kind'), row.pop('oldest')
+        depth[kind] = {
+            **row,
+            'oldest_queued_seconds': round((now - oldest).total_seconds()) if oldest else 0,
+        }
+    return depth
@@ -0,0 +1,144 @@
+from asgiref.sync import sync_to_async
+from typing import Callable, Dict, List, Optional, Tuple
+from django.conf import settings
+from django.db.models import QuerySet
+from .ai_service import AIService
+from .local_matcher import get_index
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+def filter_jobs(queryset: QuerySet, filters: Dict) -> QuerySet:
+    """
+    Apply a batch-match job filter: q, company, location, job_type, source, ids
+    """
+    if filters.get('ids'):
+        queryset = queryset.filter(id__in=filters['ids'])
+    if filters.get('q'):
+        queryset = queryset.filter(title__icontains=filters['q'])
+    if filters.get('company'):
+        queryset = queryset.filter(company__icontains=filters['company'])
+    if filters.get('location'):
+        queryset = queryset.filter(location__icontains=filters['location'])
+    if filters.get('job_type'):
+        queryset = queryset.filter(job_type=filters['job_type'])
+    if filters.get('source'):
+        queryset = queryset.filter(source=filters['source'])
+    return queryset
+
+def _save_matches(matches: List, update_fields: List[str]):
+    from ..models import JobSkillMatch
+
+    JobSkillMatch.objects.bulk_create(
+        matches,
+        update_conflicts=True,
+        unique_fields=['job', 'resume'],
+        update_fields=update_fields
+    )
+
+def local_candidates(resume, k: int, job_ids: Optional[List[int]] = None) -> List[Tuple[int, float]]:
+    """
+    Rank jobs for a resume with the local matcher and store the top ``k``
+    local scores; returns [(job_id, local_score)] best first
+    """
+    from ..models import JobSkillMatch
+
+    ranked = get_index().top_k(resume.skills or [], k, job_ids)
+    _save_matches(
+        [JobSkillMatch(job_id=job_id, resume=resume, local_score=score) for job_id, score in ranked],
+        ['local_score']
+    )
+    return ranked
+
+def score_jobs(
+    resume,
+    jobs: List,
+    concurrency: Optional[int] = None,
+    progress: Optional[Callable[[Dict], None]] = None,
+    local_scores: Optional[Dict[int, float]] = None
+) -> Dict:
+    """
+    Score a resume against many jobs with at most ``concurrency`` LLM calls
+    in flight. Matches are written in bulk as they complete, so partial
+    results are visible while the batch runs. Returns the ranked matches
+    and the ids of jobs that could not be scored.
+    """
+    return asyncio.run(_score_jobs(
+        resume, jobs, concurrency or settings.MATCH_BATCH_CONCURRENCY, progress, local_scores or {}
+    ))
+
+async def _score_jobs(
+    resume,
+    jobs: List,
+    concurrency: int,
+    progress: Optional[Callable[[Dict], None]],
+    local_scores: Dict[int, float]
+) -> Dict:
+    from ..models import JobSkillMatch
+
+    update_fields = ['match_score', 'match_details'] + (['local_score'] if local_scores else [])
+    save_matches = sync_to_async(_save_matches)
+    report = sync_to_async(progress) if progress else None
+    ai_service = AIService()
+    resume_data = {
+        'skills': resume.skills or [],
+        'experience': resume.experience or []
+    }
+    semaphore = asyncio.Semaphore(concurrency)
+    scored, failed, pending = [], [], []
+
+    async def score(job):
+        async with semaphore:
+            return job, await ai_service.acalculate_job_match(resume_data, {
+                'title': job.title,
+                'requirements': job.requirements,
+                'required_skills': job.required_skills or []
+            })
+
+    try:
+        for completed in asyncio.as_completed([score(job) for job in jobs]):
+            job, result = await completed
+            try:
+                match_score = float(result['score'])
+            except (KeyError, TypeError, ValueError):
+                match_score = None
+            if result.get('error') or match_score is None:
+                failed.append(job.id)
+            else:
+                match = JobSkillMatch(
+                    job=job,
+                    resume=resume,
+                    match_score=match_score,
+                    match_details=result.get('analysis'),
+                    local_score=local_scores.get(job.id)
+                )
+                scored.append(match)
+                pending.append(match)
+
+            if len(pending) >= settings.MATCH_BATCH_WRITE_SIZE:
+                await save_matches(pending, update_fields)
+                pending = []
+                if report:
+                    await report({'total': len(jobs), 'scored': len(scored), 'failed': len(failed)})
+    finally:
+        await ai_service.aclose()
+
+    if pending:
+        await save_matches(pending, update_fields)
+    if report:
+        await report({'total': len(jobs), 'scored': len(scored), 'failed': len(failed)})
+
+    scored.sort(key=lambda match: match.match_score, reverse=True)
+    return {
+        'ranked': [
+            {
+                'job_id': match.job_id,
+                'match_score': match.match_score,
+                'match_details': match.match_details,
+                'local_score': match.local_score
+            }
+            for match in scored
+        ],
+        'failed': failed
+    }
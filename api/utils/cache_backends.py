@@ -0,0 +1,188 @@
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Optional
+import threading
+import sqlite3
+import logging
+import json
+import time
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class CacheEntry:
+    value: bytes
+    meta: Dict = field(default_factory=dict)
+    stored_at: float = 0.0
+
+class BaseCacheBackend:
+    """
+    Size-bounded key/value store with least-recently-used eviction.
+    Freshness is up to the caller, which compares ``stored_at`` to its TTL.
+    """
+    def __init__(self, max_entries: int = 10000, max_bytes: int = 0):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: bytes, meta: Optional[Dict] = None):
+        raise NotImplementedError
+
+    def touch(self, key: str):
+        """
+        Mark an entry as freshly stored without rewriting its value
+        """
+        raise NotImplementedError
+
+    def delete_prefix(self, prefix: str) -> int:
+        raise NotImplementedError
+
+class MemoryCacheBackend(BaseCacheBackend):
+    """
+    In-process LRU, for tests and one-off runs
+    """
+    def __init__(self, max_entries: int = 10000, max_bytes: int = 0):
+        super().__init__(max_entries, max_bytes)
+        self._entries: 'OrderedDict[str, CacheEntry]' = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, value: bytes, meta: Optional[Dict] = None):
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old.value)
+            self._entries[key] = CacheEntry(value, meta or {}, time.time())
+            self._bytes += len(value)
+            while self._entries and (
+                len(self._entries) > self.max_entries
+                or (self.max_bytes and self._bytes > self.max_bytes)
+            ):
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted.value)
+                self.evictions += 1
+
+    def touch(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.stored_at = time.time()
+                self._entries.move_to_end(key)
+
+    def delete_prefix(self, prefix: str) -> int:
+        with self._lock:
+            keys = [key for key in self._entries if key.startswith(prefix)]
+            for key in keys:
+                self._bytes -= len(self._entries.pop(key).value)
+            return len(keys)
+
+class SQLiteCacheBackend(BaseCacheBackend):
+    """
+    Disk-backed LRU in a single SQLite file, shared by threads and processes
+    """
+    # Totals are only recomputed every EVICT_EVERY writes to keep set() cheap
+    EVICT_EVERY = 100
+
+    def __init__(self, path: str, max_entries: int = 10000, max_bytes: int = 0):
+        super().__init__(max_entries, max_bytes)
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache_entries ("
+            " key TEXT PRIMARY KEY, value BLOB NOT NULL, meta TEXT NOT NULL,"
+            " stored_at REAL NOT NULL, accessed_at REAL NOT NULL, size INTEGER NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS cache_entries_accessed_at ON cache_entries (accessed_at)"
+        )
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, meta, stored_at FROM cache_entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE cache_entries SET accessed_at = ? WHERE key = ?", (time.time(), key)
+            )
+        return CacheEntry(row[0], json.loads(row[1]), row[2])
+
+    def set(self, key: str, value: bytes, meta: Optional[Dict] = None):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache_entries (key, value, meta, stored_at, accessed_at, size)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (key, value, json.dumps(meta or {}), now, now, len(value))
+            )
+            self._writes += 1
+            if self._writes % self.EVICT_EVERY == 0:
+                self._evict()
+
+    def touch(self, key: str):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE cache_entries SET stored_at = ?, accessed_at = ? WHERE key = ?", (now, now, key)
+            )
+
+    def delete_prefix(self, prefix: str) -> int:
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM cache_entries WHERE substr(key, 1, ?) = ?", (len(prefix), prefix)
+            )
+            return cursor.rowcount
+
+    def _evict(self):
+        count, total = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries"
+        ).fetchone()
+        excess = max(0, count - self.max_entries)
+        if self.max_bytes and total > self.max_bytes:
+            # Drop least recently used entries until we are back under the byte budget
+            freed = oldest = 0
+            for (size,) in self._conn.execute(
+                "SELECT size FROM cache_entries ORDER BY accessed_at"
+            ):
+                if total - freed <= self.max_bytes:
+                    break
+                freed += size
+                oldest += 1
+            excess = max(excess, oldest)
+        if not excess:
+            return
+        self._conn.execute(
+            "DELETE FROM cache_entries WHERE key IN ("
+            " SELECT key FROM cache_entries ORDER BY accessed_at LIMIT ?)", (excess,)
+        )
+        self.evictions += excess
+        logger.info(f"Evicted {excess} cache entries")
+
+def get_cache_backend(name: Optional[str], **options) -> Optional[BaseCacheBackend]:
+    """
+    Build a cache backend by name ('sqlite', 'memory'); a falsy name disables caching
+    """
+    if not name:
+        return None
+    if name == 'memory':
+        options.pop('path', None)
+        return MemoryCacheBackend(**options)
+    if name == 'sqlite':
+        return SQLiteCacheBackend(**options)
+    raise ValueError(f"Unknown cache backend: {name}")
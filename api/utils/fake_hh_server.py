@@ -0,0 +1,122 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from typing import Dict, List
+from django.utils.dateparse import parse_datetime
+import threading
+import hashlib
+import json
+import time
+
+
+def make_vacancy(index: int) -> Dict:
+    """
+    Build a deterministic vacancy listing item shaped like HH.ru's
+    """
+    return {
+        'id': str(100000 + index),
+        'name': f"Python Developer {index % 50}",
+        'employer': {'name': f"Company {index % 200}"},
+        'area': {'id': '1', 'name': 'Moscow'},
+        'salary': {'from': 100000 + index, 'to': 200000 + index, 'currency': 'RUR'},
+        'employment': {'id': 'full', 'name': 'Full employment'},
+        'published_at': f"2025-05-{1 + index % 28:02d}T12:00:00+0300",
+    }
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+
+class FakeHHServer:
+    """
+    Local stand-in for the HH.ru API with a fixed per-request latency,
+    used to benchmark sync without touching the real service
+    """
+    def __init__(self, vacancies: int = 100, latency: float = 0.05):
+        self.vacancies: List[Dict] = [make_vacancy(i) for i in range(vacancies)]
+        self.latency = latency
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server = _Server(('127.0.0.1', 0), self._handler_class())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def handle(self, path: str, params: Dict) -> Dict:
+        with self._lock:
+            self.requests += 1
+        time.sleep(self.latency)
+
+        if path == '/v1/vacancies':
+            per_page = int(params.get('per_page', 20))
+            page = int(params.get('page', 0))
+            vacancies = self.vacancies
+            if 'date_from' in params:
+                date_from = parse_datetime(params['date_from'])
+                vacancies = [v for v in vacancies if parse_datetime(v['published_at']) >= date_from]
+            if 'date_to' in params:
+                date_to = parse_datetime(params['date_to'])
+                vacancies = [v for v in vacancies if parse_datetime(v['published_at']) < date_to]
+            if params.get('order_by') == 'publication_time':
+                vacancies = sorted(vacancies, key=lambda v: v['published_at'], reverse=True)
+            items = vacancies[page * per_page:(page + 1) * per_page]
+            return {
+                'items': items,
+                'found': len(vacancies),
+                'page': page,
+                'pages': -(-len(vacancies) // per_page),
+                'per_page': per_page,
+            }
+        if path.startswith('/v1/vacancies/'):
+            vacancy_id = path.rsplit('/', 1)[-1]
+            vacancy = next((v for v in self.vacancies if v['id'] == vacancy_id), None)
+            if vacancy is None:
+                return None
+            return dict(vacancy, description=f"<p>{vacancy['name']} wanted</p>")
+        if path == '/v1/suggests/skill_set':
+            return {'items': [{'id': '1', 'text': 'Python'}, {'id': '2', 'text': 'Django'}]}
+        return None
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # Keep-alive, so the client's pooled connections get reused
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                params = {k: v[0] for k, v in parse_qs(url.query).items()}
+                payload = server.handle(url.path, params)
+                body = json.dumps(payload if payload is not None else {'errors': [{'type': 'not_found'}]}).encode()
+                etag = '"%s"' % hashlib.md5(body).hexdigest()
+                if payload is not None and self.headers.get('If-None-Match') == etag:
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                self.send_response(200 if payload is not None else 404)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.send_header('ETag', etag)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
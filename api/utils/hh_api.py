@@ -1,19 +1,134 @@
 import requests
-from typing import Dict, List, Optional
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
 from datetime import datetime
+from django.conf import settings
+from django.utils.dateparse import parse_datetime
+from .cache_backends import get_cache_backend
+from .http_cache import ResponseCache
+from . import metrics
+import threading
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
+class RateLimiter:
+    """
+    Thread-safe token bucket shared by all workers hitting HH.ru
+    """
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        self.rate = rate
+        self.capacity = burst or max(1, int(rate))
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+# Fields that change without the vacancy itself changing (view counters,
+# per-viewer links), left out of change-detection hashes
+VOLATILE_KEYS = {
+    'counters', 'relations', 'negotiations_url', 'suitable_resumes_url',
+    'response_url', 'apply_alternate_url', 'sort_point_distance',
+    'adv_response_url', 'adv_context', 'is_adv_vacancy', 'show_logo_in_search'
+}
+
+def vacancy_hash(payload: Dict) -> str:
+    from .job_ingest import payload_hash
+
+    return payload_hash(payload, VOLATILE_KEYS)
+
 class HHApi:
     BASE_URL = "https://api.hh.ru/v1"
+    MAX_SEARCH_DEPTH = 2000
     
-    def __init__(self):
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        pool_size: int = 10,
+        rate_limiter: Optional[RateLimiter] = None,
+        timeout: Optional[float] = None,
+        cache: Optional[ResponseCache] = None
+    ):
+        self.base_url = (base_url or self.BASE_URL).rstrip('/')
+        self.rate_limiter = rate_limiter
+        self.cache = cache
+        self.timeout = timeout or settings.HH_REQUEST_TIMEOUT
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'JobPilot/1.0 (educational project)',
             'Accept': 'application/json'
         })
+        # One pooled connection per worker; 429/5xx are retried with backoff
+        # and Retry-After is honoured so we stay within HH.ru quotas.
+        adapter = HTTPAdapter(
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.5,
+                status_forcelist=[429, 500, 502, 503, 504],
+                allowed_methods=['GET'],
+                respect_retry_after_header=True
+            )
+        )
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    @classmethod
+    def from_settings(cls, pool_size: int = 10, rate_limiter: Optional[RateLimiter] = None) -> 'HHApi':
+        """
+        Build a client with the response cache configured in settings
+        """
+        backend = get_cache_backend(
+            settings.HH_CACHE_BACKEND,
+            path=settings.HH_CACHE_PATH,
+            max_entries=settings.HH_CACHE_MAX_ENTRIES,
+            max_bytes=settings.HH_CACHE_MAX_BYTES
+        )
+        return cls(
+            pool_size=pool_size,
+            rate_limiter=rate_limiter,
+            cache=ResponseCache(backend, settings.HH_CACHE_TTLS) if backend else None
+        )
+
+    def _get(self, endpoint: str, path: str, params: Optional[Dict] = None, revalidate: bool = False) -> Dict:
+        url = f"{self.base_url}{path}"
+
+        def send(headers: Dict) -> requests.Response:
+            if self.rate_limiter:
+                self.rate_limiter.acquire()
+            started = time.perf_counter()
+            try:
+                response = self.session.get(url, params=params, headers=headers, timeout=self.timeout)
+            except requests.RequestException:
+                metrics.HH_REQUESTS.inc(endpoint=endpoint, status='error')
+                raise
+            finally:
+                metrics.HH_LATENCY.observe(time.perf_counter() - started, endpoint=endpoint)
+            metrics.HH_REQUESTS.inc(endpoint=endpoint, status=response.status_code)
+            return response
+
+        if self.cache is None:
+            response = send({})
+            response.raise_for_status()
+            return response.json()
+        return self.cache.fetch(endpoint, url, params, send, revalidate=revalidate)
 
     def search_vacancies(
         self,
@@ -21,7 +136,11 @@ class HHApi:
         area: Optional[str] = None,
         experience: Optional[str] = None,
         schedule: Optional[str] = None,
-        per_page: int = 100
+        per_page: int = 100,
+        page: Optional[int] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        order_by: Optional[str] = None
     ) -> Dict:
         """
         Search for vacancies on HH.ru
@@ -32,26 +151,57 @@ class HHApi:
                 'area': area,
                 'experience': experience,
                 'schedule': schedule,
-                'per_page': per_page
+                'per_page': per_page,
+                'page': page,
+                'date_from': date_from.isoformat(timespec='seconds') if date_from else None,
+                'date_to': date_to.isoformat(timespec='seconds') if date_to else None,
+                'order_by': order_by
             }
             # Remove None values
             params = {k: v for k, v in params.items() if v is not None}
             
-            response = self.session.get(f"{self.BASE_URL}/vacancies", params=params)
-            response.raise_for_status()
-            return response.json()
+            return self._get('vacancies', "/vacancies", params)
         except requests.RequestException as e:
             logger.error(f"Error fetching vacancies from HH.ru: {str(e)}")
             return {'items': [], 'error': str(e)}
 
-    def get_vacancy_details(self, vacancy_id: str) -> Dict:
+    def iter_vacancy_pages(
+        self,
+        text: Optional[str] = None,
+        area: Optional[str] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        start_page: int = 0,
+        per_page: int = 100
+    ) -> Iterator[Tuple[int, Dict]]:
+        """
+        Walk search result pages newest-first, yielding (page, response).
+        HH.ru only exposes the first MAX_SEARCH_DEPTH results of a search.
+        """
+        page = start_page
+        # A resumed walk may start at the depth limit, with no page left to fetch
+        data = {}
+        while page * per_page < self.MAX_SEARCH_DEPTH:
+            data = self.search_vacancies(
+                text=text,
+                area=area,
+                per_page=per_page,
+                page=page,
+                date_from=date_from,
+                date_to=date_to,
+                order_by='publication_time'
+            )
+            yield page, data
+            if 'error' in data or page >= data.get('pages', 0) - 1:
+                break
+            page += 1
+
+    def get_vacancy_details(self, vacancy_id: str, revalidate: bool = False) -> Dict:
         """
         Get detailed information about a specific vacancy
         """
         try:
-            response = self.session.get(f"{self.BASE_URL}/vacancies/{vacancy_id}")
-            response.raise_for_status()
-            return response.json()
+            return self._get('vacancy', f"/vacancies/{vacancy_id}", revalidate=revalidate)
         except requests.RequestException as e:
             logger.error(f"Error fetching vacancy details from HH.ru: {str(e)}")
             return {'error': str(e)}
@@ -61,43 +211,263 @@ class HHApi:
         Get suggested skills based on vacancy description
         """
         try:
-            response = self.session.get(f"{self.BASE_URL}/suggests/skill_set", 
-                                      params={'text': text})
-            response.raise_for_status()
-            return [item['text'] for item in response.json()['items']]
+            response = self._get('skills', "/suggests/skill_set", {'text': text})
+            return [item['text'] for item in response['items']]
         except requests.RequestException as e:
             logger.error(f"Error fetching suggested skills from HH.ru: {str(e)}")
             return []
 
-def sync_vacancies():
+def fetch_vacancy_details(
+    api: HHApi,
+    vacancies: List[Dict],
+    executor: Optional[ThreadPoolExecutor] = None,
+    revalidate: Set[str] = frozenset(),
+    suggestions: Optional['SkillSuggestionCache'] = None,
+    suggest: bool = True
+) -> List[Tuple[Dict, Dict, List[str]]]:
     """
-    Sync vacancies from HH.ru to our database
+    Fetch details and suggested skills for each vacancy, concurrently when
+    an executor is given. Vacancies whose details failed are dropped.
+    Details of ids in ``revalidate`` are never served from a fresh cache entry.
+    With ``suggestions``, skills are looked up once per normalized title;
+    without ``suggest``, they are not requested at all.
     """
-    from ..models import Job
-    
-    api = HHApi()
-    results = api.search_vacancies()
-    
-    for vacancy in results.get('items', []):
-        # Get full vacancy details
-        details = api.get_vacancy_details(vacancy['id'])
+    def fetch(vacancy):
+        details = api.get_vacancy_details(vacancy['id'], revalidate=vacancy['id'] in revalidate)
         if 'error' in details:
-            continue
-            
-        # Create or update job in our database
-        job, created = Job.objects.update_or_create(
-            external_id=vacancy['id'],
-            source='hh',
-            defaults={
-                'title': vacancy['name'],
-                'company': vacancy['employer']['name'],
-                'location': vacancy['area']['name'],
-                'description': details.get('description', ''),
-                'requirements': details.get('requirement', ''),
-                'salary_range': f"{vacancy.get('salary', {}).get('from', '')} - {vacancy.get('salary', {}).get('to', '')} {vacancy.get('salary', {}).get('currency', '')}",
-                'job_type': vacancy['employment']['name'],
-                'is_active': True,
-                'raw_data': details,
-                'required_skills': api.get_suggested_skills(vacancy['name'])
-            }
+            return None
+        skills = api.get_suggested_skills(vacancy['name']) if suggest and not suggestions else []
+        return vacancy, details, skills
+
+    mapper = executor.map if executor else map
+    results = [result for result in mapper(fetch, vacancies) if result is not None]
+    if suggestions:
+        skills_by_title = suggestions.get_many(vacancy['name'] for vacancy, _, _ in results)
+        results = [(vacancy, details, skills_by_title[vacancy['name']]) for vacancy, details, _ in results]
+    return results
+
+class VacancySync:
+    """
+    One sync run's HTTP client, thread pool, write buffer and counters,
+    shared by every search it walks
+    """
+    def __init__(self, workers: Optional[int] = None, requests_per_second: Optional[float] = None):
+        from .job_ingest import JobIngestor
+        from .skill_suggestions import SkillSuggestionCache
+
+        workers = workers or settings.HH_SYNC_WORKERS
+        if requests_per_second is None:
+            requests_per_second = settings.HH_REQUESTS_PER_SECOND
+        self.api = HHApi.from_settings(
+            pool_size=workers,
+            rate_limiter=RateLimiter(requests_per_second)
         )
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.ingestor = JobIngestor(source='hh')
+        # Skills are found in the vacancy text; HH.ru suggestions only add to them
+        self.suggestions = SkillSuggestionCache(self.api, self.executor) if settings.HH_SKILL_SUGGESTIONS else None
+        self.stats = {
+            'pages': 0, 'vacancies': 0, 'errors': 0, 'truncated_searches': 0,
+            'details_skipped': 0, 'requests_saved': 0
+        }
+        self.seen = set()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.executor.shutdown()
+
+    def walk(
+        self,
+        text: Optional[str] = None,
+        area: Optional[str] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        start_page: int = 0,
+        on_page: Optional[Callable[[int, List[Dict], Tuple[Optional[datetime], int]], None]] = None,
+        per_page: int = 100
+    ) -> bool:
+        """
+        Sync every page of one search; returns False if it stopped on an
+        error or could not reach every result. HH.ru serves only the first
+        MAX_SEARCH_DEPTH results of a search, so a newest-first walk that
+        reaches that depth goes on with the same search ending at the oldest
+        posting it saw. ``on_page`` gets the page, its new vacancies and the
+        (date_to, page) cursor to resume the walk from.
+        """
+        depth = self.api.MAX_SEARCH_DEPTH
+        if start_page * per_page >= depth:
+            # A cursor saved at the depth limit has no oldest posting to go on
+            # from; walking the window again is cheap, unchanged listings are skipped
+            start_page = 0
+        while True:
+            data, oldest = {}, None
+            for page, data in self.api.iter_vacancy_pages(
+                text=text,
+                area=area,
+                date_from=date_from,
+                date_to=date_to,
+                start_page=start_page,
+                per_page=per_page
+            ):
+                if 'error' in data:
+                    self.stats['errors'] += 1
+                    return False
+                for vacancy in data.get('items', []):
+                    published_at = parse_datetime(vacancy.get('published_at') or '')
+                    if published_at and (oldest is None or published_at < oldest):
+                        oldest = published_at
+                items = self.sync_items(data.get('items', []))
+                truncated = data.get('found', 0) > depth and (page + 1) * per_page >= depth
+                if on_page:
+                    on_page(page, items, (oldest, 0) if truncated and oldest else (date_to, page + 1))
+
+            if data.get('found', 0) <= depth:
+                return True
+            # More than a full depth posted in one second cannot be narrowed further
+            if oldest is None or (date_to is not None and oldest >= date_to):
+                self.stats['truncated_searches'] += 1
+                logger.warning(
+                    f"HH.ru search text={text!r} area={area!r} before {date_to} found {data['found']} "
+                    f"vacancies, only {depth} are reachable; narrow it with more queries or areas"
+                )
+                return False
+            date_to, start_page = oldest, 0
+
+    def sync_items(self, items: List[Dict]) -> List[Dict]:
+        """
+        Buffer the vacancies of one search page, skipping the ones already
+        seen this run; returns the new ones
+        """
+        from ..models import Job
+
+        items = [v for v in items if v['id'] not in self.seen]
+        self.seen.update(v['id'] for v in items)
+
+        # Listings identical to what we stored need no detail fetch
+        known = dict(
+            Job.objects.filter(
+                source='hh',
+                is_active=True,
+                external_id__in=[v['id'] for v in items]
+            ).values_list('external_id', 'listing_hash')
+        )
+        changed = [v for v in items if known.get(v['id']) != vacancy_hash(v)]
+        self.stats['details_skipped'] += len(items) - len(changed)
+        self.stats['requests_saved'] += 2 * (len(items) - len(changed))
+
+        # Known vacancies whose listing changed must not get stale cached details
+        self.ingestor.add(
+            (_build_job(vacancy, details, skills), details)
+            for vacancy, details, skills in fetch_vacancy_details(
+                self.api, changed, self.executor,
+                revalidate={v['id'] for v in changed if v['id'] in known},
+                suggestions=self.suggestions,
+                suggest=self.suggestions is not None
+            )
+        )
+
+        self.stats['pages'] += 1
+        self.stats['vacancies'] += len(items)
+        return items
+
+    def progress(self) -> Dict:
+        return dict(self.stats, pending_writes=self.ingestor.pending, **self.ingestor.stats)
+
+    def result(self) -> Dict:
+        stats = dict(self.stats, **self.ingestor.stats)
+        if self.suggestions is not None:
+            stats['skill_suggestions'] = self.suggestions.stats
+        if self.api.cache is not None:
+            stats['cache'] = self.api.cache.stats
+        return stats
+
+def sync_vacancies(
+    queries: Optional[List[str]] = None,
+    areas: Optional[List[str]] = None,
+    full: bool = False,
+    workers: Optional[int] = None,
+    progress: Optional[Callable[[Dict], None]] = None,
+    reconcile: bool = True
+) -> Dict:
+    """
+    Sync vacancies from HH.ru to our database.
+
+    Every (query, area) pair is walked page by page. Unless ``full`` is set,
+    only vacancies published since that pair's last successful sync are
+    requested, and an interrupted walk resumes from its saved page cursor.
+    ``progress`` is called with the running stats after every page.
+
+    A full sync that saw every result of every search then deactivates the
+    HH.ru jobs it did not see, unless ``reconcile`` is off.
+    """
+    from ..models import SyncCheckpoint
+    from .job_ingest import deactivate_missing
+
+    with VacancySync(workers) as run:
+        for query in (queries if queries is not None else settings.HH_SYNC_QUERIES):
+            for area in (areas if areas is not None else settings.HH_SYNC_AREAS):
+                checkpoint, _ = SyncCheckpoint.objects.get_or_create(source='hh', query=query, area=area)
+
+                def on_page(page: int, items: List[Dict], cursor: Tuple[Optional[datetime], int]):
+                    for vacancy in items:
+                        published_at = parse_datetime(vacancy.get('published_at') or '')
+                        if published_at and (not checkpoint.pending_published_at
+                                             or published_at > checkpoint.pending_published_at):
+                            checkpoint.pending_published_at = published_at
+                    if not full:
+                        checkpoint.next_date_to, checkpoint.next_page = cursor
+                    # The cursor only moves once everything before it is written
+                    if run.ingestor.is_full:
+                        run.ingestor.flush()
+                        checkpoint.save()
+                    if progress:
+                        progress(run.progress())
+
+                completed = run.walk(
+                    text=query or None,
+                    area=area or None,
+                    date_from=None if full else checkpoint.last_published_at,
+                    date_to=None if full else checkpoint.next_date_to,
+                    start_page=0 if full else checkpoint.next_page,
+                    on_page=on_page
+                )
+                run.ingestor.flush()
+                if completed:
+                    checkpoint.complete()
+                else:
+                    checkpoint.save()
+
+        result = run.result()
+        if full and reconcile:
+            if result['errors'] or result['truncated_searches']:
+                logger.warning("Skipping deactivation, the full sync did not see every vacancy")
+            else:
+                result['deactivated'] = deactivate_missing('hh', run.seen)
+        return result
+
+def _build_job(vacancy: Dict, details: Dict, skills: List[str]):
+    from ..models import Job
+    from .skill_extractor import job_skills
+
+    salary = vacancy.get('salary') or {}
+    return Job(
+        external_id=vacancy['id'],
+        source='hh',
+        title=vacancy['name'],
+        company=vacancy['employer']['name'],
+        location=vacancy['area']['name'],
+        description=details.get('description', ''),
+        requirements=details.get('requirement', ''),
+        salary_range=f"{salary.get('from', '')} - {salary.get('to', '')} {salary.get('currency', '')}",
+        job_type=vacancy['employment']['name'],
+        is_active=True,
+        # Employer-listed key skills and any HH.ru suggestions follow those found in the text
+        required_skills=job_skills(
+            vacancy['name'], details.get('description', ''), details.get('requirement', ''),
+            [skill['name'] for skill in details.get('key_skills') or []] + (skills or [])
+        ),
+        listing_hash=vacancy_hash(vacancy),
+        content_hash=vacancy_hash(details)
+    )
@@ -0,0 +1,92 @@
+import requests
+from typing import Callable, Dict, Optional
+from urllib.parse import urlencode
+from .cache_backends import BaseCacheBackend
+from . import metrics
+import threading
+import hashlib
+import logging
+import json
+import time
+
+logger = logging.getLogger(__name__)
+
+LOOKUP_RESULTS = {'hits': 'hit', 'misses': 'miss', 'revalidated': 'revalidated'}
+
+class ResponseCache:
+    """
+    HTTP response cache for JSON GET endpoints.
+
+    Entries younger than their endpoint's TTL are served without a request.
+    Older entries are revalidated with If-None-Match / If-Modified-Since when
+    the server gave us a validator, and re-stored on a 200.
+    """
+    def __init__(self, backend: BaseCacheBackend, ttls: Dict[str, int], default_ttl: int = 0):
+        self.backend = backend
+        self.ttls = ttls
+        self.default_ttl = default_ttl
+        self._stats = {'hits': 0, 'misses': 0, 'revalidated': 0, 'stores': 0}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(url: str, params: Optional[Dict] = None) -> str:
+        query = urlencode(sorted((params or {}).items()), doseq=True)
+        return 'http:' + hashlib.sha256(f"{url}?{query}".encode('utf-8')).hexdigest()
+
+    @property
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats['hits'] + stats['misses'] + stats['revalidated']
+        stats['hit_rate'] = round((stats['hits'] + stats['revalidated']) / lookups, 3) if lookups else 0.0
+        stats['evictions'] = self.backend.evictions
+        return stats
+
+    def _count(self, name: str, endpoint: str):
+        with self._lock:
+            self._stats[name] += 1
+        if name in LOOKUP_RESULTS:
+            metrics.HH_CACHE_LOOKUPS.inc(endpoint=endpoint, result=LOOKUP_RESULTS[name])
+
+    def fetch(
+        self,
+        endpoint: str,
+        url: str,
+        params: Optional[Dict],
+        send: Callable[[Dict], requests.Response],
+        revalidate: bool = False
+    ) -> Dict:
+        """
+        Return the JSON body for url+params, calling ``send(headers)`` only
+        when the cached copy is missing, expired or ``revalidate`` is set
+        """
+        key = self.make_key(url, params)
+        entry = self.backend.get(key)
+        ttl = self.ttls.get(endpoint, self.default_ttl)
+
+        if entry is not None and not revalidate and time.time() - entry.stored_at < ttl:
+            self._count('hits', endpoint)
+            return json.loads(entry.value)
+
+        headers = {}
+        if entry is not None:
+            if entry.meta.get('etag'):
+                headers['If-None-Match'] = entry.meta['etag']
+            if entry.meta.get('last_modified'):
+                headers['If-Modified-Since'] = entry.meta['last_modified']
+
+        response = send(headers)
+        if response.status_code == 304 and entry is not None:
+            self._count('revalidated', endpoint)
+            self.backend.touch(key)
+            return json.loads(entry.value)
+
+        response.raise_for_status()
+        self._count('misses', endpoint)
+        if ttl > 0 and 'no-store' not in response.headers.get('Cache-Control', ''):
+            self.backend.set(key, response.content, {
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+            })
+            self._count('stores', endpoint)
+        return response.json()
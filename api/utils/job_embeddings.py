@@ -0,0 +1,452 @@
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from django.conf import settings
+from django.db import transaction
+from .local_matcher import STOP_WORDS, TOKEN_RE
+import numpy as np
+import threading
+import logging
+import fcntl
+import json
+import math
+import zlib
+import os
+
+logger = logging.getLogger(__name__)
+
+# Field weights of a job's text in its embedding
+SKILL_WEIGHT = 2.0
+TITLE_WEIGHT = 1.5
+TEXT_WEIGHT = 1.0
+
+def embed(fields: Iterable[Tuple[Iterable[str], float]], dim: int) -> np.ndarray:
+    """
+    Hashing-vectorizer embedding of weighted token groups: each token adds
+    its weight, signed by a second hash bit, to one of ``dim`` buckets.
+    Term counts are log-damped and the vector is L2-normalised.
+    """
+    counts: Dict[str, float] = {}
+    for tokens, weight in fields:
+        for token in tokens:
+            counts[token] = counts.get(token, 0.0) + weight
+    vector = np.zeros(dim, dtype=np.float32)
+    for token, count in counts.items():
+        h = zlib.crc32(token.encode('utf-8'))
+        vector[h % dim] += (1.0 if h & 0x80000000 else -1.0) * (1.0 + math.log(count))
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+def _words(text: str) -> List[str]:
+    return [
+        token for token in TOKEN_RE.findall((text or '').lower())
+        if len(token) > 1 and token not in STOP_WORDS
+    ]
+
+def _skills(skills: Optional[Sequence[str]]) -> List[str]:
+    return [f"s:{skill.strip().lower()}" for skill in skills or [] if skill and skill.strip()]
+
+def embed_job(title: str, requirements: str, description: str, skills: Sequence[str], dim: int) -> np.ndarray:
+    return embed([
+        (_skills(skills), SKILL_WEIGHT),
+        # Skill names also match the same words in free text
+        (_words(' '.join(skills or [])), SKILL_WEIGHT / 2),
+        (_words(title), TITLE_WEIGHT),
+        (_words(requirements), TEXT_WEIGHT),
+        (_words(description)[:300], TEXT_WEIGHT / 2),
+    ], dim)
+
+def embed_resume(skills: Sequence[str], experience, dim: int) -> np.ndarray:
+    return embed([
+        (_skills(skills), SKILL_WEIGHT),
+        (_words(' '.join(skills or [])), SKILL_WEIGHT / 2),
+        (_words(json.dumps(experience or [], ensure_ascii=False)), TEXT_WEIGHT),
+    ], dim)
+
+class JobEmbeddingIndex:
+    """
+    Job embeddings in memory-mapped files under ``path``, searchable by
+    brute force or, once trained, through an inverted-file (IVF) index.
+
+    Each generation of the index is a set of files: vectors (slot x dim
+    float32), job ids per slot (0 for a removed job) and IVF list per slot.
+    ``meta.json`` names the current generation; writers hold an exclusive
+    file lock and replace it atomically, and readers re-map when its
+    version changes. A rebuild writes a new generation and switches over,
+    so searches keep working on the old one until then.
+
+    Slots filled when the IVF lists were trained never change list: an
+    upsert that would move a job to another list gives it a new slot, so
+    readers sort the trained slots by list once per generation and only
+    the slots added since on each change.
+    """
+    def __init__(self, path: str, dim: int = 256):
+        self.path = Path(path)
+        self.dim = dim
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._meta_path = self.path / 'meta.json'
+        self._lock = threading.Lock()
+        self._loaded_version = None
+        self._meta: Dict = {}
+        # Job id -> slot of the generation and size last seen by this process's writers
+        self._slots: Dict[int, int] = {}
+        self._slots_generation = None
+        self._slots_size = 0
+        # Trained slots grouped by IVF list, per generation
+        self._base_generation = None
+
+    # Files and metadata
+
+    def _file(self, name: str, generation: int) -> Path:
+        return self.path / f"{name}.{generation}"
+
+    def _centroids_file(self, generation: int) -> Path:
+        return self.path / f"centroids.{generation}.npy"
+
+    def _read_meta(self) -> Dict:
+        try:
+            return json.loads(self._meta_path.read_text())
+        except FileNotFoundError:
+            return {'generation': 0, 'version': 0, 'dim': self.dim, 'size': 0, 'capacity': 0, 'nlist': 0}
+
+    def _write_meta(self, meta: Dict):
+        meta['version'] += 1
+        tmp = self._meta_path.with_suffix('.tmp')
+        tmp.write_text(json.dumps(meta))
+        os.replace(tmp, self._meta_path)
+
+    @contextmanager
+    def _write_lock(self):
+        with open(self.path / 'lock', 'w') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _map(self, meta: Dict, mode: str):
+        generation, capacity, dim = meta['generation'], meta['capacity'], meta['dim']
+        if not capacity:
+            return None, None, None
+        vectors = np.memmap(self._file('vectors', generation), dtype=np.float32, mode=mode, shape=(capacity, dim))
+        ids = np.memmap(self._file('ids', generation), dtype=np.int64, mode=mode, shape=(capacity,))
+        lists = np.memmap(self._file('lists', generation), dtype=np.int32, mode=mode, shape=(capacity,))
+        return vectors, ids, lists
+
+    def _grow(self, meta: Dict, needed: int):
+        """
+        Extend the current generation's files to hold ``needed`` slots, doubling capacity
+        """
+        if needed <= meta['capacity']:
+            return
+        capacity = max(needed, meta['capacity'] * 2, 1024)
+        for name, width in (('vectors', 4 * meta['dim']), ('ids', 8), ('lists', 4)):
+            with open(self._file(name, meta['generation']), 'ab') as f:
+                f.truncate(capacity * width)
+        # New slots read as empty: id 0, list -1
+        _, _, lists = self._map({**meta, 'capacity': capacity}, 'r+')
+        lists[meta['capacity']:] = -1
+        lists.flush()
+        meta['capacity'] = capacity
+
+    def _centroids(self, meta: Dict) -> Optional[np.ndarray]:
+        if not meta['nlist']:
+            return None
+        return np.load(self._centroids_file(meta['generation']))
+
+    # Writing
+
+    def upsert(self, job_ids: Sequence[int], vectors: np.ndarray):
+        """
+        Store or replace the embeddings of ``job_ids``
+        """
+        if not len(job_ids):
+            return
+        job_ids = np.asarray(job_ids, dtype=np.int64)
+        with self._write_lock():
+            meta = self._read_meta()
+            if meta['dim'] != self.dim:
+                raise ValueError(f"Index at {self.path} has dim {meta['dim']}, not {self.dim}")
+            slots = self._find_slots(meta, job_ids)
+            centroids = self._centroids(meta)
+            assigned = np.argmax(vectors @ centroids.T, axis=1) if centroids is not None else None
+            moved = np.zeros(len(slots), dtype=bool)
+            if assigned is not None:
+                # A trained slot keeps its list; a job that changes list moves to a new slot
+                _, _, lists = self._map(meta, 'r')
+                trained = (slots >= 0) & (slots < meta.get('trained', 0))
+                moved[trained] = lists[slots[trained]] != assigned[trained]
+                del lists
+            vacated = slots[moved]
+            new = (slots < 0) | moved
+            slots[new] = meta['size'] + np.arange(int(new.sum()))
+            self._grow(meta, meta['size'] + int(new.sum()))
+
+            stored_vectors, stored_ids, lists = self._map(meta, 'r+')
+            stored_ids[vacated] = 0
+            stored_vectors[vacated] = 0
+            lists[vacated] = -1
+            stored_vectors[slots] = vectors
+            stored_ids[slots] = job_ids
+            if assigned is not None:
+                lists[slots] = assigned
+            for array in (stored_vectors, stored_ids, lists):
+                array.flush()
+            meta['size'] += int(new.sum())
+            self._slots.update(zip(job_ids.tolist(), slots.tolist()))
+            self._slots_size = meta['size']
+            self._write_meta(meta)
+
+    def remove(self, job_ids: Sequence[int]) -> int:
+        """
+        Drop the embeddings of ``job_ids``; their slots stay empty until the next rebuild
+        """
+        if not len(job_ids):
+            return 0
+        with self._write_lock():
+            meta = self._read_meta()
+            slots = self._find_slots(meta, np.asarray(job_ids, dtype=np.int64))
+            slots = slots[slots >= 0]
+            if not len(slots):
+                return 0
+            vectors, ids, lists = self._map(meta, 'r+')
+            for job_id in np.asarray(ids[slots]).tolist():
+                self._slots.pop(job_id, None)
+            ids[slots] = 0
+            vectors[slots] = 0
+            lists[slots] = -1
+            for array in (vectors, ids, lists):
+                array.flush()
+            self._write_meta(meta)
+        return len(slots)
+
+    def _find_slots(self, meta: Dict, job_ids: np.ndarray) -> np.ndarray:
+        """
+        Slot of each job id, -1 where it has none; called under the write lock
+        """
+        if not meta['size']:
+            return np.full(len(job_ids), -1, dtype=np.int64)
+        _, ids, _ = self._map(meta, 'r')
+        if self._slots_generation != meta['generation'] or self._slots_size > meta['size']:
+            self._slots, self._slots_size = {}, 0
+            self._slots_generation = meta['generation']
+        # Slots appended since this process last looked, by any writer; later ones win
+        added = np.asarray(ids[self._slots_size:meta['size']])
+        filled = np.flatnonzero(added)
+        self._slots.update(zip(added[filled].tolist(), (self._slots_size + filled).tolist()))
+        self._slots_size = meta['size']
+
+        slots = np.fromiter((self._slots.get(job_id, -1) for job_id in job_ids.tolist()), dtype=np.int64, count=len(job_ids))
+        # Another process may have removed a job since
+        known = slots >= 0
+        known[known] = ids[slots[known]] == job_ids[known]
+        slots[~known] = -1
+        return slots
+
+    def rebuild(self, batches: Iterable[Tuple[Sequence[int], np.ndarray]], nlist: int = 0) -> int:
+        """
+        Write a fresh generation from (job_ids, vectors) batches, optionally
+        train ``nlist`` IVF lists on it, and switch searches over to it
+        """
+        with self._write_lock():
+            old = self._read_meta()
+            meta = {**old, 'generation': old['generation'] + 1, 'dim': self.dim, 'size': 0, 'capacity': 0, 'nlist': 0}
+            for job_ids, vectors in batches:
+                start = meta['size']
+                self._grow(meta, start + len(job_ids))
+                stored_vectors, stored_ids, _ = self._map(meta, 'r+')
+                stored_vectors[start:start + len(job_ids)] = vectors
+                stored_ids[start:start + len(job_ids)] = job_ids
+                stored_vectors.flush()
+                stored_ids.flush()
+                meta['size'] += len(job_ids)
+            meta['trained'] = 0
+            if nlist and meta['size']:
+                self._train(meta, nlist)
+            self._write_meta(meta)
+            # Open maps of the old generation stay valid after the unlink
+            for name in ('vectors', 'ids', 'lists'):
+                self._file(name, old['generation']).unlink(missing_ok=True)
+            self._centroids_file(old['generation']).unlink(missing_ok=True)
+        return meta['size']
+
+    def _train(self, meta: Dict, nlist: int, iterations: int = 10, sample_size: int = 100000, chunk: int = 65536):
+        """
+        Spherical k-means on a sample of the vectors, then assign every slot to its nearest centroid
+        """
+        vectors, ids, lists = self._map(meta, 'r+')
+        size = meta['size']
+        nlist = min(nlist, size)
+        rng = np.random.default_rng(0)
+        sample = np.asarray(vectors[np.sort(rng.choice(size, min(sample_size, size), replace=False))])
+        centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+        for _ in range(iterations):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, sample)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            # Empty lists keep their old centroid
+            centroids = np.where(norms > 0, sums / np.maximum(norms, 1e-12), centroids).astype(np.float32)
+        for start in range(0, size, chunk):
+            block = np.asarray(vectors[start:start + chunk])
+            lists[start:start + len(block)] = np.where(
+                ids[start:start + len(block)] != 0, np.argmax(block @ centroids.T, axis=1), -1
+            )
+        lists.flush()
+        np.save(self._centroids_file(meta['generation']), centroids)
+        meta['nlist'] = nlist
+        meta['trained'] = size
+
+    # Searching
+
+    def _load(self):
+        """
+        (Re)map the current generation when a writer has changed it
+        """
+        meta = self._read_meta()
+        if meta['version'] == self._loaded_version:
+            return
+        vectors, ids, lists = self._map(meta, 'r')
+        self._vectors, self._ids = vectors, ids
+        self._centroid_matrix = self._centroids(meta)
+        if self._centroid_matrix is not None:
+            # Slots grouped by IVF list, and where each list starts: the
+            # trained slots once per generation, the ones added since each time
+            trained = meta.get('trained', 0)
+            if self._base_generation != meta['generation']:
+                self._base_order, self._base_starts = self._group_by_list(lists, 0, trained, meta['nlist'])
+                self._base_generation = meta['generation']
+            self._tail_order, self._tail_starts = self._group_by_list(lists, trained, meta['size'], meta['nlist'])
+        self._meta = meta
+        self._loaded_version = meta['version']
+
+    @staticmethod
+    def _group_by_list(lists: np.ndarray, start: int, stop: int, nlist: int) -> Tuple[np.ndarray, np.ndarray]:
+        assigned = np.asarray(lists[start:stop])
+        order = np.argsort(assigned, kind='stable')
+        return start + order, np.searchsorted(assigned[order], np.arange(nlist + 1))
+
+    def __len__(self):
+        with self._lock:
+            self._load()
+            return self._meta['size']
+
+    def search(self, query: np.ndarray, k: int, nprobe: Optional[int] = None) -> List[Tuple[int, float]]:
+        """
+        The ``k`` most similar jobs as [(job_id, cosine similarity)], best
+        first. With IVF lists, only the ``nprobe`` lists nearest the query
+        are scanned; ``nprobe=0`` forces a brute-force scan.
+        """
+        with self._lock:
+            self._load()
+            meta, vectors, ids = self._meta, self._vectors, self._ids
+            centroids = self._centroid_matrix
+            if centroids is not None:
+                groups = ((self._base_order, self._base_starts), (self._tail_order, self._tail_starts))
+        if not meta['size'] or k <= 0:
+            return []
+
+        nprobe = settings.JOB_EMBEDDING_NPROBE if nprobe is None else nprobe
+        if centroids is not None and 0 < nprobe < meta['nlist']:
+            probed = np.argpartition(-(centroids @ query), nprobe - 1)[:nprobe]
+            # Sorted slots read the memory map front to back
+            slots = np.sort(np.concatenate([
+                order[starts[l]:starts[l + 1]] for order, starts in groups for l in probed
+            ]))
+            scores = np.asarray(vectors[slots]) @ query
+        else:
+            slots = None
+            scores = np.asarray(vectors[:meta['size']]) @ query
+
+        k = min(k, len(scores))
+        if not k:
+            return []
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best])]
+        best_slots = slots[best] if slots is not None else best
+        return [
+            (int(ids[slot]), round(float(score), 4))
+            for slot, score in zip(best_slots, scores[best]) if ids[slot] != 0 and score > 0
+        ]
+
+_index: Optional[JobEmbeddingIndex] = None
+_index_lock = threading.Lock()
+
+def get_job_index() -> JobEmbeddingIndex:
+    """
+    The process-wide index configured in settings
+    """
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = JobEmbeddingIndex(settings.JOB_EMBEDDING_DIR, settings.JOB_EMBEDDING_DIM)
+        return _index
+
+def update_job_embeddings(jobs: Sequence) -> None:
+    """
+    Bring the index up to date with freshly written jobs: embed the active
+    ones and drop the inactive ones. Errors are logged, never raised, so a
+    broken index cannot fail a sync.
+    """
+    if not settings.JOB_EMBEDDINGS_ENABLED or not jobs:
+        return
+    try:
+        index = get_job_index()
+        active = [job for job in jobs if job.is_active]
+        if active:
+            index.upsert(
+                [job.pk for job in active],
+                np.stack([
+                    embed_job(job.title, job.requirements, job.description, job.required_skills, index.dim)
+                    for job in active
+                ])
+            )
+        index.remove([job.pk for job in jobs if not job.is_active])
+    except Exception as e:
+        logger.error(f"Error updating job embeddings: {str(e)}")
+
+def remove_job_embeddings(job_ids: Sequence[int]) -> None:
+    """
+    Drop jobs deactivated or deleted outside a sync flush; errors are logged, never raised
+    """
+    if not settings.JOB_EMBEDDINGS_ENABLED or not job_ids:
+        return
+    try:
+        get_job_index().remove(job_ids)
+    except Exception as e:
+        logger.error(f"Error removing job embeddings: {str(e)}")
+
+# Ids of jobs saved or deleted in this thread and not yet in the index
+_pending = threading.local()
+
+def _job_changed(job_id: int):
+    if not settings.JOB_EMBEDDINGS_ENABLED:
+        return
+    if not hasattr(_pending, 'ids'):
+        _pending.ids = set()
+    _pending.ids.add(job_id)
+    transaction.on_commit(_flush_pending)
+
+def _flush_pending():
+    """
+    Update the index for every job changed in the committed transaction at once
+    """
+    from ..models import Job
+
+    job_ids, _pending.ids = _pending.ids, set()
+    if not job_ids:
+        # An earlier hook of the same commit took them
+        return
+    # Reloaded, so ids left over from a rolled-back transaction get their committed state
+    jobs = list(Job.objects.filter(pk__in=job_ids).only(
+        'title', 'requirements', 'description', 'required_skills', 'is_active'
+    ))
+    update_job_embeddings(jobs)
+    remove_job_embeddings(list(job_ids - {job.pk for job in jobs}))
+
+def job_saved(sender, instance, **kwargs):
+    # post_save of a Job: the index follows once the row is committed
+    _job_changed(instance.pk)
+
+def job_deleted(sender, instance, **kwargs):
+    _job_changed(instance.pk)
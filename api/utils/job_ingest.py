@@ -0,0 +1,165 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+from django.conf import settings
+from django.db import connection, transaction
+from .job_embeddings import remove_job_embeddings, update_job_embeddings
+from . import metrics
+import hashlib
+import logging
+import json
+import time
+
+logger = logging.getLogger(__name__)
+
+def _strip_keys(value, ignore: frozenset):
+    if isinstance(value, dict):
+        return {k: _strip_keys(v, ignore) for k, v in value.items() if k not in ignore}
+    if isinstance(value, list):
+        return [_strip_keys(v, ignore) for v in value]
+    return value
+
+def payload_hash(payload: Dict, ignore: Iterable[str] = ()) -> str:
+    """
+    Stable SHA-256 of a JSON payload, independent of key order and
+    blind to the (nested) keys listed in ``ignore``
+    """
+    normalized = _strip_keys(payload, frozenset(ignore))
+    encoded = json.dumps(normalized, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+class JobIngestor:
+    """
+    Buffers synced jobs and writes them with one bulk upsert per batch
+    """
+    UPDATE_FIELDS = [
+        'title', 'company', 'location', 'description', 'requirements',
+        'salary_range', 'job_type', 'is_active', 'required_skills',
+        'listing_hash', 'content_hash'
+    ]
+    # required_skills is derived locally, so a new skill dictionary changes it without changing the payload
+    COMPARE_FIELDS = ['listing_hash', 'content_hash', 'is_active', 'required_skills']
+
+    def __init__(self, source: str = 'hh', batch_size: int = None):
+        self.source = source
+        self.batch_size = batch_size or settings.HH_SYNC_BATCH_SIZE
+        self.stats = {'inserted': 0, 'updated': 0, 'unchanged': 0}
+        self._buffer: Dict[str, Tuple['Job', Optional[Dict]]] = {}
+
+    @property
+    def pending(self) -> int:
+        return len(self._buffer)
+
+    @property
+    def is_full(self) -> bool:
+        return len(self._buffer) >= self.batch_size
+
+    def add(self, jobs: Iterable[Tuple['Job', Optional[Dict]]]):
+        """
+        Buffer (job, raw payload) pairs
+        """
+        for job, payload in jobs:
+            job.source = self.source
+            # Later copies of the same vacancy win
+            self._buffer[job.external_id] = (job, payload)
+
+    def flush(self):
+        """
+        Upsert everything buffered in a single transaction
+        """
+        from ..models import Job, JobPayload
+
+        if not self._buffer:
+            return
+        batch, self._buffer = self._buffer, {}
+        started = time.perf_counter()
+        before = dict(self.stats)
+
+        with transaction.atomic():
+            existing = {
+                row['external_id']: row
+                for row in Job.objects.filter(
+                    source=self.source,
+                    external_id__in=list(batch)
+                ).values('external_id', *self.COMPARE_FIELDS)
+            }
+            changed: List[Job] = []
+            for external_id, (job, _) in batch.items():
+                row = existing.get(external_id)
+                if row is None:
+                    self.stats['inserted'] += 1
+                elif any(getattr(job, field) != row[field] for field in self.COMPARE_FIELDS):
+                    self.stats['updated'] += 1
+                else:
+                    self.stats['unchanged'] += 1
+                    continue
+                changed.append(job)
+
+            if changed:
+                Job.objects.bulk_create(
+                    changed,
+                    update_conflicts=True,
+                    unique_fields=['source', 'external_id'],
+                    update_fields=self.UPDATE_FIELDS
+                )
+                # Not every backend returns ids from an upsert
+                missing_ids = [job.external_id for job in changed if job.pk is None]
+                if missing_ids:
+                    ids = dict(Job.objects.filter(
+                        source=self.source, external_id__in=missing_ids
+                    ).values_list('external_id', 'id'))
+                    for job in changed:
+                        job.pk = job.pk or ids[job.external_id]
+
+                JobPayload.objects.bulk_create(
+                    [
+                        JobPayload.from_payload(job, batch[job.external_id][1])
+                        for job in changed if batch[job.external_id][1] is not None
+                    ],
+                    update_conflicts=True,
+                    unique_fields=['job'],
+                    update_fields=['data', 'raw_size', 'updated_at']
+                )
+
+        metrics.SYNC_FLUSH_LATENCY.observe(time.perf_counter() - started, source=self.source)
+        for result, count in self.stats.items():
+            if count > before[result]:
+                metrics.SYNC_ROWS.inc(count - before[result], source=self.source, result=result)
+        update_job_embeddings(changed)
+        logger.info(f"Ingested {len(batch)} {self.source} jobs ({len(changed)} written)")
+
+def deactivate_missing(source: str, seen_ids: Iterable[str], chunk_size: int = 1000) -> int:
+    """
+    Mark every active job of ``source`` whose external_id is not in
+    ``seen_ids`` inactive, in one UPDATE joined against a temp table
+    holding the seen ids, and drop their embeddings. Returns the number
+    of deactivated jobs.
+    """
+    from ..models import Job
+
+    qn = connection.ops.quote_name
+    job_table = qn(Job._meta.db_table)
+    # The temp table's primary key rejects a repeated id
+    seen_ids = list(set(seen_ids))
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute("DROP TABLE IF EXISTS sync_seen_ids")
+        cursor.execute("CREATE TEMPORARY TABLE sync_seen_ids (external_id varchar(100) PRIMARY KEY)")
+        for start in range(0, len(seen_ids), chunk_size):
+            chunk = seen_ids[start:start + chunk_size]
+            cursor.execute(
+                "INSERT INTO sync_seen_ids (external_id) VALUES " + ", ".join(["(%s)"] * len(chunk)),
+                chunk
+            )
+        cursor.execute(
+            f"UPDATE {job_table} SET {qn('is_active')} = %s "
+            f"WHERE {qn('source')} = %s AND {qn('is_active')} = %s "
+            f"AND {qn('external_id')} IS NOT NULL "
+            f"AND NOT EXISTS (SELECT 1 FROM sync_seen_ids s WHERE s.external_id = {job_table}.{qn('external_id')}) "
+            f"RETURNING {qn('id')}",
+            [False, source, True]
+        )
+        deactivated = [job_id for job_id, in cursor.fetchall()]
+        cursor.execute("DROP TABLE sync_seen_ids")
+
+    remove_job_embeddings(deactivated)
+    logger.info(f"Deactivated {len(deactivated)} {source} jobs missing from the latest full sync")
+    return len(deactivated)
@@ -0,0 +1,106 @@
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVectorField, TrigramWordSimilarity
+from django.db import connection
+from django.db.models import FloatField, Q, QuerySet
+from django.db.models.expressions import RawSQL
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+# Text search configuration of the stored vector created by migration 0014;
+# queries must use the same one. "russian" stems Cyrillic words and, through
+# english_stem, Latin ones.
+SEARCH_CONFIG = 'russian'
+
+# SQLite: the FTS5 table and triggers of migration 0014, for restoring them
+# after a later migration remakes api_job
+SQLITE_TABLE = """
+    CREATE VIRTUAL TABLE IF NOT EXISTS api_job_fts USING fts5(
+        title, company, requirements, description,
+        content='api_job', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+    )
+"""
+SQLITE_TRIGGERS = {
+    'api_job_fts_insert': """
+        CREATE TRIGGER api_job_fts_insert AFTER INSERT ON api_job BEGIN
+            INSERT INTO api_job_fts(rowid, title, company, requirements, description)
+            VALUES (new.id, new.title, new.company, new.requirements, new.description);
+        END
+    """,
+    'api_job_fts_delete': """
+        CREATE TRIGGER api_job_fts_delete AFTER DELETE ON api_job BEGIN
+            INSERT INTO api_job_fts(api_job_fts, rowid, title, company, requirements, description)
+            VALUES ('delete', old.id, old.title, old.company, old.requirements, old.description);
+        END
+    """,
+    'api_job_fts_update': """
+        CREATE TRIGGER api_job_fts_update AFTER UPDATE OF title, company, requirements, description ON api_job BEGIN
+            INSERT INTO api_job_fts(api_job_fts, rowid, title, company, requirements, description)
+            VALUES ('delete', old.id, old.title, old.company, old.requirements, old.description);
+            INSERT INTO api_job_fts(rowid, title, company, requirements, description)
+            VALUES (new.id, new.title, new.company, new.requirements, new.description);
+        END
+    """,
+}
+# bm25() weights of title, company, requirements and description
+SQLITE_WEIGHTS = (10.0, 5.0, 2.0, 1.0)
+
+def repair_sqlite_search_index(connection):
+    """
+    Recreate missing SQLite search triggers and rebuild the index, since
+    remaking api_job in a migration drops them; a no-op when all are there
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(SQLITE_TABLE)
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'api_job'")
+        existing = {name for name, in cursor.fetchall()}
+        missing = [name for name in SQLITE_TRIGGERS if name not in existing]
+        if missing:
+            for name in missing:
+                cursor.execute(SQLITE_TRIGGERS[name])
+            cursor.execute("INSERT INTO api_job_fts(api_job_fts) VALUES ('rebuild')")
+            logger.info(f"Rebuilt the job search index ({', '.join(missing)} were missing)")
+
+def _fts5_query(text: str) -> str:
+    # Every word must appear, as a prefix so inflected forms match too;
+    # quoting keeps FTS5 syntax in user input from being interpreted
+    return ' '.join(f'"{word}"*' for word in re.findall(r'\w+', text))
+
+def search_jobs(queryset: QuerySet, text: str) -> QuerySet:
+    """
+    Jobs of ``queryset`` matching a free-text query on title, company,
+    requirements and description, best first
+    """
+    vendor = connection.vendor
+    qn = connection.ops.quote_name
+    meta = queryset.model._meta
+    if vendor == 'postgresql':
+        query = SearchQuery(text, config=SEARCH_CONFIG, search_type='websearch')
+        # search_vector is maintained by the database, not a model field
+        document = RawSQL(f'{qn(meta.db_table)}.search_vector', [], output_field=SearchVectorField())
+        # Either index can answer: the vector for the words, the trigram for a misspelled title
+        return queryset.alias(document=document).filter(
+            Q(document=query) | Q(title__trigram_word_similar=text)
+        ).annotate(
+            rank=SearchRank(document, query) + TrigramWordSimilarity(text, 'title')
+        ).order_by('-rank', '-posted_date')
+    if vendor == 'sqlite':
+        match = _fts5_query(text)
+        if not match:
+            return queryset.none()
+        fts = qn(f'{meta.db_table}_fts')
+        weights = ', '.join(map(str, SQLITE_WEIGHTS))
+        # bm25() is lower for better matches, and only defined in the query doing the MATCH
+        return queryset.filter(
+            pk__in=RawSQL(f'SELECT rowid FROM {fts} WHERE {fts} MATCH %s', [match])
+        ).annotate(
+            rank=RawSQL(
+                f'SELECT bm25({fts}, {weights}) FROM {fts} '
+                f'WHERE {fts} MATCH %s AND {fts}.rowid = {qn(meta.db_table)}.{qn(meta.pk.column)}',
+                [match], output_field=FloatField()
+            )
+        ).order_by('rank', '-posted_date')
+    return queryset.filter(
+        Q(title__icontains=text) | Q(company__icontains=text)
+        | Q(requirements__icontains=text) | Q(description__icontains=text)
+    ).order_by('-posted_date')
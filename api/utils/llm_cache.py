@@ -0,0 +1,88 @@
+from typing import Any, Dict, List, Optional
+from django.conf import settings
+from .cache_backends import BaseCacheBackend, get_cache_backend
+import threading
+import hashlib
+import logging
+import json
+import time
+
+logger = logging.getLogger(__name__)
+
+class LLMCache:
+    """
+    Content-addressed cache of LLM completions.
+
+    Keys are ``llm:<operation>:v<prompt version>:<sha256 of model, messages
+    and parameters>``, so identical requests share an entry and bumping an
+    operation's prompt version makes its old entries unreachable. Entries
+    older than the operation's TTL are treated as misses.
+    """
+    def __init__(self, backend: BaseCacheBackend, ttls: Dict[str, int], default_ttl: int = 0):
+        self.backend = backend
+        self.ttls = ttls
+        self.default_ttl = default_ttl
+        self._stats = {'hits': 0, 'misses': 0, 'stores': 0}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(operation: str, version: int, model: str, messages: List[Dict], params: Dict) -> str:
+        body = json.dumps(
+            {'model': model, 'messages': messages, 'params': params},
+            sort_keys=True, ensure_ascii=False
+        )
+        return f"llm:{operation}:v{version}:" + hashlib.sha256(body.encode('utf-8')).hexdigest()
+
+    @property
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 3) if lookups else 0.0
+        stats['evictions'] = self.backend.evictions
+        return stats
+
+    def _count(self, name: str):
+        with self._lock:
+            self._stats[name] += 1
+
+    def get(self, operation: str, key: str) -> Optional[str]:
+        entry = self.backend.get(key)
+        if entry is None or time.time() - entry.stored_at >= self.ttls.get(operation, self.default_ttl):
+            self._count('misses')
+            return None
+        self._count('hits')
+        return entry.value.decode('utf-8')
+
+    def set(self, operation: str, key: str, content: str):
+        if self.ttls.get(operation, self.default_ttl) <= 0:
+            return
+        self.backend.set(key, content.encode('utf-8'), {'operation': operation})
+        self._count('stores')
+
+    def invalidate(self, operation: Optional[str] = None) -> int:
+        """
+        Drop every cached completion, or only those of one operation
+        """
+        removed = self.backend.delete_prefix(f"llm:{operation}:" if operation else "llm:")
+        logger.info(f"Invalidated {removed} cached LLM completions for {operation or 'all operations'}")
+        return removed
+
+_cache: Any = None
+_cache_lock = threading.Lock()
+
+def get_llm_cache() -> Optional[LLMCache]:
+    """
+    The process-wide cache configured in settings, or None when disabled
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            backend = get_cache_backend(
+                settings.LLM_CACHE_BACKEND,
+                path=settings.LLM_CACHE_PATH,
+                max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+                max_bytes=settings.LLM_CACHE_MAX_BYTES
+            )
+            _cache = LLMCache(backend, settings.LLM_CACHE_TTLS) if backend else False
+        return _cache or None
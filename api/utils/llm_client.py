@@ -0,0 +1,130 @@
+from typing import Dict, Iterator, List, Optional
+from django.conf import settings
+from .llm_providers import BaseLLMProvider, get_llm_provider
+import openai
+import threading
+import asyncio
+import logging
+import httpx
+import weakref
+
+logger = logging.getLogger(__name__)
+
+class LLMClient(BaseLLMProvider):
+    """
+    OpenAI chat completions, shared by the whole process.
+
+    The sync client keeps one pooled HTTP connection set for the life of the
+    process. Async calls get a client per event loop, since httpx async
+    connections cannot outlive their loop.
+    """
+    name = 'openai'
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: Optional[str] = None,
+        timeout: float = 60,
+        connect_timeout: float = 5,
+        max_retries: int = 3,
+        backoff: float = 1.0,
+        pool_size: int = 20,
+        max_concurrency: int = 8
+    ):
+        super().__init__(max_retries=max_retries, backoff=backoff, max_concurrency=max_concurrency)
+        self.api_key = api_key
+        self.base_url = base_url or None
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self.limits = httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+        # Retries are ours, so they show up in the stats
+        self.client = openai.OpenAI(
+            api_key=api_key,
+            base_url=self.base_url,
+            max_retries=0,
+            timeout=self.timeout,
+            http_client=httpx.Client(limits=self.limits, timeout=self.timeout)
+        )
+        self._async_clients = weakref.WeakKeyDictionary()
+
+    @classmethod
+    def from_settings(cls) -> 'LLMClient':
+        return cls(
+            api_key=settings.OPENAI_API_KEY,
+            base_url=settings.OPENAI_BASE_URL,
+            timeout=settings.LLM_TIMEOUT,
+            connect_timeout=settings.LLM_CONNECT_TIMEOUT,
+            max_retries=settings.LLM_MAX_RETRIES,
+            backoff=settings.LLM_RETRY_BACKOFF,
+            pool_size=settings.LLM_POOL_SIZE,
+            max_concurrency=settings.LLM_MAX_CONCURRENCY
+        )
+
+    def _content(self, response, model: str) -> str:
+        if response.usage is not None:
+            self._record_usage(model, response.usage.prompt_tokens, response.usage.completion_tokens)
+        return response.choices[0].message.content
+
+    def _create(self, messages: List[Dict], model: str, **params) -> str:
+        return self._content(self.client.chat.completions.create(model=model, messages=messages, **params), model)
+
+    def _async_client(self) -> openai.AsyncOpenAI:
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            client = self._async_clients[loop] = openai.AsyncOpenAI(
+                api_key=self.api_key,
+                base_url=self.base_url,
+                max_retries=0,
+                timeout=self.timeout,
+                http_client=httpx.AsyncClient(limits=self.limits, timeout=self.timeout)
+            )
+        return client
+
+    async def _acreate(self, messages: List[Dict], model: str, **params) -> str:
+        response = await self._async_client().chat.completions.create(model=model, messages=messages, **params)
+        return self._content(response, model)
+
+    def _open_stream(self, messages: List[Dict], model: str, **params) -> Iterator[str]:
+        stream = self.client.chat.completions.create(
+            model=model, messages=messages, stream=True, stream_options={'include_usage': True}, **params
+        )
+
+        def pieces():
+            try:
+                for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+                    # The last chunk carries usage and no choices
+                    if chunk.usage is not None:
+                        self._record_usage(model, chunk.usage.prompt_tokens, chunk.usage.completion_tokens)
+            finally:
+                stream.close()
+        return pieces()
+
+    async def aclose(self):
+        client = self._async_clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.close()
+
+_clients: Dict[str, BaseLLMProvider] = {}
+_client_lock = threading.Lock()
+
+def _provider(name: str) -> BaseLLMProvider:
+    with _client_lock:
+        if name not in _clients:
+            _clients[name] = get_llm_provider(name)
+        return _clients[name]
+
+def get_llm_client() -> BaseLLMProvider:
+    """
+    The process-wide provider selected by LLM_PROVIDER
+    """
+    return _provider(settings.LLM_PROVIDER)
+
+def get_llm_fallback() -> Optional[BaseLLMProvider]:
+    """
+    The provider to answer with when LLM_PROVIDER fails, if LLM_FALLBACK_PROVIDER is set
+    """
+    if not settings.LLM_FALLBACK_PROVIDER or settings.LLM_FALLBACK_PROVIDER == settings.LLM_PROVIDER:
+        return None
+    return _provider(settings.LLM_FALLBACK_PROVIDER)
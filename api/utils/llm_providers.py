@@ -0,0 +1,332 @@
+from typing import Dict, Iterator, List, Optional
+from django.conf import settings
+from .prompt_builder import count_tokens, split_resume_sections
+from . import metrics
+import threading
+import asyncio
+import logging
+import random
+import httpx
+import json
+import openai
+import time
+import weakref
+import re
+
+logger = logging.getLogger(__name__)
+
+# Failures worth another attempt; anything else (bad request, auth) is raised at once
+RETRYABLE_ERRORS = (
+    openai.APIConnectionError,
+    openai.APITimeoutError,
+    openai.RateLimitError,
+    openai.InternalServerError,
+)
+
+class BaseLLMProvider:
+    """
+    A chat-completion backend. Subclasses implement single attempts
+    (``_create``, ``_acreate``, ``_open_stream``); this class adds retries
+    with exponential backoff and jitter, a per-event-loop cap on async
+    calls in flight, and request, error and latency counts.
+    """
+    name = ''
+
+    def __init__(self, max_retries: int = 3, backoff: float = 1.0, max_concurrency: int = 8):
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_concurrency = max_concurrency
+        self._semaphores = weakref.WeakKeyDictionary()
+        self._stats = {
+            'requests': 0, 'errors': 0, 'retries': 0, 'in_flight': 0,
+            'latency_total': 0.0, 'latency_max': 0.0
+        }
+        self._lock = threading.Lock()
+
+    @property
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats)
+        latency_total = stats.pop('latency_total')
+        completed = stats['requests'] - stats['in_flight']
+        stats['provider'] = self.name
+        stats['latency_avg_ms'] = round(latency_total / completed * 1000, 1) if completed else 0.0
+        stats['latency_max_ms'] = round(stats.pop('latency_max') * 1000, 1)
+        return stats
+
+    def _started(self):
+        with self._lock:
+            self._stats['requests'] += 1
+            self._stats['in_flight'] += 1
+
+    def _finished(self, started: float, error: bool):
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self._stats['in_flight'] -= 1
+            self._stats['latency_total'] += elapsed
+            self._stats['latency_max'] = max(self._stats['latency_max'], elapsed)
+            if error:
+                self._stats['errors'] += 1
+
+    def _retry_delay(self, attempt: int, error: Exception) -> Optional[float]:
+        """
+        Seconds to wait before the next attempt, or None to give up
+        """
+        if attempt >= self.max_retries or not isinstance(error, RETRYABLE_ERRORS):
+            return None
+        with self._lock:
+            self._stats['retries'] += 1
+        delay = self.backoff * 2 ** attempt * (0.5 + random.random())
+        logger.warning(f"LLM request failed ({error.__class__.__name__}), retrying in {delay:.1f}s")
+        return delay
+
+    def _record_usage(self, model: str, prompt_tokens: int, completion_tokens: int):
+        metrics.LLM_TOKENS.inc(prompt_tokens, provider=self.name, model=model, kind='prompt')
+        metrics.LLM_TOKENS.inc(completion_tokens, provider=self.name, model=model, kind='completion')
+
+    def _create(self, messages: List[Dict], model: str, **params) -> str:
+        raise NotImplementedError
+
+    async def _acreate(self, messages: List[Dict], model: str, **params) -> str:
+        return await asyncio.to_thread(self._create, messages, model, **params)
+
+    def _open_stream(self, messages: List[Dict], model: str, **params) -> Iterator[str]:
+        """
+        Start a completion and return an iterator over its pieces; errors
+        starting it must be raised here, not on the first next()
+        """
+        return iter([self._create(messages, model, **params)])
+
+    def chat(self, messages: List[Dict], model: str, **params) -> str:
+        """
+        Return the content of a chat completion
+        """
+        attempt = 0
+        while True:
+            started = time.perf_counter()
+            self._started()
+            try:
+                content = self._create(messages, model, **params)
+            except Exception as e:
+                self._finished(started, error=True)
+                delay = self._retry_delay(attempt, e)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                attempt += 1
+                continue
+            self._finished(started, error=False)
+            return content
+
+    def stream_chat(self, messages: List[Dict], model: str, **params) -> Iterator[str]:
+        """
+        Yield the content of a chat completion piece by piece as it is
+        generated. Only opening the stream is retried; a failure after the
+        first piece is raised to the caller.
+        """
+        attempt = 0
+        while True:
+            started = time.perf_counter()
+            self._started()
+            try:
+                stream = self._open_stream(messages, model, **params)
+            except Exception as e:
+                self._finished(started, error=True)
+                delay = self._retry_delay(attempt, e)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                attempt += 1
+                continue
+            break
+
+        error = True
+        try:
+            yield from stream
+            error = False
+        finally:
+            if hasattr(stream, 'close'):
+                stream.close()
+            self._finished(started, error=error)
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        return semaphore
+
+    async def achat(self, messages: List[Dict], model: str, **params) -> str:
+        """
+        Async chat(), waiting for a free slot when ``max_concurrency`` calls
+        are already in flight on this event loop
+        """
+        semaphore = self._semaphore()
+        attempt = 0
+        while True:
+            async with semaphore:
+                started = time.perf_counter()
+                self._started()
+                try:
+                    content = await self._acreate(messages, model, **params)
+                except Exception as e:
+                    self._finished(started, error=True)
+                    delay = self._retry_delay(attempt, e)
+                    if delay is None:
+                        raise
+                else:
+                    self._finished(started, error=False)
+                    return content
+            # Back off outside the semaphore so waiting retries do not hold slots
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def aclose(self):
+        """
+        Release what async calls opened on the running event loop; call before the loop ends
+        """
+
+SKILL_SPLIT_RE = re.compile(r"[,;•|/\n]+")
+PROMPT_FIELD_RE = r"^\s*{}:\s*(.*)$"
+
+def _prompt_field(prompt: str, name: str) -> str:
+    match = re.search(PROMPT_FIELD_RE.format(re.escape(name)), prompt, re.MULTILINE)
+    return match.group(1).strip() if match else ''
+
+def _split_skills(text: str) -> List[str]:
+    return list(dict.fromkeys(skill.strip(' -') for skill in SKILL_SPLIT_RE.split(text) if skill.strip(' -')))
+
+class RuleBasedLLMProvider(BaseLLMProvider):
+    """
+    Answers AIService prompts without a model: resume sections are split at
+    their headings, match scores are the share of required skills the
+    resume lists, and cover letters are filled-in templates. Output is a
+    function of the prompt only, which makes it a deterministic stand-in
+    and a last-resort fallback when the real provider is down.
+    """
+    name = 'rules'
+
+    def _create(self, messages: List[Dict], model: str, **params) -> str:
+        system, prompt = messages[0]['content'], messages[-1]['content']
+        if 'resume' in system and 'extract' in system:
+            content = json.dumps(self._parse_resume(prompt.split('\n\n', 1)[-1]), ensure_ascii=False)
+        elif 'recruiter' in system:
+            content = json.dumps(self._job_match(prompt), ensure_ascii=False)
+        elif 'cover letter' in system:
+            content = self._cover_letter(prompt)
+        else:
+            raise ValueError("The rule-based provider does not recognise this prompt")
+        # Estimated the way a model would be billed, so offline runs report comparable usage
+        self._record_usage(model, sum(count_tokens(message['content']) for message in messages), count_tokens(content))
+        return content
+
+    @staticmethod
+    def _parse_resume(text: str) -> Dict:
+        sections = {}
+        for name, body in split_resume_sections(text):
+            sections.setdefault(name, []).extend(line.strip() for line in body.splitlines()[1:] if line.strip())
+        return {
+            'skills': _split_skills('\n'.join(sections.get('skills', []))),
+            'experience': sections.get('experience', []),
+            'education': sections.get('education', []),
+            'key_achievements': sections.get('achievements', []),
+        }
+
+    @staticmethod
+    def _job_match(prompt: str) -> Dict:
+        resume_skills = {skill.lower(): skill for skill in _split_skills(_prompt_field(prompt, 'Resume Skills'))}
+        required = _split_skills(_prompt_field(prompt, 'Required Skills'))
+        if not required:
+            # No skill list on the job: look for the resume's skills in its requirements
+            requirements = _prompt_field(prompt, 'Job Requirements').lower()
+            required = [skill for key, skill in resume_skills.items() if key in requirements] or list(resume_skills.values())
+        matched = [skill for skill in required if skill.lower() in resume_skills]
+        missing = [skill for skill in required if skill.lower() not in resume_skills]
+        score = round(100 * len(matched) / len(required)) if required else 0
+        return {
+            'score': score,
+            'analysis': (
+                f"Matched skills: {', '.join(matched) or 'none'}. "
+                f"Missing skills: {', '.join(missing) or 'none'}."
+            )
+        }
+
+    @staticmethod
+    def _cover_letter(prompt: str) -> str:
+        title = _prompt_field(prompt, 'Title') or 'the open position'
+        company = _prompt_field(prompt, 'Company') or 'your company'
+        skills = _split_skills(_prompt_field(prompt, 'Skills'))[:5]
+        strengths = f" My experience with {', '.join(skills)} fits the role's requirements." if skills else ''
+        return (
+            f"Dear Hiring Manager,\n\n"
+            f"I am writing to apply for the {title} position at {company}.{strengths} "
+            f"I would welcome the chance to discuss how I can contribute to your team.\n\n"
+            f"Sincerely,\nApplicant"
+        )
+
+class FakeLLMProvider(RuleBasedLLMProvider):
+    """
+    The rule-based provider behind a simulated network: every call takes
+    ``latency`` seconds and fails with a retryable connection error at
+    ``error_rate``. Failures come from a seeded generator, so a run of the
+    same calls fails the same way every time.
+    """
+    name = 'fake'
+
+    def __init__(self, latency: float = 0.5, error_rate: float = 0.0, seed: int = 0, **options):
+        super().__init__(**options)
+        self.latency = latency
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._random_lock = threading.Lock()
+
+    def _maybe_fail(self):
+        with self._random_lock:
+            failed = self._random.random() < self.error_rate
+        if failed:
+            raise openai.APIConnectionError(request=httpx.Request('POST', 'http://fake-llm/v1/chat/completions'))
+
+    def _create(self, messages: List[Dict], model: str, **params) -> str:
+        time.sleep(self.latency)
+        self._maybe_fail()
+        return super()._create(messages, model, **params)
+
+    async def _acreate(self, messages: List[Dict], model: str, **params) -> str:
+        await asyncio.sleep(self.latency)
+        self._maybe_fail()
+        return super()._create(messages, model, **params)
+
+    def _open_stream(self, messages: List[Dict], model: str, **params) -> Iterator[str]:
+        # First piece after a tenth of the latency, the rest spread over the remainder
+        time.sleep(self.latency / 10)
+        self._maybe_fail()
+        words = re.findall(r"\S+\s*", super()._create(messages, model, **params))
+
+        def pieces():
+            for word in words:
+                yield word
+                time.sleep(self.latency * 0.9 / max(len(words), 1))
+        return pieces()
+
+def get_llm_provider(name: str) -> BaseLLMProvider:
+    """
+    Build a provider from settings by name ('openai', 'fake', 'rules')
+    """
+    options = {
+        'max_retries': settings.LLM_MAX_RETRIES,
+        'backoff': settings.LLM_RETRY_BACKOFF,
+        'max_concurrency': settings.LLM_MAX_CONCURRENCY,
+    }
+    if name == 'openai':
+        from .llm_client import LLMClient
+        return LLMClient.from_settings()
+    if name == 'fake':
+        return FakeLLMProvider(
+            latency=settings.LLM_FAKE_LATENCY,
+            error_rate=settings.LLM_FAKE_ERROR_RATE,
+            seed=settings.LLM_FAKE_SEED,
+            **options
+        )
+    if name == 'rules':
+        return RuleBasedLLMProvider(**options)
+    raise ValueError(f"Unknown LLM provider: {name}")
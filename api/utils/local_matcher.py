@@ -0,0 +1,133 @@
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from django.conf import settings
+from django.db.models import Count, Max
+import numpy as np
+import threading
+import logging
+import time
+import re
+
+logger = logging.getLogger(__name__)
+
+TOKEN_RE = re.compile(r"[\w+#]+(?:\.[\w+#]+)*")
+STOP_WORDS = {
+    'and', 'or', 'the', 'of', 'in', 'to', 'for', 'with', 'on', 'at', 'a', 'an',
+    'is', 'are', 'be', 'as', 'we', 'you', 'our', 'your', 'will', 'experience',
+    'и', 'в', 'на', 'с', 'по', 'для', 'от', 'до', 'не', 'или', 'опыт', 'работы', 'знание',
+}
+# Weight of a match on a job's required skill versus a word of its title/requirements
+SKILL_WEIGHT = 1.0
+TEXT_WEIGHT = 0.5
+
+def _skill_terms(skills: Iterable[str]) -> List[str]:
+    return sorted({f"s:{skill.strip().lower()}" for skill in skills or [] if skill and skill.strip()})
+
+def _text_terms(text: str) -> List[str]:
+    return sorted({
+        f"t:{token}" for token in TOKEN_RE.findall((text or '').lower())
+        if len(token) > 1 and token not in STOP_WORDS
+    })
+
+class LocalMatchIndex:
+    """
+    Sparse TF-IDF matrix of active jobs over their required skills and
+    title/requirements words, stored as flat NumPy arrays so a resume is
+    scored against every job with a handful of vectorized passes.
+    """
+    def __init__(self, jobs: Iterable[Tuple[int, str, str, Sequence[str]]]):
+        vocabulary: Dict[str, int] = {}
+        job_ids, rows, columns = [], [], []
+        for row, (job_id, title, requirements, skills) in enumerate(jobs):
+            job_ids.append(job_id)
+            for term in _skill_terms(skills) + _text_terms(f"{title} {requirements}"):
+                rows.append(row)
+                columns.append(vocabulary.setdefault(term, len(vocabulary)))
+
+        self.vocabulary = vocabulary
+        self.job_ids = np.asarray(job_ids, dtype=np.int64)
+        self.rows = np.asarray(rows, dtype=np.int32)
+        self.columns = np.asarray(columns, dtype=np.int32)
+
+        size = len(vocabulary)
+        is_skill = np.zeros(size, dtype=bool)
+        for term, column in vocabulary.items():
+            is_skill[column] = term.startswith('s:')
+        document_frequency = np.bincount(self.columns, minlength=size)
+        self.idf = (np.log((1 + len(job_ids)) / (1 + document_frequency)) + 1).astype(np.float32)
+        self.idf *= np.where(is_skill, SKILL_WEIGHT, TEXT_WEIGHT).astype(np.float32)
+        self.is_skill = is_skill
+
+        # Per-entry weights and skill flags, so queries only gather the query vector
+        self.weights = self.idf[self.columns]
+        self.entry_is_skill = is_skill[self.columns]
+        self.norms = np.sqrt(np.bincount(self.rows, weights=self.weights ** 2, minlength=len(job_ids)))
+        self.skill_counts = np.bincount(self.rows, weights=self.entry_is_skill, minlength=len(job_ids))
+        self.built_at = time.time()
+
+    def __len__(self):
+        return len(self.job_ids)
+
+    def score(self, skills: Iterable[str]) -> np.ndarray:
+        """
+        Score every job against a resume's skills, 0-100: the mean of the
+        TF-IDF cosine similarity and the Jaccard index of the skill sets
+        """
+        skills = list(skills or [])
+        terms = _skill_terms(skills) + _text_terms(' '.join(skills))
+        query = np.zeros(len(self.vocabulary), dtype=np.float32)
+        for term in terms:
+            column = self.vocabulary.get(term)
+            if column is not None:
+                query[column] = self.idf[column]
+        query_norm = float(np.sqrt((query ** 2).sum()))
+        if not len(self.job_ids) or query_norm == 0:
+            return np.zeros(len(self.job_ids), dtype=np.float32)
+
+        hits = query[self.columns]
+        dot = np.bincount(self.rows, weights=hits * self.weights, minlength=len(self.job_ids))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cosine = np.nan_to_num(dot / (self.norms * query_norm))
+
+            resume_skills = len(_skill_terms(skills))
+            shared = np.bincount(self.rows, weights=(hits > 0) & self.entry_is_skill, minlength=len(self.job_ids))
+            jaccard = np.nan_to_num(shared / (self.skill_counts + resume_skills - shared))
+
+        return (50 * (cosine + jaccard)).astype(np.float32)
+
+    def top_k(self, skills: Iterable[str], k: int, job_ids: Optional[Iterable[int]] = None) -> List[Tuple[int, float]]:
+        """
+        The k best (job_id, score) pairs, optionally among ``job_ids`` only
+        """
+        scores = self.score(skills)
+        if job_ids is not None:
+            scores = np.where(np.isin(self.job_ids, np.fromiter(job_ids, dtype=np.int64)), scores, -1)
+        k = min(k, len(scores))
+        if k <= 0:
+            return []
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best])]
+        return [(int(self.job_ids[i]), round(float(scores[i]), 2)) for i in best if scores[i] > 0]
+
+_index: Optional[LocalMatchIndex] = None
+_index_key = None
+_index_lock = threading.Lock()
+
+def get_index() -> LocalMatchIndex:
+    """
+    The process-wide index of active jobs, rebuilt when jobs were added or
+    removed, or when it is older than LOCAL_MATCH_INDEX_TTL
+    """
+    from ..models import Job
+
+    global _index, _index_key
+    active = Job.objects.filter(is_active=True)
+    key = tuple(active.aggregate(count=Count('id'), last=Max('id')).values())
+    with _index_lock:
+        if _index is None or _index_key != key or time.time() - _index.built_at > settings.LOCAL_MATCH_INDEX_TTL:
+            started = time.perf_counter()
+            _index = LocalMatchIndex(
+                active.values_list('id', 'title', 'requirements', 'required_skills').iterator(chunk_size=5000)
+            )
+            _index_key = key
+            logger.info(f"Built local match index of {len(_index)} jobs in {time.perf_counter() - started:.2f}s")
+        return _index
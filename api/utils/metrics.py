@@ -0,0 +1,293 @@
+from bisect import bisect_left
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+from django.conf import settings
+import threading
+import logging
+import socket
+import atexit
+import fcntl
+import json
+import time
+import os
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+# Values recorded by this process: (metric name, label values) -> count or histogram state
+_values: Dict[Tuple[str, Tuple[str, ...]], object] = {}
+_lock = threading.Lock()
+_last_flush = 0.0
+_changed = False
+# Process that runs the background flush thread; a forked child starts its own
+_flusher_pid = 0
+_flusher_lock = threading.Lock()
+
+REGISTRY: Dict[str, 'Metric'] = {}
+
+class Metric:
+    type = ''
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        REGISTRY[name] = self
+
+    def _key(self, labels: Dict) -> Tuple[str, Tuple[str, ...]]:
+        return self.name, tuple(str(labels.get(label, '')) for label in self.labelnames)
+
+class Counter(Metric):
+    type = 'counter'
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        global _changed
+        with _lock:
+            _values[key] = _values.get(key, 0) + amount
+            _changed = True
+        _maybe_flush()
+
+class Histogram(Metric):
+    """
+    Observations counted into cumulative ``le`` buckets, plus their sum and count
+    """
+    type = 'histogram'
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = (), buckets: Iterable[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, **labels):
+        global _changed
+        key = self._key(labels)
+        with _lock:
+            _changed = True
+            # Per-bucket counts (last one is +Inf), then sum
+            state = _values.get(key)
+            if state is None:
+                state = _values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            state[bisect_left(self.buckets, value)] += 1
+            state[-1] += value
+        _maybe_flush()
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+# Everything the app records. Defined here so a process renders every metric,
+# including ones only other processes (e.g. the worker) update.
+
+LLM_REQUESTS = Counter(
+    'jobpilot_llm_requests_total', "AIService completions by operation, provider and outcome (ok, error, fallback)",
+    ['operation', 'provider', 'outcome']
+)
+LLM_LATENCY = Histogram(
+    'jobpilot_llm_request_seconds', "Time AIService spent waiting on the LLM provider per completion",
+    ['operation', 'provider']
+)
+LLM_CACHE_LOOKUPS = Counter(
+    'jobpilot_llm_cache_lookups_total', "LLM cache lookups by operation and result (hit, miss)",
+    ['operation', 'result']
+)
+LLM_TOKENS = Counter(
+    'jobpilot_llm_tokens_total', "Tokens sent (prompt) and generated (completion) by provider and model",
+    ['provider', 'model', 'kind']
+)
+HH_REQUESTS = Counter(
+    'jobpilot_hh_requests_total', "HH.ru API requests sent, by endpoint and HTTP status",
+    ['endpoint', 'status']
+)
+HH_LATENCY = Histogram(
+    'jobpilot_hh_request_seconds', "HH.ru API round-trip time by endpoint",
+    ['endpoint']
+)
+HH_CACHE_LOOKUPS = Counter(
+    'jobpilot_hh_cache_lookups_total', "HH.ru response cache lookups by endpoint and result (hit, miss, revalidated)",
+    ['endpoint', 'result']
+)
+SYNC_ROWS = Counter(
+    'jobpilot_sync_rows_total', "Synced jobs by source and result (inserted, updated, unchanged)",
+    ['source', 'result']
+)
+SYNC_FLUSH_LATENCY = Histogram(
+    'jobpilot_sync_flush_seconds', "Time to write one batch of synced jobs",
+    ['source']
+)
+RESUME_PARSES = Counter(
+    'jobpilot_resume_parses_total', "Resume text extractions by file type and outcome (ok, error)",
+    ['file_type', 'outcome']
+)
+RESUME_PARSE_LATENCY = Histogram(
+    'jobpilot_resume_parse_seconds', "Time to extract text from a resume file, by file type",
+    ['file_type']
+)
+HTTP_REQUESTS = Counter(
+    'jobpilot_http_requests_total', "API requests by view, method and status",
+    ['view', 'method', 'status']
+)
+HTTP_LATENCY = Histogram(
+    'jobpilot_http_request_seconds', "API response time by view",
+    ['view']
+)
+
+# Per-process snapshot files, merged by render()
+
+def _process_id() -> str:
+    # Containers sharing the metrics directory can reuse pids
+    return f"{socket.gethostname()}_{os.getpid()}"
+
+def _snapshot() -> List:
+    global _changed
+    with _lock:
+        _changed = False
+        return [[name, list(labels), value] for (name, labels), value in _values.items()]
+
+def flush():
+    """
+    Write this process's values to its snapshot file
+    """
+    global _last_flush
+    _last_flush = time.monotonic()
+    if not settings.METRICS_DIR:
+        return
+    directory = Path(settings.METRICS_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{_process_id()}.json"
+    tmp = path.with_suffix('.tmp')
+    tmp.write_text(json.dumps(_snapshot()))
+    os.replace(tmp, path)
+
+def _maybe_flush(force: bool = False):
+    _start_flusher()
+    if force or time.monotonic() - _last_flush >= settings.METRICS_FLUSH_INTERVAL:
+        try:
+            flush()
+        except OSError as e:
+            logger.error(f"Error writing metrics snapshot: {str(e)}")
+
+def _flush_periodically():
+    # Writes what changed since the last flush even when no further value is
+    # recorded, so an idle process's last updates still reach the scrape
+    while True:
+        time.sleep(settings.METRICS_FLUSH_INTERVAL)
+        if _changed:
+            _maybe_flush(force=True)
+
+def _start_flusher():
+    """
+    Start the background flush thread of this process on its first recorded value
+    """
+    global _flusher_pid
+    if _flusher_pid == os.getpid():
+        return
+    with _flusher_lock:
+        if _flusher_pid != os.getpid():
+            _flusher_pid = os.getpid()
+            threading.Thread(target=_flush_periodically, name='metrics-flush', daemon=True).start()
+
+atexit.register(_maybe_flush, force=True)
+
+def _merge(into: Dict, series: List):
+    for name, labels, value in series:
+        key = (name, tuple(labels))
+        if isinstance(value, list):
+            current = into.get(key)
+            into[key] = [a + b for a, b in zip(current, value)] if current else list(value)
+        else:
+            into[key] = into.get(key, 0) + value
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+def _collect() -> Dict:
+    """
+    Sum the snapshots of every process. Snapshots of this host's exited
+    processes are folded into the archive file, so counters keep their
+    totals across worker restarts without the directory growing.
+    """
+    flush()
+    merged: Dict = {}
+    if not settings.METRICS_DIR:
+        _merge(merged, _snapshot())
+        return merged
+
+    directory = Path(settings.METRICS_DIR)
+    archive = directory / 'archive.json'
+    host = socket.gethostname()
+    with open(directory / 'lock', 'w') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        archived: Dict = {}
+        if archive.exists():
+            _merge(archived, json.loads(archive.read_text()))
+        dead = []
+        for path in directory.glob('*.json'):
+            if path == archive:
+                continue
+            name_host, _, pid = path.stem.rpartition('_')
+            try:
+                series = json.loads(path.read_text())
+            except (OSError, ValueError):
+                continue
+            if name_host == host and pid.isdigit() and not _alive(int(pid)):
+                _merge(archived, series)
+                dead.append(path)
+            else:
+                _merge(merged, series)
+        if dead:
+            tmp = archive.with_suffix('.tmp')
+            tmp.write_text(json.dumps([[name, list(labels), value] for (name, labels), value in archived.items()]))
+            os.replace(tmp, archive)
+            for path in dead:
+                path.unlink(missing_ok=True)
+        fcntl.flock(lock_file, fcntl.LOCK_UN)
+    _merge(merged, [[name, list(labels), value] for (name, labels), value in archived.items()])
+    return merged
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def _labels(names: Iterable[str], values: Iterable[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+def render() -> str:
+    """
+    All metrics of all processes in the Prometheus text exposition format
+    """
+    values = _collect()
+    lines = []
+    for name, metric in sorted(REGISTRY.items()):
+        lines.append(f"# HELP {name} {metric.help}")
+        lines.append(f"# TYPE {name} {metric.type}")
+        for (series, labels), value in sorted(values.items()):
+            if series != name:
+                continue
+            if isinstance(metric, Histogram):
+                cumulative = 0
+                for bound, count in zip(list(metric.buckets) + ['+Inf'], value[:-1]):
+                    cumulative += count
+                    le = bound if bound == '+Inf' else _number(bound)
+                    lines.append(f"{name}_bucket{_labels(metric.labelnames, labels, ('le', le))} {cumulative}")
+                lines.append(f"{name}_sum{_labels(metric.labelnames, labels)} {value[-1]}")
+                lines.append(f"{name}_count{_labels(metric.labelnames, labels)} {cumulative}")
+            else:
+                lines.append(f"{name}{_labels(metric.labelnames, labels)} {_number(value)}")
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,198 @@
+from typing import Dict, List, Optional, Tuple
+from django.conf import settings
+import html
+import json
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+try:
+    import tiktoken
+except ImportError:  # Optional: fall back to a character-based estimate
+    tiktoken = None
+
+# Without tiktoken, assume this many characters per token; GPT tokenizers
+# average about 4 for English and fewer for Cyrillic, so err low
+CHARS_PER_TOKEN = 3
+# A section cut shorter than this is dropped instead
+MIN_SECTION_TOKENS = 50
+
+BLOCK_TAGS_RE = re.compile(r"<\s*(?:br|/p|/div|/li|/h\d|/tr)\s*/?>", re.IGNORECASE)
+LIST_ITEM_RE = re.compile(r"<\s*li[^>]*>", re.IGNORECASE)
+TAG_RE = re.compile(r"<[^>]+>")
+SPACES_RE = re.compile(r"[ \t ]+")
+
+# Resume headings, in order of how much they matter to the model when the budget is tight
+RESUME_SECTIONS = [
+    ('skills', re.compile(r"^(?:key\s+|technical\s+|core\s+)?(?:skills|competencies|technologies|навыки|ключевые навыки)\b", re.IGNORECASE)),
+    ('experience', re.compile(r"^(?:work\s+|professional\s+)?(?:experience|employment|work history|опыт работы|опыт)\b", re.IGNORECASE)),
+    ('summary', re.compile(r"^(?:summary|profile|about(?: me)?|objective|о себе|цель)\b", re.IGNORECASE)),
+    ('achievements', re.compile(r"^(?:achievements|accomplishments|projects|достижения|проекты)\b", re.IGNORECASE)),
+    ('education', re.compile(r"^(?:education|courses|certifications?|образование|курсы)\b", re.IGNORECASE)),
+]
+SECTION_PRIORITY = {name: rank for rank, (name, _) in enumerate(RESUME_SECTIONS)}
+
+_encoding = None
+
+def count_tokens(text: str) -> int:
+    global _encoding
+    if not text:
+        return 0
+    if tiktoken is None:
+        return -(-len(text) // CHARS_PER_TOKEN)
+    if _encoding is None:
+        _encoding = tiktoken.get_encoding('cl100k_base')
+    return len(_encoding.encode(text, disallowed_special=()))
+
+def truncate_tokens(text: str, budget: int) -> str:
+    """
+    Cut ``text`` to at most ``budget`` tokens, at a line or word boundary when possible
+    """
+    if budget <= 0:
+        return ''
+    if count_tokens(text) <= budget:
+        return text
+    # One token is left for the ellipsis
+    if tiktoken is not None:
+        cut = _encoding.decode(_encoding.encode(text, disallowed_special=())[:budget - 1])
+    else:
+        cut = text[:(budget - 1) * CHARS_PER_TOKEN]
+    boundary = max(cut.rfind('\n'), cut.rfind(' '))
+    if boundary > len(cut) // 2:
+        cut = cut[:boundary]
+    return cut.rstrip() + ' …'
+
+def strip_html(text: str) -> str:
+    """
+    Plain text of an HTML fragment such as an HH.ru description, keeping line and list structure
+    """
+    if not text or '<' not in text:
+        return html.unescape(text or '')
+    text = LIST_ITEM_RE.sub('\n- ', text)
+    text = BLOCK_TAGS_RE.sub('\n', text)
+    return html.unescape(TAG_RE.sub('', text))
+
+def clean_text(text: str) -> str:
+    """
+    Collapse whitespace and drop blank and repeated lines, such as page
+    headers and footers that PDF extraction repeats on every page
+    """
+    seen, lines = set(), []
+    for line in (text or '').splitlines():
+        line = SPACES_RE.sub(' ', line).strip()
+        key = line.lower()
+        if not line or key in seen:
+            continue
+        seen.add(key)
+        lines.append(line)
+    return '\n'.join(lines)
+
+def split_resume_sections(text: str) -> List[Tuple[str, str]]:
+    """
+    Split resume text at recognised headings into [(section, text)];
+    text before the first heading is the 'header' section
+    """
+    sections, name, lines = [], 'header', []
+    for line in text.splitlines():
+        heading = next(
+            (section for section, pattern in RESUME_SECTIONS if len(line) < 40 and pattern.match(line)),
+            None
+        )
+        if heading:
+            if lines:
+                sections.append((name, '\n'.join(lines)))
+            name, lines = heading, []
+        lines.append(line)
+    if lines:
+        sections.append((name, '\n'.join(lines)))
+    return sections
+
+def fit_sections(sections: List[Tuple[str, str]], priority: Dict[str, int], budget: int) -> str:
+    """
+    Keep sections whole in priority order while they fit, cut the first one
+    that does not to the remaining budget and drop the rest, then put the
+    survivors back in their original order
+    """
+    order = sorted(range(len(sections)), key=lambda i: priority.get(sections[i][0], len(priority)))
+    kept, remaining = {}, budget
+    for i in order:
+        text = sections[i][1]
+        # Each kept section costs a joining newline too
+        tokens = count_tokens(text) + 1
+        if tokens > remaining:
+            if remaining < MIN_SECTION_TOKENS:
+                break
+            text = truncate_tokens(text, remaining - 1)
+            tokens = count_tokens(text) + 1
+        kept[i] = text
+        remaining -= tokens
+    return '\n'.join(kept[i] for i in sorted(kept))
+
+def _log(operation: str, before: int, after: int):
+    logger.info(f"Compacted {operation} input from {before} to {after} tokens")
+
+def compact_resume_text(text: str, budget: Optional[int] = None) -> str:
+    """
+    Resume text for parse_resume: deduplicated and cut to the token budget
+    by section priority (skills first, education last)
+    """
+    budget = budget or settings.LLM_PROMPT_BUDGETS['parse_resume']
+    before = count_tokens(text)
+    cleaned = clean_text(text)
+    if count_tokens(cleaned) > budget:
+        # The header (name, contacts, title) ranks just below skills
+        cleaned = fit_sections(split_resume_sections(cleaned), {'skills': 0, 'header': 1, **{
+            name: rank + 2 for name, rank in SECTION_PRIORITY.items() if name != 'skills'
+        }}, budget)
+    _log('parse_resume', before, count_tokens(cleaned))
+    return cleaned
+
+def compact_json(value) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+
+def compact_experience(experience: List, budget: int) -> List:
+    """
+    A parsed resume's experience entries with empty fields dropped, long
+    strings cut and, once the budget runs out, the remaining entries dropped
+    """
+    entries, remaining = [], budget
+    for entry in experience or []:
+        if isinstance(entry, dict):
+            entry = {
+                key: truncate_tokens(clean_text(value), 150) if isinstance(value, str) else value
+                for key, value in entry.items() if value not in (None, '', [], {})
+            }
+        elif isinstance(entry, str):
+            entry = truncate_tokens(clean_text(entry), 150)
+        tokens = count_tokens(compact_json(entry))
+        if tokens > remaining:
+            break
+        entries.append(entry)
+        remaining -= tokens
+    return entries
+
+def compact_match_inputs(operation: str, resume_data: Dict, job_data: Dict, budget: Optional[int] = None) -> Tuple[Dict, Dict]:
+    """
+    Copies of the resume and job inputs of a match or cover-letter prompt
+    with HTML stripped and experience and requirements cut to share the
+    operation's token budget
+    """
+    budget = budget or settings.LLM_PROMPT_BUDGETS[operation]
+    experience = resume_data.get('experience') or []
+    requirements = job_data.get('requirements') or ''
+    before = count_tokens(json.dumps(experience)) + count_tokens(requirements)
+
+    requirements = truncate_tokens(clean_text(strip_html(requirements)), budget // 2)
+    experience = compact_experience(experience, budget - count_tokens(requirements))
+    _log(operation, before, count_tokens(compact_json(experience)) + count_tokens(requirements))
+
+    # AI-parsed skills are not always strings
+    skills = [skill.strip() for skill in resume_data.get('skills') or [] if isinstance(skill, str) and skill.strip()]
+    resume_data = {
+        **resume_data,
+        'skills': list(dict.fromkeys(skills)),
+        'experience': experience
+    }
+    job_data = {**job_data, 'requirements': requirements}
+    return resume_data, job_data
@@ -0,0 +1,295 @@
+from collections import Counter, deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from .background import enqueue
+from .resume_parser import _discard_pool, _limit_memory, extract_file_text, ExtractionTimeout
+from .resume_store import store_resume_file
+from .skill_extractor import SkillExtractor
+import multiprocessing
+import mimetypes
+import tempfile
+import zipfile
+import tarfile
+import hashlib
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# python-docx cannot read legacy .doc files
+RESUME_EXTENSIONS = {'.pdf', '.docx', '.txt'}
+
+# State of an import worker process, set by _init_worker
+_extractor: Optional[SkillExtractor] = None
+
+def _init_worker(memory_limit: int, dictionary_path: str):
+    global _extractor
+    _limit_memory(memory_limit)
+    _extractor = SkillExtractor.from_file(dictionary_path)
+
+def _import_key(user_id: int, sha256: str) -> str:
+    return f"{user_id}:{sha256}"
+
+def _hash_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _extract_file(path: str, user_id: int, sha256: str, timeout: float) -> Dict:
+    """
+    Extract and find the skills of one file; runs in a worker process
+    """
+    result = {'path': path, 'user_id': user_id, 'sha256': sha256}
+    started = time.perf_counter()
+    try:
+        data = Path(path).read_bytes()
+        text = extract_file_text(data, mimetypes.guess_type(path)[0] or '', timeout)
+        if not text or not text.strip():
+            raise ValueError("No text could be extracted")
+        result['text'] = text
+        result['skills'] = _extractor.extract(text)
+    except (Exception, ExtractionTimeout) as e:
+        result['error'] = f"{e.__class__.__name__}: {e}"
+    result['seconds'] = time.perf_counter() - started
+    return result
+
+def find_resume_files(root: Path) -> Iterator[Path]:
+    for path in sorted(root.rglob('*')):
+        if path.is_file() and path.suffix.lower() in RESUME_EXTENSIONS and not path.name.startswith('.'):
+            yield path
+
+def unpack_archive(archive: Path, into: str) -> Path:
+    """
+    Extract a zip or tar archive into a directory, refusing paths that leave it
+    """
+    target = Path(into)
+    if zipfile.is_zipfile(archive):
+        with zipfile.ZipFile(archive) as zf:
+            # ZipFile.extract() drops absolute and parent components from member names
+            for member in zf.infolist():
+                zf.extract(member, target)
+    elif tarfile.is_tarfile(archive):
+        with tarfile.open(archive) as tf:
+            tf.extractall(target, filter='data')
+    else:
+        raise ValueError(f"{archive} is not a zip or tar archive")
+    return target
+
+class ResumeImporter:
+    """
+    Loads a directory of resume files for their users: worker processes
+    extract each file and find its skills, and the results are written as
+    Resume rows in batches, one transaction each. Files are matched to
+    users by relative path. Files are hashed before they are handed out,
+    and a (user, file hash) pair already imported is skipped, so a crashed
+    import continues where it stopped when run again. A worker that crashes or hangs is replaced; the files
+    it may have been working on are retried one at a time, so only the
+    file at fault is failed. With ``analyze``, each new resume also gets a
+    resume_process task for its AI parse.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        users: Callable[[str], Optional[object]],
+        workers: int = 1,
+        batch_size: int = 200,
+        analyze: bool = True,
+        on_progress: Optional[Callable[[Dict], None]] = None
+    ):
+        self.root = root
+        self.users = users
+        self.workers = workers
+        self.batch_size = batch_size
+        self.analyze = analyze
+        self.on_progress = on_progress
+        self.stats = {'files': 0, 'imported': 0, 'skipped': 0, 'failed': 0, 'unmapped': 0}
+        self.failures: List[Tuple[str, str]] = []
+        self._batch: List[Tuple[object, Dict]] = []
+        self._users: Dict[int, object] = {}
+
+    def _done_keys(self, user_ids: Set[int]) -> Set[str]:
+        from ..models import Resume
+
+        return {
+            _import_key(user_id, sha256)
+            for user_id, sha256 in Resume.objects.filter(user_id__in=user_ids).exclude(file_sha256='')
+            .values_list('user_id', 'file_sha256').iterator()
+        }
+
+    def run(self) -> Dict:
+        started = time.perf_counter()
+        jobs = []
+        for path in find_resume_files(self.root):
+            relative = path.relative_to(self.root).as_posix()
+            user = self.users(relative)
+            self.stats['files'] += 1
+            if user is None:
+                self.stats['unmapped'] += 1
+                self.failures.append((relative, "No user mapped to this file"))
+                continue
+            self._users[user.id] = user
+            jobs.append((str(path), user.id, None))
+
+        done = self._done_keys(set(self._users))
+        timeout = settings.RESUME_PARSER_TIMEOUT
+        queue = deque(jobs)
+        # Files in flight when a worker died or hung; one of them may be the
+        # cause, so they run alone, and a file that fails alone is failed
+        suspects = deque()
+        pending: Dict[Future, Tuple[str, int, str, bool]] = {}
+        pool = self._pool()
+        try:
+            while True:
+                if suspects:
+                    if not pending:
+                        path, user_id, sha256 = suspects.popleft()
+                        pending[pool.submit(_extract_file, path, user_id, sha256, timeout)] = (path, user_id, sha256, True)
+                else:
+                    # A bounded window of files in flight keeps memory flat for any number of files
+                    while queue and len(pending) < self.workers * 4:
+                        path, user_id, sha256 = queue.popleft()
+                        sha256 = sha256 or self._hash(path, done, user_id)
+                        if sha256:
+                            pending[pool.submit(_extract_file, path, user_id, sha256, timeout)] = (path, user_id, sha256, False)
+                if not pending:
+                    break
+                # The alarm in a worker cannot interrupt a parser stuck in C code
+                finished, _ = wait(pending, timeout=timeout + 5, return_when=FIRST_COMPLETED)
+                broken = False
+                for future in finished:
+                    job = pending.pop(future)
+                    try:
+                        result = future.result()
+                    except BrokenProcessPool:
+                        broken = True
+                        self._suspect(suspects, job, "Worker process died")
+                        continue
+                    self._collect(result, done)
+                if finished and not broken:
+                    continue
+
+                # A worker crashed (e.g. killed for its memory) or hung: replace the pool
+                reason = "Worker process died" if broken else f"Extraction did not finish in {timeout:g}s"
+                logger.warning(f"{reason}; restarting the import pool")
+                for future, job in pending.items():
+                    if broken or future.running():
+                        self._suspect(suspects, job, reason)
+                    else:
+                        queue.appendleft(job[:3])
+                pending.clear()
+                _discard_pool(pool)
+                pool = self._pool()
+            self._flush()
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+        self.stats['seconds'] = round(time.perf_counter() - started, 1)
+        self.stats['failure_reasons'] = dict(Counter(reason for _, reason in self.failures).most_common(10))
+        return self.stats
+
+    def _pool(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context('forkserver'),
+            initializer=_init_worker,
+            initargs=(settings.RESUME_PARSER_MEMORY_LIMIT, settings.SKILL_DICTIONARY_PATH),
+            max_tasks_per_child=settings.RESUME_PARSER_TASKS_PER_CHILD
+        )
+
+    def _hash(self, path: str, done: Set[str], user_id: int) -> Optional[str]:
+        """
+        The file's hash, or None when it was imported already or cannot be read
+        """
+        try:
+            sha256 = _hash_file(path)
+        except OSError as e:
+            self._fail(path, f"{e.__class__.__name__}: {e}")
+            return None
+        if _import_key(user_id, sha256) not in done:
+            return sha256
+        self.stats['skipped'] += 1
+        if self.on_progress:
+            self.on_progress(self.stats)
+        return None
+
+    def _fail(self, path: str, reason: str):
+        self.stats['failed'] += 1
+        self.failures.append((Path(path).relative_to(self.root).as_posix(), reason))
+        if self.on_progress:
+            self.on_progress(self.stats)
+
+    def _suspect(self, suspects: deque, job: Tuple[str, int, str, bool], reason: str):
+        path, user_id, sha256, alone = job
+        if not alone:
+            suspects.append((path, user_id, sha256))
+            return
+        self._fail(path, reason)
+
+    def _collect(self, result: Dict, done: Set[str]):
+        relative = Path(result['path']).relative_to(self.root).as_posix()
+        if 'error' in result:
+            self.stats['failed'] += 1
+            self.failures.append((relative, result['error']))
+        elif _import_key(result['user_id'], result['sha256']) in done:
+            self.stats['skipped'] += 1
+        else:
+            # The same file twice for one user within this run is imported once
+            done.add(_import_key(result['user_id'], result['sha256']))
+            self._batch.append((self._users[result['user_id']], result))
+            if len(self._batch) >= self.batch_size:
+                self._flush()
+        if self.on_progress:
+            self.on_progress(self.stats)
+
+    def _flush(self):
+        from ..models import Resume, ResumeContent
+
+        if not self._batch:
+            return
+        resumes, contents = [], {}
+        for user, result in self._batch:
+            with open(result['path'], 'rb') as f:
+                file = File(f, name=Path(result['path']).name)
+                file.sha256 = result['sha256']
+                name, sha256 = store_resume_file(file)
+            resumes.append(Resume(
+                user=user,
+                title=Path(result['path']).stem[:200],
+                file=name,
+                file_sha256=sha256,
+                parsed_content=result['text'],
+                skills=result['skills'],
+                processing_status='queued' if self.analyze else 'done'
+            ))
+            contents[sha256] = ResumeContent(sha256=sha256, text=result['text'])
+
+        with transaction.atomic():
+            Resume.objects.bulk_create(resumes)
+            ResumeContent.objects.bulk_create(contents.values(), ignore_conflicts=True)
+            if self.analyze:
+                for resume in resumes:
+                    enqueue(
+                        'resume_process', {'resume_id': resume.id}, user=resume.user,
+                        max_attempts=settings.RESUME_PROCESS_MAX_ATTEMPTS
+                    )
+        self.stats['imported'] += len(resumes)
+        self._batch = []
+
+def import_source(source: Path, **options) -> Tuple['ResumeImporter', Dict]:
+    """
+    Import a directory, or a zip or tar archive unpacked to a temporary one
+    """
+    if source.is_dir():
+        importer = ResumeImporter(source, **options)
+        return importer, importer.run()
+    with tempfile.TemporaryDirectory(prefix='resume-import-') as tmp:
+        importer = ResumeImporter(unpack_archive(source, tmp), **options)
+        return importer, importer.run()
@@ -1,56 +1,198 @@
 import PyPDF2
 import docx
 import io
-from typing import Optional
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Iterable, Iterator, Optional
+from django.conf import settings
+from . import metrics
+import multiprocessing
+import threading
 import logging
+import signal
+import math
+import time
+import os
 
 logger = logging.getLogger(__name__)
 
+DOCX_TYPES = ['application/msword', 'application/vnd.openxmlformats-officedocument.wordprocessingml.document']
+
 class ResumeParser:
     @staticmethod
     def extract_text(file_obj: io.BytesIO, file_type: str) -> Optional[str]:
         """
-        Extract text content from various file types
+        Extract text content from various file types. PDF and DOCX files are
+        parsed in the extraction process pool, so a hostile file can only
+        exhaust its own time and memory caps.
+
+        Returns None for a file that cannot be read; a timeout or a crashed
+        pool is raised, for the caller to try again.
         """
+        started = time.perf_counter()
         try:
-            if file_type == 'application/pdf':
-                return ResumeParser._parse_pdf(file_obj)
-            elif file_type in ['application/msword', 'application/vnd.openxmlformats-officedocument.wordprocessingml.document']:
-                return ResumeParser._parse_docx(file_obj)
+            if file_type == 'application/pdf' or file_type in DOCX_TYPES:
+                text = _extract_in_pool(file_obj.read(), file_type)
             elif file_type == 'text/plain':
-                return file_obj.read().decode('utf-8')
+                text = file_obj.read().decode('utf-8')[:settings.RESUME_PARSER_MAX_CHARS]
             else:
                 raise ValueError(f"Unsupported file type: {file_type}")
+            metrics.RESUME_PARSES.inc(file_type=file_type, outcome='ok')
+            return text
+        except (TimeoutError, BrokenProcessPool) as e:
+            metrics.RESUME_PARSES.inc(file_type=file_type, outcome='error')
+            logger.warning(f"Resume extraction failed, to be retried: {str(e)}")
+            raise
         except Exception as e:
+            metrics.RESUME_PARSES.inc(file_type=file_type, outcome='error')
             logger.error(f"Error parsing resume file: {str(e)}")
             return None
+        finally:
+            metrics.RESUME_PARSE_LATENCY.observe(time.perf_counter() - started, file_type=file_type)
 
     @staticmethod
-    def _parse_pdf(file_obj: io.BytesIO) -> str:
+    def _pdf_pages(file_obj: io.BytesIO, max_pages: int) -> Iterator[str]:
         """
-        Extract text from PDF files
+        Yield the text of PDF pages one at a time, up to ``max_pages``
         """
         try:
             pdf_reader = PyPDF2.PdfReader(file_obj)
-            text = ""
-            for page in pdf_reader.pages:
-                text += page.extract_text() + "\n"
-            return text
+            for page in pdf_reader.pages[:max_pages]:
+                yield page.extract_text() + "\n"
         except Exception as e:
             logger.error(f"Error parsing PDF: {str(e)}")
             raise
 
     @staticmethod
-    def _parse_docx(file_obj: io.BytesIO) -> str:
+    def _docx_paragraphs(file_obj: io.BytesIO) -> Iterator[str]:
         """
-        Extract text from DOCX files
+        Yield the text of DOCX paragraphs one at a time
         """
         try:
-            doc = docx.Document(file_obj)
-            text = ""
-            for paragraph in doc.paragraphs:
-                text += paragraph.text + "\n"
-            return text
+            for paragraph in docx.Document(file_obj).paragraphs:
+                yield paragraph.text + "\n"
         except Exception as e:
             logger.error(f"Error parsing DOCX: {str(e)}")
             raise
+
+def _join_limited(pieces: Iterable[str], max_chars: int) -> str:
+    """
+    Join pieces of text, stopping (and closing the generator) at ``max_chars``
+    """
+    parts, size = [], 0
+    for piece in pieces:
+        parts.append(piece[:max_chars - size])
+        size += len(parts[-1])
+        if size >= max_chars:
+            break
+    return ''.join(parts)
+
+class ExtractionTimeout(BaseException):
+    """
+    Raised by the alarm in a pool process; a BaseException so the parsers'
+    own ``except Exception`` handlers cannot swallow it
+    """
+
+def _timed_out(signum, frame):
+    raise ExtractionTimeout("Resume extraction took too long")
+
+def _extract(data: bytes, file_type: str, max_pages: int, max_chars: int, timeout: Optional[float] = None) -> str:
+    """
+    Extract the text of a PDF or DOCX file; runs in a pool process
+    """
+    # An alarm interrupts the parser between bytecodes; the caller's own
+    # timeout covers extension code that never returns to Python
+    if timeout:
+        signal.signal(signal.SIGALRM, _timed_out)
+        signal.alarm(math.ceil(timeout))
+    try:
+        if file_type == 'application/pdf':
+            pieces = ResumeParser._pdf_pages(io.BytesIO(data), max_pages)
+        else:
+            pieces = ResumeParser._docx_paragraphs(io.BytesIO(data))
+        return _join_limited(pieces, max_chars)
+    finally:
+        if timeout:
+            signal.alarm(0)
+
+def extract_file_text(data: bytes, file_type: str, timeout: Optional[float] = None) -> str:
+    """
+    Extract a file's text in the calling process, within the page and
+    character limits; for processes that are themselves pool workers
+    """
+    if file_type == 'application/pdf' or file_type in DOCX_TYPES:
+        return _extract(data, file_type, settings.RESUME_PARSER_MAX_PAGES, settings.RESUME_PARSER_MAX_CHARS, timeout)
+    if file_type == 'text/plain':
+        return data.decode('utf-8')[:settings.RESUME_PARSER_MAX_CHARS]
+    raise ValueError(f"Unsupported file type: {file_type}")
+
+def _limit_memory(limit: int):
+    """
+    Pool initializer: cap the address space the process may grow by ``limit`` bytes
+    """
+    import resource
+
+    try:
+        with open('/proc/self/statm') as statm:
+            current = int(statm.read().split()[0]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        current = 0
+    _, hard = resource.getrlimit(resource.RLIMIT_AS)
+    soft = current + limit
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (soft, hard))
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+def get_extraction_pool() -> ProcessPoolExecutor:
+    """
+    The process-wide pool that parses PDF and DOCX files
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # forkserver: children start clean rather than forking a threaded web worker
+            _pool = ProcessPoolExecutor(
+                max_workers=settings.RESUME_PARSER_WORKERS,
+                mp_context=multiprocessing.get_context('forkserver'),
+                initializer=_limit_memory,
+                initargs=(settings.RESUME_PARSER_MEMORY_LIMIT,),
+                max_tasks_per_child=settings.RESUME_PARSER_TASKS_PER_CHILD
+            )
+        return _pool
+
+def _discard_pool(pool: ProcessPoolExecutor):
+    """
+    Kill a pool's processes, e.g. one stuck past its timeout, so the next call starts a new pool
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    for process in list((pool._processes or {}).values()):
+        process.kill()
+    pool.shutdown(wait=False, cancel_futures=True)
+
+def _extract_in_pool(data: bytes, file_type: str) -> str:
+    max_pages, max_chars = settings.RESUME_PARSER_MAX_PAGES, settings.RESUME_PARSER_MAX_CHARS
+    timeout = settings.RESUME_PARSER_TIMEOUT
+    if settings.RESUME_PARSER_WORKERS == 0:
+        return _extract(data, file_type, max_pages, max_chars)
+
+    # A pool broken by another file's crash or timeout is replaced and tried once more
+    for attempt in range(2):
+        pool = get_extraction_pool()
+        try:
+            future = pool.submit(_extract, data, file_type, max_pages, max_chars, timeout)
+            return future.result(timeout=timeout + 5)
+        except FutureTimeoutError:
+            _discard_pool(pool)
+            raise TimeoutError(f"Resume extraction did not finish in {timeout:g}s")
+        except ExtractionTimeout as e:
+            raise TimeoutError(str(e))
+        except BrokenProcessPool:
+            _discard_pool(pool)
+            if attempt:
+                raise
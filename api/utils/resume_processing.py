@@ -0,0 +1,110 @@
+from typing import Callable, Dict, Optional
+from django.conf import settings
+from .ai_service import AIService
+from .background import PermanentError, enqueue
+from .resume_parser import ResumeParser
+from .resume_store import file_sha256, get_content, save_content
+from .skill_extractor import get_skill_extractor
+import mimetypes
+import logging
+import io
+
+logger = logging.getLogger(__name__)
+
+def _set_status(resume, processing_status: str, error: Optional[str] = None):
+    from ..models import Resume
+
+    resume.processing_status = processing_status
+    resume.processing_error = error
+    Resume.objects.filter(pk=resume.pk).update(processing_status=processing_status, processing_error=error)
+
+def queue_resume_processing(resume, user=None):
+    """
+    Reset a resume to queued and queue the task that processes it
+    """
+    # Text extraction and AI parsing take tens of seconds, so they run on the worker
+    resume.processing_status = 'queued'
+    resume.processing_error = None
+    resume.save(update_fields=['processing_status', 'processing_error', 'updated_at'])
+    return enqueue(
+        'resume_process', {'resume_id': resume.id}, user=user,
+        max_attempts=settings.RESUME_PROCESS_MAX_ATTEMPTS
+    )[0]
+
+def process_resume(resume_id: int, progress: Optional[Callable[[Dict], None]] = None) -> Dict:
+    """
+    Extract a resume's text, find its skills in the skill dictionary and
+    have the AI parse out experience, education and further skills, moving
+    it through parsing, analyzing and done. Results
+    are kept per file hash, so a file seen before skips whichever steps
+    already ran for it. On an error the resume goes back to queued with the
+    error shown, for the task to be retried; a file without text fails at once.
+    """
+    from ..models import Resume
+
+    resume = Resume.objects.get(id=resume_id)
+    parse_version = AIService.PROMPT_VERSIONS['parse_resume']
+    try:
+        if not resume.file_sha256:
+            # Uploaded before files were hashed
+            with resume.file.open('rb') as file_obj:
+                resume.file_sha256 = file_sha256(file_obj)
+            Resume.objects.filter(pk=resume.pk).update(file_sha256=resume.file_sha256)
+        stored = get_content(resume.file_sha256)
+        reused = []
+
+        _set_status(resume, 'parsing')
+        if progress:
+            progress({'stage': 'parsing'})
+        if stored and stored.text:
+            content = stored.text
+            reused.append('text')
+        else:
+            # The upload's content type is not stored, so go by the extension
+            file_type = mimetypes.guess_type(resume.file.name)[0] or ''
+            with resume.file.open('rb') as file_obj:
+                content = ResumeParser.extract_text(io.BytesIO(file_obj.read()), file_type)
+            if not content:
+                raise PermanentError(f"No text could be extracted from {file_type or 'this file'}")
+            save_content(resume.file_sha256, content)
+
+        # Dictionary skills are known in milliseconds; the AI parse only adds to them
+        local_skills = get_skill_extractor().extract(content)
+        resume.skills = local_skills
+        Resume.objects.filter(pk=resume.pk).update(skills=local_skills)
+
+        _set_status(resume, 'analyzing')
+        if progress:
+            progress({'stage': 'analyzing', 'skills': len(local_skills)})
+        if stored and stored.parsed and stored.parse_version == parse_version:
+            parsed_data = stored.parsed
+            reused.append('parsed')
+        else:
+            parsed_data = AIService().parse_resume(content)
+            # parse_resume() logs and returns nothing when the provider fails
+            if not parsed_data:
+                raise RuntimeError("The AI service could not parse the resume")
+            save_content(resume.file_sha256, content, parsed_data, parse_version)
+    except Exception as e:
+        logger.error(f"Error processing resume {resume.id}: {str(e)}")
+        _set_status(resume, 'failed' if isinstance(e, PermanentError) else 'queued', str(e))
+        raise
+
+    resume.parsed_content = content
+    resume.skills = get_skill_extractor().merge(local_skills, parsed_data.get('skills'))
+    resume.experience = parsed_data.get('experience', [])
+    resume.education = parsed_data.get('education', [])
+    resume.processing_status = 'done'
+    resume.processing_error = None
+    resume.save()
+    return {'resume_id': resume.id, 'skills': len(resume.skills), 'reused': reused}
+
+def resume_failed(resume_id: int, error: str):
+    """
+    Mark a resume failed once its processing task has run out of attempts
+    """
+    from ..models import Resume
+
+    # The last traceback line, without the exception class
+    message = error.strip().splitlines()[-1].split(': ', 1)[-1]
+    Resume.objects.filter(pk=resume_id).update(processing_status='failed', processing_error=message)
@@ -0,0 +1,93 @@
+from pathlib import PurePath
+from typing import Optional, Tuple
+from django.core.files.storage import default_storage
+from django.core.files.uploadhandler import MemoryFileUploadHandler, TemporaryFileUploadHandler
+import hashlib
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Resume files are stored once per distinct content, under their hash
+CONTENT_DIR = 'resumes/sha256'
+
+class HashingUploadMixin:
+    """
+    Hashes an uploaded file's bytes as they stream in and sets the hex
+    SHA-256 as ``sha256`` on the file the handler produces
+    """
+
+    def new_file(self, *args, **kwargs):
+        self._sha256 = hashlib.sha256()
+        return super().new_file(*args, **kwargs)
+
+    def receive_data_chunk(self, raw_data, start):
+        self._sha256.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        file = super().file_complete(file_size)
+        if file is not None:
+            file.sha256 = self._sha256.hexdigest()
+        return file
+
+class HashingMemoryFileUploadHandler(HashingUploadMixin, MemoryFileUploadHandler):
+    pass
+
+class HashingTemporaryFileUploadHandler(HashingUploadMixin, TemporaryFileUploadHandler):
+    pass
+
+def file_sha256(file) -> str:
+    """
+    The hash set by the upload handlers, or one computed by reading the file
+    """
+    if getattr(file, 'sha256', None):
+        return file.sha256
+    digest = hashlib.sha256()
+    for chunk in file.chunks():
+        digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest()
+
+def content_name(sha256: str, filename: Optional[str]) -> str:
+    """
+    Storage name of a file with this hash, keeping the original extension
+    """
+    suffix = PurePath(filename or '').suffix.lower()
+    return f"{CONTENT_DIR}/{sha256[:2]}/{sha256}{suffix}"
+
+def store_resume_file(file) -> Tuple[str, str]:
+    """
+    Save an uploaded resume under its content hash and return (storage
+    name, sha256). A file already stored is not written again, so every
+    resume with the same bytes points at one copy.
+    """
+    sha256 = file_sha256(file)
+    name = content_name(sha256, file.name)
+    if not default_storage.exists(name):
+        # A concurrent upload of the same file may win the race; the copy
+        # saved here then gets a suffixed name, which is still correct
+        name = default_storage.save(name, file)
+    return name, sha256
+
+def get_content(sha256: str):
+    """
+    The stored extraction results for a file hash, if any
+    """
+    from ..models import ResumeContent
+
+    if not sha256:
+        return None
+    return ResumeContent.objects.filter(sha256=sha256).first()
+
+def save_content(sha256: str, text: Optional[str] = None, parsed: Optional[dict] = None, parse_version: int = 0):
+    """
+    Record the extracted text and, once known, the parsed AI result of a file hash
+    """
+    from ..models import ResumeContent
+
+    if not sha256:
+        return
+    defaults = {'text': text}
+    if parsed is not None:
+        defaults.update(parsed=parsed, parse_version=parse_version)
+    ResumeContent.objects.update_or_create(sha256=sha256, defaults=defaults)
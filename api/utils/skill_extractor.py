@@ -0,0 +1,160 @@
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple
+from django.conf import settings
+import threading
+import logging
+import json
+
+logger = logging.getLogger(__name__)
+
+# Besides letters and digits, characters that continue a word: "Go" must not match inside "Google" or "go_to"
+WORD_CHARS = frozenset('_')
+
+def _normalize(text: str) -> str:
+    # Lower-cased without changing the length, so match offsets index the original text
+    lowered = text.lower()
+    if len(lowered) != len(text):
+        lowered = ''.join(c.lower() if len(c.lower()) == 1 else c for c in text)
+    return lowered.replace('ё', 'е')
+
+def _is_word_char(c: str) -> bool:
+    return c.isalnum() or c in WORD_CHARS
+
+class SkillExtractor:
+    """
+    Finds the skills of a curated dictionary in free text in one pass, with
+    an Aho-Corasick automaton over every alias. Dictionary entries map a
+    canonical skill name to its aliases; aliases match case-insensitively
+    and on word boundaries, except ``=Alias`` entries, which must match
+    case too (for names that are also common words, like "Go" or "Spring").
+    Overlapping matches resolve to the leftmost, then longest.
+    """
+
+    def __init__(self, dictionary: Dict[str, List[str]]):
+        # Trie as parallel lists: transitions, failure links and (skill, length, exact alias) outputs
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[int, int, Optional[str]]]] = [[]]
+        self.skills: List[str] = []
+        self._canonical: Dict[str, str] = {}
+
+        for skill, aliases in dictionary.items():
+            index = len(self.skills)
+            self.skills.append(skill)
+            if f"={skill}" not in aliases:
+                aliases = [skill, *aliases]
+            for alias in aliases:
+                exact = alias[1:] if alias.startswith('=') else None
+                self._add(_normalize(exact or alias), index, exact)
+                self._canonical[_normalize(exact or alias)] = skill
+        self._link()
+
+    @classmethod
+    def from_file(cls, path: str) -> 'SkillExtractor':
+        with open(path, encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def _add(self, pattern: str, skill: int, exact: Optional[str]):
+        node = 0
+        for char in pattern:
+            node = self._goto[node].get(char) or self._new_node(node, char)
+        self._out[node].append((skill, len(pattern), exact))
+
+    def _new_node(self, parent: int, char: str) -> int:
+        self._goto.append({})
+        self._fail.append(0)
+        self._out.append([])
+        self._goto[parent][char] = len(self._goto) - 1
+        return len(self._goto) - 1
+
+    def _link(self):
+        # Breadth-first, so a node's failure target is linked before the node
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                # Patterns ending at the failure target end here too
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def _matches(self, text: str) -> List[Tuple[int, int, int]]:
+        """
+        Every (start, end, skill) alias occurrence on word boundaries
+        """
+        normalized = _normalize(text)
+        goto, fail, out = self._goto, self._fail, self._out
+        matches = []
+        node = 0
+        for end, char in enumerate(normalized, 1):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for skill, length, exact in out[node]:
+                start = end - length
+                if start > 0 and _is_word_char(text[start - 1]) and _is_word_char(text[start]):
+                    continue
+                if end < len(text) and _is_word_char(text[end]) and _is_word_char(text[end - 1]):
+                    continue
+                if exact is not None and text[start:end] != exact:
+                    continue
+                matches.append((start, end, skill))
+        return matches
+
+    def extract(self, *texts: Optional[str]) -> List[str]:
+        """
+        Canonical names of the skills mentioned in the texts, in order of first mention
+        """
+        found: Dict[str, None] = {}
+        for text in texts:
+            if not text:
+                continue
+            covered = 0
+            for start, end, skill in sorted(self._matches(text), key=lambda m: (m[0], m[0] - m[1])):
+                if start >= covered:
+                    found.setdefault(self.skills[skill])
+                    covered = end
+        return list(found)
+
+    def canonical(self, name: str) -> str:
+        """
+        The dictionary name of a skill given by any alias, or the name itself
+        """
+        return self._canonical.get(_normalize(name.strip()), name.strip())
+
+    def merge(self, *skill_lists: Optional[Iterable]) -> List[str]:
+        """
+        Concatenate skill lists, canonicalized and without case-insensitive duplicates
+        """
+        merged: Dict[str, str] = {}
+        for skills in skill_lists:
+            for skill in skills or []:
+                if isinstance(skill, str) and skill.strip():
+                    name = self.canonical(skill)
+                    merged.setdefault(name.lower(), name)
+        return list(merged.values())
+
+_extractor: Optional[SkillExtractor] = None
+_extractor_lock = threading.Lock()
+
+def get_skill_extractor() -> SkillExtractor:
+    """
+    The process-wide extractor over SKILL_DICTIONARY_PATH
+    """
+    global _extractor
+    with _extractor_lock:
+        if _extractor is None:
+            _extractor = SkillExtractor.from_file(settings.SKILL_DICTIONARY_PATH)
+            logger.info(f"Loaded {len(_extractor.skills)} skills into the skill extractor")
+        return _extractor
+
+def job_skills(title: str, description: str, requirements: str, suggested: Optional[List[str]] = None) -> List[str]:
+    """
+    Skills of a vacancy found in its text, followed by any suggested from elsewhere
+    """
+    extractor = get_skill_extractor()
+    return extractor.merge(extractor.extract(title, requirements, description), suggested)
@@ -0,0 +1,103 @@
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+from django.conf import settings
+from django.utils import timezone
+import threading
+import logging
+import time
+import re
+
+logger = logging.getLogger(__name__)
+
+SENIORITY_WORDS = {
+    'intern', 'trainee', 'junior', 'jr', 'middle', 'mid', 'senior', 'sr',
+    'lead', 'principal', 'chief', 'head', 'стажер', 'стажёр', 'младший',
+    'старший', 'ведущий', 'главный', 'руководитель',
+}
+
+def normalize_title(title: str) -> str:
+    """
+    Reduce a vacancy title to a memoization key: lower-cased, punctuation
+    and whitespace collapsed, seniority words stripped from both ends.
+    "Senior Python Developer (Middle+)" and "python  developer" share a key.
+    """
+    words = re.findall(r"[\w+#]+", title.lower())
+    while words and words[0] in SENIORITY_WORDS:
+        words.pop(0)
+    while words and words[-1] in SENIORITY_WORDS:
+        words.pop()
+    return ' '.join(words)
+
+class SkillSuggestionCache:
+    """
+    Memoizes HH.ru skill suggestions by normalized title: a process-wide
+    LRU in front of the SkillSuggestion table, in front of the remote call
+    """
+    _memory: 'OrderedDict[str, Tuple[List[str], float]]' = OrderedDict()
+    _lock = threading.Lock()
+
+    def __init__(self, api, executor: Optional[ThreadPoolExecutor] = None):
+        self.api = api
+        self.executor = executor
+        self.ttl = settings.HH_SKILLS_CACHE_TTL
+        self.stats = {'memory_hits': 0, 'db_hits': 0, 'remote_calls': 0}
+
+    def _remember(self, key: str, skills: List[str], fetched_at: float):
+        with self._lock:
+            self._memory[key] = (skills, fetched_at)
+            self._memory.move_to_end(key)
+            while len(self._memory) > settings.HH_SKILLS_LRU_SIZE:
+                self._memory.popitem(last=False)
+
+    def get_many(self, titles: Iterable[str]) -> Dict[str, List[str]]:
+        """
+        Map each title to its suggested skills, calling HH.ru at most once
+        per distinct normalized title that is not cached yet
+        """
+        from ..models import SkillSuggestion
+
+        keys = {title: normalize_title(title) for title in titles}
+        found: Dict[str, List[str]] = {}
+        now = time.time()
+
+        with self._lock:
+            for key in set(keys.values()):
+                cached = self._memory.get(key)
+                if cached and now - cached[1] < self.ttl:
+                    self._memory.move_to_end(key)
+                    found[key] = cached[0]
+        self.stats['memory_hits'] += len(found)
+
+        missing = set(keys.values()) - set(found)
+        if missing:
+            rows = SkillSuggestion.objects.filter(
+                normalized_title__in=missing,
+                fetched_at__gte=timezone.now() - timedelta(seconds=self.ttl)
+            )
+            for row in rows:
+                found[row.normalized_title] = row.skills
+                self._remember(row.normalized_title, row.skills, row.fetched_at.timestamp())
+                self.stats['db_hits'] += 1
+            missing -= set(found)
+
+        if missing:
+            missing = sorted(missing)
+            mapper = self.executor.map if self.executor else map
+            fetched = dict(zip(missing, mapper(self.api.get_suggested_skills, missing)))
+            self.stats['remote_calls'] += len(missing)
+
+            # Empty lists are indistinguishable from failed calls, so they are not stored
+            fetched = {key: skills for key, skills in fetched.items() if skills}
+            SkillSuggestion.objects.bulk_create(
+                [SkillSuggestion(normalized_title=key, skills=skills) for key, skills in fetched.items()],
+                update_conflicts=True,
+                unique_fields=['normalized_title'],
+                update_fields=['skills', 'fetched_at']
+            )
+            for key, skills in fetched.items():
+                self._remember(key, skills, now)
+            found.update(fetched)
+
+        return {title: found.get(key, []) for title, key in keys.items()}
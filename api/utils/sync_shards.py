@@ -0,0 +1,199 @@
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from .hh_api import VacancySync
+from .background import worker_name
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+class LeaseLost(Exception):
+    pass
+
+class SearchTruncated(Exception):
+    """
+    A shard's search had more results than HH.ru serves, even narrowed down;
+    trying it again would lose the same vacancies
+    """
+
+def plan_shards(
+    queries: List[str],
+    areas: List[str],
+    since: datetime,
+    until: datetime,
+    window: timedelta
+) -> int:
+    """
+    Create one pending shard per (query, area, date window); windows that
+    already have a shard are left alone. Returns the number created.
+    """
+    from ..models import SyncShard
+
+    shards = []
+    start = since
+    while start < until:
+        end = min(start + window, until)
+        shards.extend(
+            SyncShard(query=query, area=area, date_from=start, date_to=end)
+            for query in queries for area in areas
+        )
+        start = end
+    before = SyncShard.objects.count()
+    SyncShard.objects.bulk_create(shards, ignore_conflicts=True, batch_size=1000)
+    return SyncShard.objects.count() - before
+
+def claim_shard(owner: str):
+    """
+    Lease the next pending shard, or one whose lease expired because its
+    worker died. Rows locked by other workers are skipped, not waited on.
+    A shard whose lease expired on its last allowed attempt is failed.
+    """
+    from ..models import SyncShard
+
+    expired = SyncShard.objects.filter(
+        status='leased', lease_expires_at__lt=timezone.now(), attempts__gte=settings.HH_SHARD_MAX_ATTEMPTS
+    ).update(
+        status='failed',
+        lease_owner='',
+        lease_expires_at=None,
+        error="Lease expired on the last attempt"
+    )
+    if expired:
+        logger.warning(f"Failed {expired} shards whose lease expired on their last attempt")
+
+    while True:
+        now = timezone.now()
+        with transaction.atomic():
+            shard = (
+                SyncShard.objects.select_for_update(skip_locked=True)
+                .filter(Q(status='pending') | Q(status='leased', lease_expires_at__lt=now))
+                .filter(attempts__lt=settings.HH_SHARD_MAX_ATTEMPTS)
+                .order_by('date_from', 'id')
+                .first()
+            )
+            if shard is None:
+                return None
+            # Compare-and-set on top of the row lock, for backends without
+            # SELECT ... FOR UPDATE where two workers can pick the same row
+            claimed = SyncShard.objects.filter(
+                pk=shard.pk, status=shard.status, lease_owner=shard.lease_owner, attempts=shard.attempts
+            ).update(
+                status='leased',
+                lease_owner=owner,
+                lease_expires_at=now + timedelta(seconds=settings.HH_SHARD_LEASE_SECONDS),
+                attempts=F('attempts') + 1
+            )
+        if claimed:
+            break
+
+    if shard.status == 'leased':
+        logger.warning(f"Reclaimed {shard} from {shard.lease_owner}, its lease expired")
+    shard.refresh_from_db()
+    return shard
+
+class LeaseKeeper(threading.Thread):
+    """
+    Renews a shard lease in the background while the shard is processed
+    """
+    def __init__(self, shard, owner: str):
+        super().__init__(daemon=True)
+        self.shard = shard
+        self.owner = owner
+        self.lost = False
+        self._stop_event = threading.Event()
+
+    def run(self):
+        from ..models import SyncShard
+
+        interval = settings.HH_SHARD_LEASE_SECONDS / 3
+        try:
+            while not self._stop_event.wait(interval):
+                renewed = SyncShard.objects.filter(
+                    pk=self.shard.pk, status='leased', lease_owner=self.owner
+                ).update(lease_expires_at=timezone.now() + timedelta(seconds=settings.HH_SHARD_LEASE_SECONDS))
+                if not renewed:
+                    self.lost = True
+                    return
+        finally:
+            connection.close()
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+def process_shard(shard, owner: str, run: VacancySync):
+    """
+    Sync one shard and release it as done, back to pending or failed
+    """
+    from ..models import SyncShard
+
+    keeper = LeaseKeeper(shard, owner)
+    keeper.start()
+    before = dict(run.stats)
+
+    def on_page(page: int, items: List[Dict], cursor):
+        if keeper.lost:
+            raise LeaseLost(f"Lease on {shard} was taken over")
+        if run.ingestor.is_full:
+            run.ingestor.flush()
+
+    mine = SyncShard.objects.filter(pk=shard.pk, status='leased', lease_owner=owner)
+    try:
+        completed = run.walk(
+            text=shard.query or None,
+            area=shard.area or None,
+            date_from=shard.date_from,
+            date_to=shard.date_to,
+            on_page=on_page
+        )
+        run.ingestor.flush()
+        if run.stats['truncated_searches'] > before['truncated_searches']:
+            raise SearchTruncated(
+                f"Search found more than {run.api.MAX_SEARCH_DEPTH} vacancies it could not narrow down; "
+                f"plan narrower shards"
+            )
+        if not completed:
+            raise RuntimeError("HH.ru search failed")
+    except LeaseLost as e:
+        logger.warning(str(e))
+        return
+    except Exception as e:
+        logger.error(f"Error syncing {shard}: {str(e)}")
+        retry = shard.attempts < settings.HH_SHARD_MAX_ATTEMPTS and not isinstance(e, SearchTruncated)
+        mine.update(
+            status='pending' if retry else 'failed',
+            lease_owner='',
+            lease_expires_at=None,
+            error=str(e)
+        )
+        return
+    finally:
+        keeper.stop()
+
+    mine.update(
+        status='done',
+        lease_expires_at=None,
+        finished_at=timezone.now(),
+        stats={key: run.stats[key] - before[key] for key in before}
+    )
+
+def run_shard_worker(workers: Optional[int] = None, requests_per_second: Optional[float] = None) -> Dict:
+    """
+    Claim and process shards until none are left; returns this worker's stats
+    """
+    owner = worker_name()
+    processed = 0
+    with VacancySync(workers, requests_per_second) as run:
+        while True:
+            shard = claim_shard(owner)
+            if shard is None:
+                break
+            process_shard(shard, owner, run)
+            processed += 1
+        result = run.result()
+    result['shards'] = processed
+    return result
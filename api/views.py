@@ -1,30 +1,42 @@
 from django.shortcuts import render, get_object_or_404
 from rest_framework import viewsets, status, generics
 from rest_framework.decorators import action, api_view, permission_classes
-from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.permissions import IsAuthenticated, IsAdminUser, AllowAny
 from rest_framework.response import Response
 from rest_framework import serializers
 from rest_framework.views import APIView
+from rest_framework.renderers import BaseRenderer, JSONRenderer
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth.models import User
-from .models import Resume, Job, Application, JobSkillMatch
+from .models import Resume, Job, JobPayload, Application, JobSkillMatch, BackgroundTask
 from .serializers import (
     UserSerializer, ResumeSerializer, JobSerializer,
-    ApplicationSerializer, JobSkillMatchSerializer
+    ApplicationSerializer, JobSkillMatchSerializer, BackgroundTaskSerializer,
+    RankedMatchSerializer, LimitSerializer, ResumeIdSerializer, CoverLetterRequestSerializer
 )
-from .utils.resume_parser import ResumeParser
+from .utils.resume_processing import queue_resume_processing
+from .utils.resume_store import store_resume_file
+from .utils.skill_extractor import job_skills
+from .utils.job_search import search_jobs
 from .utils.ai_service import AIService
-from .utils.hh_api import HHApi, sync_vacancies
+from .utils.job_embeddings import embed_resume, get_job_index
+from .utils.llm_cache import get_llm_cache
+from .utils.llm_client import get_llm_client
+from .utils.hh_api import HHApi
+from .utils import background, metrics
+from .utils.batch_matching import filter_jobs, local_candidates, score_jobs
 from django.conf import settings
+from django.db.models import F
 from social_django.utils import load_strategy, load_backend
 from social_core.exceptions import MissingBackend, AuthTokenError, AuthForbidden
 from django.urls import reverse
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from google.oauth2 import id_token
 from google.auth.transport import requests as google_requests
 from django.middleware.csrf import get_token
+from pathlib import Path
 import requests
-import io
+import hmac
 import logging
 import json
 
@@ -58,35 +70,40 @@ class ResumeViewSet(viewsets.ModelViewSet):
         return Resume.objects.filter(user=self.request.user)
 
     def perform_create(self, serializer):
-        resume = serializer.save(user=self.request.user)
-        self._process_resume(resume)
+        name, sha256 = store_resume_file(serializer.validated_data['file'])
+        resume = serializer.save(user=self.request.user, file=name, file_sha256=sha256)
+        queue_resume_processing(resume, self.request.user)
+
+    def perform_update(self, serializer):
+        if 'file' in serializer.validated_data:
+            name, sha256 = store_resume_file(serializer.validated_data['file'])
+            serializer.save(file=name, file_sha256=sha256)
+        else:
+            serializer.save()
 
     @action(detail=True, methods=['post'])
     def reanalyze(self, request, pk=None):
         resume = self.get_object()
-        self._process_resume(resume)
-        return Response(ResumeSerializer(resume).data)
-
-    def _process_resume(self, resume):
-        try:
-            # Parse resume file
-            file_obj = resume.file.file
-            content = ResumeParser.extract_text(io.BytesIO(file_obj.read()), file_obj.content_type)
-            
-            if content:
-                # Use AI to extract information
-                ai_service = AIService()
-                parsed_data = ai_service.parse_resume(content)
-                
-                # Update resume with parsed data
-                resume.parsed_content = content
-                resume.skills = parsed_data.get('skills', [])
-                resume.experience = parsed_data.get('experience', [])
-                resume.education = parsed_data.get('education', [])
-                resume.save()
-
-        except Exception as e:
-            logger.error(f"Error processing resume {resume.id}: {str(e)}")
+        if resume.processing_status in ('queued', 'parsing', 'analyzing'):
+            return Response(
+                {"error": "This resume is already being processed"},
+                status=status.HTTP_409_CONFLICT
+            )
+        queue_resume_processing(resume, self.request.user)
+        return Response(ResumeSerializer(resume).data, status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=True, methods=['get'], url_path='status')
+    def processing_status(self, request, pk=None):
+        """
+        The resume's processing status alone, for polling after an upload
+        """
+        resume = self.get_object()
+        return Response({
+            'id': resume.id,
+            'processing_status': resume.processing_status,
+            'processing_error': resume.processing_error,
+            'updated_at': resume.updated_at,
+        })
 
 class JobViewSet(viewsets.ModelViewSet):
     queryset = Job.objects.all()
@@ -95,14 +112,7 @@ class JobViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=['post'])
     def sync_hh(self, request):
-        try:
-            sync_vacancies()
-            return Response({"message": "Jobs synchronized successfully"})
-        except Exception as e:
-            return Response(
-                {"error": str(e)},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
+        return HHSyncView.enqueue_sync(request)
 
     @action(detail=True, methods=['post'])
     def match_resume(self, request, pk=None):
@@ -420,23 +430,308 @@ class JobListView(generics.ListCreateAPIView):
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        return Job.objects.all().order_by('-posted_date')
+        return Job.objects.filter(is_active=True).order_by('-posted_date')
+
+    def perform_create(self, serializer):
+        data = serializer.validated_data
+        serializer.save(required_skills=job_skills(data['title'], data['description'], data['requirements']))
 
 class JobDetailView(generics.RetrieveUpdateDestroyAPIView):
     queryset = Job.objects.all()
     serializer_class = JobSerializer
     permission_classes = [IsAuthenticated]
 
+class JobRawDataView(APIView):
+    """
+    The complete source API response of a job, which list and detail
+    responses leave out
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        job = get_object_or_404(Job.objects.select_related('payload'), pk=pk)
+        try:
+            return Response(job.payload.payload)
+        except JobPayload.DoesNotExist:
+            return Response({"error": "No raw data stored for this job"}, status=status.HTTP_404_NOT_FOUND)
+
+class LLMClientStatsView(APIView):
+    """
+    Request, retry and error counts and latency of this process's LLM client
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(get_llm_client().stats)
+
+class LLMCacheView(APIView):
+    """
+    Hit-rate statistics of this process's LLM cache; DELETE invalidates it,
+    optionally for a single ``?operation=``
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        cache = get_llm_cache()
+        if cache is None:
+            return Response({"enabled": False})
+        return Response({"enabled": True, **cache.stats})
+
+    def delete(self, request):
+        cache = get_llm_cache()
+        if cache is None:
+            return Response({"enabled": False})
+        operation = request.query_params.get('operation')
+        if operation and operation not in AIService.PROMPT_VERSIONS:
+            return Response({"error": f"Unknown operation: {operation}"}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({"enabled": True, "removed": cache.invalidate(operation)})
+
+def metrics_view(request):
+    """
+    Counters and histograms of every worker in the Prometheus text format.
+    A plain Django view: scrapers send no JWT and expect text, not JSON.
+    Outside DEBUG it is only served with METRICS_TOKEN set.
+    """
+    if not settings.METRICS_TOKEN:
+        if not settings.DEBUG:
+            return HttpResponse("Set METRICS_TOKEN to enable metrics", status=403, content_type='text/plain')
+    else:
+        expected = f"Bearer {settings.METRICS_TOKEN}"
+        if not hmac.compare_digest(request.headers.get('Authorization', ''), expected):
+            return HttpResponse(status=401)
+    return HttpResponse(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
 class JobSearchView(generics.ListAPIView):
+    """
+    Active jobs matching a full-text query, best first: GET ?q=&limit=
+
+    On PostgreSQL a misspelled title word still matches by trigram
+    similarity; SQLite only matches words by prefix, without typos.
+    """
     serializer_class = JobSerializer
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        queryset = Job.objects.all()
-        query = self.request.query_params.get('q', None)
+        queryset = Job.objects.filter(is_active=True)
+        query = self.request.query_params.get('q', '').strip()
         if query:
-            queryset = queryset.filter(title__icontains=query)
-        return queryset
+            queryset = search_jobs(queryset, query)
+        else:
+            queryset = queryset.order_by('-posted_date')
+        limit = LimitSerializer.parse(
+            self.request.query_params, settings.JOB_SEARCH_MAX_RESULTS, settings.JOB_SEARCH_MAX_RESULTS
+        )
+        return queryset[:limit]
+
+class JobRecommendationView(APIView):
+    """
+    Active jobs most similar to a resume by embedding, best first:
+    GET ?resume_id=&limit=
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        resume_id = ResumeIdSerializer.parse(request.query_params)['resume_id']
+        resume = get_object_or_404(Resume, id=resume_id, user=request.user)
+        limit = LimitSerializer.parse(request.query_params, 20, 100)
+        index = get_job_index()
+        query = embed_resume(resume.skills, resume.experience, index.dim)
+        # Fetch extra to make up for jobs deactivated since they were indexed,
+        # and more while those still crowd out the active ones
+        wanted = limit * 2
+        while True:
+            ranked = index.search(query, wanted)
+            jobs = Job.objects.filter(is_active=True).in_bulk([job_id for job_id, _ in ranked])
+            found = [(job_id, similarity) for job_id, similarity in ranked if job_id in jobs]
+            if len(found) >= limit or len(ranked) < wanted or wanted >= len(index):
+                break
+            wanted *= 4
+        return Response([
+            {'job': JobSerializer(jobs[job_id]).data, 'similarity': similarity}
+            for job_id, similarity in found[:limit]
+        ])
+
+class HHSyncView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        return self.enqueue_sync(request)
+
+    @staticmethod
+    def enqueue_sync(request):
+        params = {
+            key: request.data[key] for key in ('queries', 'areas', 'full')
+            if key in request.data
+        }
+        task, created = background.enqueue('hh_sync', params, user=request.user)
+        return Response(
+            BackgroundTaskSerializer(task).data,
+            status=status.HTTP_202_ACCEPTED if created else status.HTTP_200_OK
+        )
+
+class BatchMatchView(APIView):
+    """
+    Score one resume against the jobs matching a filter. The local matcher
+    ranks every candidate first and only the best ``limit`` go on to LLM
+    scoring. Small batches are scored inline; larger ones run as a
+    background task whose matches can be read, ranked, while it runs.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        resume_id = ResumeIdSerializer.parse(request.data)['resume_id']
+        resume = get_object_or_404(Resume, id=resume_id, user=request.user)
+        limit = LimitSerializer.parse(request.data, settings.MATCH_LLM_TOP_K, settings.MATCH_BATCH_MAX_JOBS)
+        filters = request.data.get('filter') or {}
+        job_ids = None
+        if filters:
+            job_ids = list(filter_jobs(Job.objects.filter(is_active=True), filters).values_list('id', flat=True))
+        local_scores = dict(local_candidates(resume, limit, job_ids))
+        if not local_scores:
+            return Response({'ranked': [], 'failed': []})
+
+        if len(local_scores) <= settings.MATCH_BATCH_INLINE_LIMIT:
+            jobs = list(Job.objects.filter(id__in=local_scores))
+            return Response(score_jobs(resume, jobs, local_scores=local_scores))
+
+        task, _ = background.enqueue(
+            'batch_match',
+            {
+                'resume_id': resume.id,
+                'job_ids': list(local_scores),
+                'local_scores': {str(job_id): score for job_id, score in local_scores.items()}
+            },
+            user=request.user
+        )
+        return Response(BackgroundTaskSerializer(task).data, status=status.HTTP_202_ACCEPTED)
+
+class LocalMatchView(APIView):
+    """
+    Rank jobs for a resume with the local matcher only, no LLM calls
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        resume_id = ResumeIdSerializer.parse(request.data)['resume_id']
+        resume = get_object_or_404(Resume, id=resume_id, user=request.user)
+        limit = LimitSerializer.parse(request.data, settings.MATCH_LLM_TOP_K, settings.MATCH_BATCH_MAX_JOBS)
+        filters = request.data.get('filter') or {}
+        job_ids = None
+        if filters:
+            job_ids = list(filter_jobs(Job.objects.filter(is_active=True), filters).values_list('id', flat=True))
+        local_scores = dict(local_candidates(resume, limit, job_ids))
+
+        matches = JobSkillMatch.objects.filter(
+            resume=resume, job_id__in=local_scores
+        ).select_related('job').order_by('-local_score')
+        return Response(RankedMatchSerializer(matches, many=True).data)
+
+class BatchMatchResultView(generics.ListAPIView):
+    """
+    Ranked matches of a batch-match task so far
+    """
+    serializer_class = RankedMatchSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        task = get_object_or_404(
+            BackgroundTask, pk=self.kwargs['pk'], kind='batch_match', created_by=self.request.user
+        )
+        return JobSkillMatch.objects.filter(
+            resume_id=task.params['resume_id'],
+            job_id__in=task.params['job_ids']
+        ).select_related('job').order_by(
+            # Candidates not scored yet have no match_score; Postgres would sort them first
+            F('match_score').desc(nulls_last=True), F('local_score').desc(nulls_last=True)
+        )
+
+class TaskQueueView(APIView):
+    """
+    Queued, retrying and running background tasks per kind
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(background.queue_depth())
+
+class BackgroundTaskDetailView(generics.RetrieveAPIView):
+    serializer_class = BackgroundTaskSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        user = self.request.user
+        if user.is_superuser:
+            return BackgroundTask.objects.all()
+        return BackgroundTask.objects.filter(created_by=user)
+
+def sse_event(event: str, data) -> bytes:
+    """
+    Encode one Server-Sent Events frame with a JSON payload
+    """
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n".encode('utf-8')
+
+class EventStreamRenderer(BaseRenderer):
+    """
+    Lets SSE views be requested with ``Accept: text/event-stream``;
+    errors raised before the stream starts go out as an ``error`` event
+    """
+    media_type = 'text/event-stream'
+    format = 'sse'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return sse_event('error', data)
+
+class CoverLetterStreamView(APIView):
+    """
+    Write a cover letter for a job and relay it over Server-Sent Events as
+    it is generated: ``token`` events with the next piece of text, then one
+    ``done`` event with the saved application. The application is created
+    when the letter is complete, or has its letter rewritten if it exists.
+    """
+    permission_classes = [IsAuthenticated]
+    renderer_classes = [JSONRenderer, EventStreamRenderer]
+
+    def post(self, request):
+        ids = CoverLetterRequestSerializer.parse(request.data)
+        job = get_object_or_404(Job, id=ids['job_id'])
+        resume = get_object_or_404(Resume, id=ids['resume_id'], user=request.user)
+        application = Application.objects.filter(user=request.user, job=job).first()
+
+        response = StreamingHttpResponse(
+            self.stream(request.user, job, resume, application),
+            content_type='text/event-stream'
+        )
+        response['Cache-Control'] = 'no-cache'
+        # Keep nginx from buffering the stream
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    def stream(self, user, job, resume, application):
+        pieces = []
+        try:
+            for piece in AIService().stream_cover_letter(
+                {
+                    'skills': resume.skills,
+                    'experience': resume.experience
+                },
+                {
+                    'title': job.title,
+                    'company': job.company,
+                    'requirements': job.requirements
+                }
+            ):
+                pieces.append(piece)
+                yield sse_event('token', {'text': piece})
+        except Exception as e:
+            logger.error(f"Error streaming cover letter for job {job.id}: {str(e)}")
+            yield sse_event('error', {'error': 'Cover letter generation failed'})
+            return
+
+        if application is None:
+            application = Application(user=user, job=job, resume=resume)
+        application.cover_letter = ''.join(pieces)
+        application.save()
+        yield sse_event('done', ApplicationSerializer(application).data)
 
 class ApplicationListView(generics.ListCreateAPIView):
     serializer_class = ApplicationSerializer
@@ -470,24 +765,12 @@ class ResumeUploadView(APIView):
             return Response({'error': 'No file provided'}, status=status.HTTP_400_BAD_REQUEST)
         
         file = request.FILES['file']
-        try:
-            # Parse resume using the ResumeParser utility
-            parser = ResumeParser()
-            parsed_data = parser.parse(file)
-            
-            # Create or update resume
-            resume, created = Resume.objects.update_or_create(
-                user=request.user,
-                defaults={
-                    'file': file,
-                    'parsed_data': parsed_data
-                }
-            )
-            
-            return Response({
-                'message': 'Resume uploaded successfully',
-                'resume': ResumeSerializer(resume).data
-            }, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
-            
-        except Exception as e:
-            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
+        name, sha256 = store_resume_file(file)
+        resume = Resume.objects.create(
+            user=request.user, title=Path(file.name).stem[:200], file=name, file_sha256=sha256
+        )
+        queue_resume_processing(resume, request.user)
+        return Response({
+            'message': 'Resume uploaded, processing has been queued',
+            'resume': ResumeSerializer(resume).data
+        }, status=status.HTTP_202_ACCEPTED)
@@ -50,6 +50,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'corsheaders',
     'rest_framework.authtoken',
@@ -68,6 +69,7 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'social_django.middleware.SocialAuthExceptionMiddleware',  # Add social auth middleware
+    'api.middleware.MetricsMiddleware',
 ]
 
 ROOT_URLCONF = 'backend.urls'
@@ -149,6 +151,12 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# The default handlers, hashing uploads as they stream in (for resume deduplication)
+FILE_UPLOAD_HANDLERS = [
+    'api.utils.resume_store.HashingMemoryFileUploadHandler',
+    'api.utils.resume_store.HashingTemporaryFileUploadHandler',
+]
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -204,3 +212,113 @@ LOGIN_URL = 'login'
 LOGIN_REDIRECT_URL = '/'
 LOGOUT_URL = 'logout'
 LOGOUT_REDIRECT_URL = 'login'
+
+# HH.ru sync settings
+HH_SYNC_WORKERS = int(os.getenv('HH_SYNC_WORKERS', '8'))
+HH_REQUESTS_PER_SECOND = float(os.getenv('HH_REQUESTS_PER_SECOND', '10'))
+HH_REQUEST_TIMEOUT = float(os.getenv('HH_REQUEST_TIMEOUT', '10'))
+# Search fan-out; an empty entry means "no filter"
+HH_SYNC_QUERIES = os.getenv('HH_SYNC_QUERIES', '').split(',')
+HH_SYNC_AREAS = os.getenv('HH_SYNC_AREAS', '').split(',')
+HH_SYNC_BATCH_SIZE = int(os.getenv('HH_SYNC_BATCH_SIZE', '1000'))
+
+# HH.ru response cache ('sqlite', 'memory' or empty to disable); TTLs in seconds
+HH_CACHE_BACKEND = os.getenv('HH_CACHE_BACKEND', 'sqlite')
+HH_CACHE_PATH = os.getenv('HH_CACHE_PATH', str(BASE_DIR / '.cache' / 'hh_responses.sqlite3'))
+HH_CACHE_MAX_ENTRIES = int(os.getenv('HH_CACHE_MAX_ENTRIES', '50000'))
+HH_CACHE_MAX_BYTES = int(os.getenv('HH_CACHE_MAX_BYTES', str(512 * 1024 * 1024)))
+HH_CACHE_TTLS = {
+    'vacancies': int(os.getenv('HH_CACHE_TTL_SEARCH', '60')),
+    'vacancy': int(os.getenv('HH_CACHE_TTL_VACANCY', '3600')),
+    'skills': int(os.getenv('HH_CACHE_TTL_SKILLS', str(7 * 24 * 3600))),
+}
+HH_SKILLS_CACHE_TTL = int(os.getenv('HH_SKILLS_CACHE_TTL', str(30 * 24 * 3600)))
+HH_SKILLS_LRU_SIZE = int(os.getenv('HH_SKILLS_LRU_SIZE', '10000'))
+
+# Background tasks
+BACKGROUND_TASK_POLL_INTERVAL = float(os.getenv('BACKGROUND_TASK_POLL_INTERVAL', '2'))
+BACKGROUND_TASK_STALE_AFTER = int(os.getenv('BACKGROUND_TASK_STALE_AFTER', '600'))
+# Seconds before the first retry of a failed task, doubling with each further attempt
+BACKGROUND_TASK_RETRY_BACKOFF = float(os.getenv('BACKGROUND_TASK_RETRY_BACKOFF', '30'))
+# Tasks each run_worker process runs at once, one thread each
+BACKGROUND_WORKER_CONCURRENCY = int(os.getenv('BACKGROUND_WORKER_CONCURRENCY', '4'))
+RESUME_PROCESS_MAX_ATTEMPTS = int(os.getenv('RESUME_PROCESS_MAX_ATTEMPTS', '3'))
+
+# Resume text extraction: PDF and DOCX files are parsed in a process pool; 0 workers parses in-process
+RESUME_PARSER_WORKERS = int(os.getenv('RESUME_PARSER_WORKERS', str(os.cpu_count() or 1)))
+RESUME_PARSER_TIMEOUT = float(os.getenv('RESUME_PARSER_TIMEOUT', '30'))
+# Bytes a pool process may grow by before allocations fail
+RESUME_PARSER_MEMORY_LIMIT = int(os.getenv('RESUME_PARSER_MEMORY_LIMIT', str(512 * 1024 * 1024)))
+RESUME_PARSER_TASKS_PER_CHILD = int(os.getenv('RESUME_PARSER_TASKS_PER_CHILD', '100'))
+RESUME_PARSER_MAX_PAGES = int(os.getenv('RESUME_PARSER_MAX_PAGES', '50'))
+RESUME_PARSER_MAX_CHARS = int(os.getenv('RESUME_PARSER_MAX_CHARS', '100000'))
+
+# Sharded HH.ru sync
+HH_SHARD_LEASE_SECONDS = int(os.getenv('HH_SHARD_LEASE_SECONDS', '120'))
+HH_SHARD_MAX_ATTEMPTS = int(os.getenv('HH_SHARD_MAX_ATTEMPTS', '5'))
+
+# Batch resume/job matching
+MATCH_BATCH_MAX_JOBS = int(os.getenv('MATCH_BATCH_MAX_JOBS', '500'))
+MATCH_BATCH_INLINE_LIMIT = int(os.getenv('MATCH_BATCH_INLINE_LIMIT', '10'))
+MATCH_BATCH_CONCURRENCY = int(os.getenv('MATCH_BATCH_CONCURRENCY', '8'))
+MATCH_BATCH_WRITE_SIZE = int(os.getenv('MATCH_BATCH_WRITE_SIZE', '25'))
+# Candidates the local matcher passes on to LLM scoring
+MATCH_LLM_TOP_K = int(os.getenv('MATCH_LLM_TOP_K', '50'))
+LOCAL_MATCH_INDEX_TTL = int(os.getenv('LOCAL_MATCH_INDEX_TTL', '300'))
+
+# LLM provider: 'openai', 'fake' (offline stand-in for load tests and CI) or 'rules'
+LLM_PROVIDER = os.getenv('LLM_PROVIDER', 'openai')
+# Provider that answers when LLM_PROVIDER fails after its retries, e.g. 'rules'; empty to fail instead
+LLM_FALLBACK_PROVIDER = os.getenv('LLM_FALLBACK_PROVIDER', '')
+LLM_FAKE_LATENCY = float(os.getenv('LLM_FAKE_LATENCY', '0.5'))
+LLM_FAKE_ERROR_RATE = float(os.getenv('LLM_FAKE_ERROR_RATE', '0'))
+LLM_FAKE_SEED = int(os.getenv('LLM_FAKE_SEED', '0'))
+
+# OpenAI client
+OPENAI_API_KEY = os.getenv('OPENAI_API_KEY', '')
+OPENAI_BASE_URL = os.getenv('OPENAI_BASE_URL', '')
+LLM_TIMEOUT = float(os.getenv('LLM_TIMEOUT', '60'))
+LLM_CONNECT_TIMEOUT = float(os.getenv('LLM_CONNECT_TIMEOUT', '5'))
+LLM_MAX_RETRIES = int(os.getenv('LLM_MAX_RETRIES', '3'))
+LLM_RETRY_BACKOFF = float(os.getenv('LLM_RETRY_BACKOFF', '1'))
+LLM_POOL_SIZE = int(os.getenv('LLM_POOL_SIZE', '20'))
+# Async completions in flight per event loop
+LLM_MAX_CONCURRENCY = int(os.getenv('LLM_MAX_CONCURRENCY', '16'))
+
+# LLM completion cache, keyed by model, prompt and parameters
+LLM_CACHE_BACKEND = os.getenv('LLM_CACHE_BACKEND', 'sqlite')
+LLM_CACHE_PATH = os.getenv('LLM_CACHE_PATH', str(BASE_DIR / '.cache' / 'llm_completions.sqlite3'))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv('LLM_CACHE_MAX_ENTRIES', '100000'))
+LLM_CACHE_MAX_BYTES = int(os.getenv('LLM_CACHE_MAX_BYTES', str(256 * 1024 * 1024)))
+LLM_CACHE_TTLS = {
+    'parse_resume': int(os.getenv('LLM_CACHE_TTL_PARSE_RESUME', str(30 * 24 * 3600))),
+    'calculate_job_match': int(os.getenv('LLM_CACHE_TTL_JOB_MATCH', str(7 * 24 * 3600))),
+    'generate_cover_letter': int(os.getenv('LLM_CACHE_TTL_COVER_LETTER', str(24 * 3600))),
+}
+# Token budgets for the variable part (resume text, experience, requirements) of each prompt
+LLM_PROMPT_BUDGETS = {
+    'parse_resume': int(os.getenv('LLM_PROMPT_BUDGET_PARSE_RESUME', '3000')),
+    'calculate_job_match': int(os.getenv('LLM_PROMPT_BUDGET_JOB_MATCH', '1500')),
+    'generate_cover_letter': int(os.getenv('LLM_PROMPT_BUDGET_COVER_LETTER', '1500')),
+}
+
+# Job embedding index for recommendations
+JOB_EMBEDDINGS_ENABLED = os.getenv('JOB_EMBEDDINGS_ENABLED', 'True').lower() == 'true'
+JOB_EMBEDDING_DIR = os.getenv('JOB_EMBEDDING_DIR', str(BASE_DIR / '.cache' / 'job_embeddings'))
+JOB_EMBEDDING_DIM = int(os.getenv('JOB_EMBEDDING_DIM', '256'))
+# IVF lists scanned per search once the index is trained
+JOB_EMBEDDING_NPROBE = int(os.getenv('JOB_EMBEDDING_NPROBE', '16'))
+
+# Metrics served at /api/metrics; each process writes its values here for the others to read
+METRICS_DIR = os.getenv('METRICS_DIR', str(BASE_DIR / '.cache' / 'metrics'))
+METRICS_FLUSH_INTERVAL = float(os.getenv('METRICS_FLUSH_INTERVAL', '5'))
+# Bearer token the scraper must send; when empty, metrics are only served in DEBUG
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+# Curated skills and their aliases, found locally in resumes and vacancies
+SKILL_DICTIONARY_PATH = os.getenv('SKILL_DICTIONARY_PATH', str(BASE_DIR / 'api' / 'data' / 'skills.json'))
+# Also ask HH.ru to suggest skills for each vacancy title (one extra request per new title)
+HH_SKILL_SUGGESTIONS = os.getenv('HH_SKILL_SUGGESTIONS', 'False').lower() == 'true'
+
+# Most results a job search returns, best first
+JOB_SEARCH_MAX_RESULTS = int(os.getenv('JOB_SEARCH_MAX_RESULTS', '200'))
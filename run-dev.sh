@@ -27,12 +27,16 @@ npm install
 echo -e "\n🚀 Starting servers..."
 echo "Backend will be available at: http://localhost:8000"
 echo "Frontend will be available at: http://localhost:3000"
-echo -e "\nPress Ctrl+C to stop both servers\n"
+echo "Background worker processes resume uploads and HH.ru syncs"
+echo -e "\nPress Ctrl+C to stop all servers\n"
 
 # Start backend
 cd ..
 python manage.py runserver &
 
+# Start background worker
+python manage.py run_worker &
+
 # Start frontend
 cd frontend
 npm run dev &
@@ -27,6 +27,12 @@ rm -rf backend/static/frontend
 mkdir -p backend/static/frontend
 cp -r frontend/dist/* backend/static/frontend/
 
+# Start background worker, stopped along with the server
+echo "Starting background worker..."
+python manage.py run_worker &
+WORKER_PID=$!
+trap 'kill $WORKER_PID 2>/dev/null || true' EXIT
+
 # Start production server
 echo "Starting production server..."
-gunicorn backend.wsgi:application --bind 0.0.0.0:8000 --workers 3
+gunicorn backend.wsgi:application --bind 0.0.0.0:8000 --workers 3 --worker-class gthread --threads 8